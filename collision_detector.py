@@ -8,10 +8,156 @@ import trimesh
 from scipy.spatial import cKDTree
 from config import SupportConfig
 
+try:
+    # pykdtree builds considerably faster than cKDTree on large meshes
+    from pykdtree.kdtree import KDTree as PyKDTree
+except ImportError:
+    PyKDTree = None
+
+# Batches smaller than this are queried on one thread; spinning up the
+# cKDTree worker pool costs more than it saves on a handful of points.
+PARALLEL_QUERY_MIN_POINTS = 256
+
+# Cell size (mm) of the coarse distance grid that rejects segments far from
+# the model before any KD-tree query. Cells grow on large models to keep
+# the grid under DISTANCE_GRID_MAX_CELLS.
+DISTANCE_GRID_CELL = 1.0
+DISTANCE_GRID_MAX_CELLS = 500_000
+
+# Grid distances are only resolved up to this far (mm); cells farther from
+# the surface store the cap, which is still a valid lower bound
+DISTANCE_GRID_MAX_DISTANCE = 10.0
+
+# Upper bound on the lattice points sampled on large faces; beyond it the
+# lattice spacing (and with it the sample gap) grows
+COLLISION_LATTICE_MAX_POINTS = 250_000
+
+# Support contacts sit on the model surface, so the part of a support
+# within this many collision radii of its contact point is not tested.
+# Leaving a face tilted up to 60 degrees from the direction of travel
+# takes twice the collision radius.
+TIP_EXEMPT_RADII = 2.0
+
+_embree_warning_shown = False
+
+
+def _warn_no_embree():
+    """Print a one-time warning that ray queries use the slow fallback"""
+    global _embree_warning_shown
+    if _embree_warning_shown:
+        return
+    _embree_warning_shown = True
+    print("  Warning: embreex not installed, ray queries use the much slower "
+          "rtree backend (pip install embreex)")
+
+
+def point_segment_distances_sq(points, start, end):
+    """
+    Squared distance from each point to the segment start-end
+
+    The projection parameter is clamped rather than branched on, so the
+    whole batch is evaluated in a handful of vectorized operations.
+
+    Args:
+        points: (N, 3) array of points
+        start: Segment start [x, y, z]
+        end: Segment end [x, y, z]
+
+    Returns:
+        (N,) array of squared distances
+    """
+    axis = end - start
+    axis_len_sq = float(np.dot(axis, axis))
+    offsets = points - start
+
+    if axis_len_sq > 0:
+        t = np.clip(offsets @ axis / axis_len_sq, 0.0, 1.0)
+    else:
+        t = np.zeros(len(points))
+
+    deltas = offsets - t[:, None] * axis
+    return np.einsum('ij,ij->i', deltas, deltas)
+
+
+def clip_segments_to_tip(starts, ends, tip, reach):
+    """
+    Trim the part of each segment that lies within reach of a support tip
+
+    A segment that starts inside the ball around the tip is shortened to
+    start where it leaves the ball, and one that ends inside it to end
+    where it enters. Segments that pass through the ball with both ends
+    outside are left whole.
+
+    Args:
+        starts: (S, 3) array of segment starts
+        ends: (S, 3) array of segment ends
+        tip: Tip point [x, y, z]
+        reach: Scalar or (S,) array of ball radii
+
+    Returns:
+        tuple: (clipped starts, clipped ends, (S,) bool array that is False
+            where the whole segment lies within reach)
+    """
+    axes = ends - starts
+    offsets = starts - np.asarray(tip, dtype=starts.dtype)
+
+    # |offset + t * axis| = reach, solved for t
+    a = np.einsum('ij,ij->i', axes, axes)
+    b = np.einsum('ij,ij->i', offsets, axes)
+    c = np.einsum('ij,ij->i', offsets, offsets) - np.square(reach)
+    discriminant = b * b - a * c
+
+    meets = (discriminant > 0) & (a > 0)
+    root = np.sqrt(np.where(meets, discriminant, 0.0))
+    safe_a = np.where(a > 0, a, 1.0)
+    t_in = (-b - root) / safe_a
+    t_out = (-b + root) / safe_a
+
+    start_inside = meets & (t_in <= 0) & (t_out > 0)
+    end_inside = meets & (t_in < 1) & (t_out >= 1)
+
+    clipped_starts = np.where(start_inside[:, None], starts + t_out[:, None] * axes, starts)
+    clipped_ends = np.where(end_inside[:, None], starts + t_in[:, None] * axes, ends)
+    return (clipped_starts.astype(starts.dtype), clipped_ends.astype(ends.dtype),
+            ~(start_inside & end_inside))
+
+
+def _rotation_from_z(direction):
+    """
+    Rotation matrix taking +Z onto a unit direction (Rodrigues' formula)
+
+    Args:
+        direction: Unit vector [x, y, z]
+
+    Returns:
+        3x3 rotation matrix
+    """
+    z_axis = np.array([0.0, 0.0, 1.0])
+    axis = np.cross(z_axis, direction)
+    sin_a = np.linalg.norm(axis)
+    cos_a = float(np.dot(z_axis, direction))
+
+    if sin_a < 1e-9:
+        # Already aligned with +Z, or pointing straight down
+        return np.eye(3) if cos_a > 0 else np.diag([1.0, -1.0, -1.0])
+
+    axis = axis / sin_a
+    k = np.array([
+        [0, -axis[2], axis[1]],
+        [axis[2], 0, -axis[0]],
+        [-axis[1], axis[0], 0]
+    ])
+    return np.eye(3) + sin_a * k + (1 - cos_a) * (k @ k)
+
 
 class CollisionDetector:
     """Detect collisions between support paths and model geometry"""
 
+    # Spatial indices keyed by (mesh content hash, resolution), so building a
+    # detector again for an unchanged mesh reuses the KD-tree
+    _index_cache = {}
+    INDEX_CACHE_SIZE = 4
+
     def __init__(self, mesh, resolution=None):
         """
         Initialize collision detector
@@ -23,31 +169,434 @@ class CollisionDetector:
         self.mesh = mesh
         self.resolution = resolution or SupportConfig.COLLISION_RESOLUTION
 
+        # Settings read on every check, bound once per detector. Config is
+        # applied before detectors are built, so these stay in sync.
+        self._collision_enabled = SupportConfig.COLLISION_CHECK_ENABLED
+        self._resolution2x = self.resolution * 2
+
+        # Grab the ray intersector once so its acceleration structure is
+        # built a single time and shared by every ray query below. trimesh
+        # picks the Embree BVH backend when embreex is installed.
+        if not trimesh.ray.has_embree:
+            _warn_no_embree()
+        self._ray = self.mesh.ray
+
         # Build spatial index for fast collision queries
         self._build_spatial_index()
 
     def _build_spatial_index(self):
-        """Build KD-tree for fast spatial queries"""
-        # Sample points on mesh surface for collision detection
-        # Use face centers and vertices
-        self.collision_points = []
+        """Build KD-tree for fast spatial queries (cached per mesh geometry)"""
+        # hash(mesh) covers vertex and face data, so a transformed mesh gets
+        # a new key. (trimesh's identifier_hash is transform-invariant and
+        # would wrongly reuse an index built before re-orientation.)
+        leafsize = SupportConfig.COLLISION_KDTREE_LEAFSIZE
+        cache_key = (hash(self.mesh), self.resolution, leafsize)
+        cached = CollisionDetector._index_cache.get(cache_key)
+
+        if cached is not None:
+            self.collision_points, self.kdtree, self.surface_sample_gap, self.distance_grid = cached
+        else:
+            # Sample points on mesh surface for collision detection: vertices,
+            # face centers, and a lattice on faces too large for their center
+            # alone to cover at the collision resolution. Stacked into a single
+            # contiguous float32 array (sub-micron precision is irrelevant at
+            # the 0.5mm collision resolution)
+            face_centers = self.mesh.triangles_center
+            lattice_points, self.surface_sample_gap = self._sample_large_faces(face_centers)
+            self.collision_points = np.ascontiguousarray(
+                np.vstack([self.mesh.vertices, face_centers, lattice_points]), dtype=np.float32
+            )
+
+            # Build KD-tree for fast nearest neighbor queries. The tree is
+            # built once and queried thousands of times, so trade a slightly
+            # slower build for shallower, compact leaves
+            if PyKDTree is not None:
+                self.kdtree = PyKDTree(self.collision_points, leafsize=leafsize)
+            else:
+                self.kdtree = cKDTree(self.collision_points, leafsize=leafsize,
+                                      balanced_tree=True, compact_nodes=True,
+                                      copy_data=False)
+
+            self.distance_grid = self._build_distance_grid()
+
+            cache = CollisionDetector._index_cache
+            if len(cache) >= self.INDEX_CACHE_SIZE:
+                cache.pop(next(iter(cache)))
+            cache[cache_key] = (self.collision_points, self.kdtree, self.surface_sample_gap,
+                                self.distance_grid)
+
+        # Exact point-to-triangle distances for queries the sampled surface
+        # points can't decide on their own
+        self.proximity = trimesh.proximity.ProximityQuery(self.mesh)
+
+        print(f"  Built collision detection index with {len(self.collision_points)} points")
 
-        # Add all vertices
-        self.collision_points.extend(self.mesh.vertices)
+    def _build_distance_grid(self):
+        """
+        Distance from each cell center of a regular grid to the nearest collision point
 
-        # Add face centers for better coverage
-        face_centers = self.mesh.triangles_center
-        self.collision_points.extend(face_centers)
+        The grid covers the collision points plus one cell of padding, and
+        is filled with a single batched KD-tree query.
 
-        # Convert to numpy array
-        self.collision_points = np.array(self.collision_points)
+        Returns:
+            tuple: (grid origin, cell size, (X, Y, Z) float32 distance array)
+        """
+        if len(self.collision_points) == 0:
+            # Nothing to collide with: one cell at the distance cap
+            return np.zeros(3), DISTANCE_GRID_CELL, np.full((1, 1, 1), DISTANCE_GRID_MAX_DISTANCE,
+                                                            dtype=np.float32)
 
-        # Build KD-tree for fast nearest neighbor queries
-        self.kdtree = cKDTree(self.collision_points)
+        lower = self.collision_points.min(axis=0).astype(np.float64) - DISTANCE_GRID_CELL
+        upper = self.collision_points.max(axis=0).astype(np.float64) + DISTANCE_GRID_CELL
+        extent = upper - lower
 
-        print(f"  Built collision detection index with {len(self.collision_points)} points")
+        cell = DISTANCE_GRID_CELL
+        num_cells = np.prod(np.ceil(extent / cell))
+        if num_cells > DISTANCE_GRID_MAX_CELLS:
+            cell *= (num_cells / DISTANCE_GRID_MAX_CELLS) ** (1 / 3)
+        shape = np.maximum(1, np.ceil(extent / cell).astype(int))
+
+        axes = [lower[i] + (np.arange(shape[i]) + 0.5) * cell for i in range(3)]
+        centers = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+        distances = self._nearest_distances(centers, upper_bound=DISTANCE_GRID_MAX_DISTANCE)
+
+        distances = np.minimum(distances, DISTANCE_GRID_MAX_DISTANCE).astype(np.float32)
+        return lower, cell, distances.reshape(shape)
+
+    def _distance_lower_bounds(self, points):
+        """
+        Lower bound on each point's distance to the nearest collision point
+
+        Read from the distance grid: the distance at the containing (or,
+        outside the grid, the nearest) cell center, minus the point's
+        offset from that center.
+
+        Args:
+            points: (N, 3) array of query points
+
+        Returns:
+            (N,) array of distance lower bounds
+        """
+        origin, cell, distances = self.distance_grid
+        cells = np.floor((points - origin) / cell).astype(np.intp)
+        np.clip(cells, 0, np.array(distances.shape) - 1, out=cells)
+
+        offsets = points - (origin + (cells + 0.5) * cell)
+        return (distances[cells[:, 0], cells[:, 1], cells[:, 2]] -
+                np.sqrt(np.einsum('ij,ij->i', offsets, offsets)))
+
+    def _sample_large_faces(self, face_centers):
+        """
+        Sample a lattice on faces whose center is a poor proxy
+
+        Every point on a face lies within the face's centroid-to-vertex
+        radius of its center sample. Faces where that radius exceeds the
+        collision resolution are split at the foot of the altitude onto
+        their longest edge into two right triangles. Each half gets a
+        lattice along its two legs, with each leg divided on its own so
+        that a lattice cell's diagonal is at most one resolution step. The
+        point count therefore follows face area rather than the square of
+        the longest edge, so long thin slivers stay cheap. Every point of a
+        half lies in a cell whose corner nearest the right angle is
+        sampled, so the largest cell diagonal bounds how far the KD-tree
+        distance can overestimate the true surface distance. If the
+        lattice would exceed COLLISION_LATTICE_MAX_POINTS, the spacing is
+        coarsened and the gap grows to match.
+
+        Args:
+            face_centers: (F, 3) array of face centers
+
+        Returns:
+            tuple: ((M, 3) array of lattice points, sample gap in mm)
+        """
+        triangles = self.mesh.triangles
+        if len(triangles) == 0:
+            return np.empty((0, 3)), 0.0
+
+        # Compare squared lengths; only the reported maxima need a sqrt
+        offsets = triangles - face_centers[:, None, :]
+        centroid_radii_sq = np.einsum('fvd,fvd->fv', offsets, offsets).max(axis=1)
+        large = centroid_radii_sq > self.resolution ** 2
+        gap = float(np.sqrt(centroid_radii_sq[~large].max())) if np.any(~large) else 0.0
+
+        if not np.any(large):
+            return np.empty((0, 3)), gap
+
+        # Reorder each triangle so the vertex opposite its longest edge
+        # comes first. Both angles on the longest edge are acute, so the
+        # altitude's foot lies on it
+        large_triangles = triangles[large]
+        opposite = np.roll(large_triangles, -1, axis=1) - np.roll(large_triangles, 1, axis=1)
+        apex_index = np.einsum('fvd,fvd->fv', opposite, opposite).argmax(axis=1)
+        order = (apex_index[:, None] + np.arange(3)) % 3
+        apex, end_b, end_c = np.take_along_axis(large_triangles, order[:, :, None], axis=1).transpose(1, 0, 2)
+
+        base = end_c - end_b
+        t = np.einsum('fd,fd->f', apex - end_b, base) / np.einsum('fd,fd->f', base, base)
+        foot = end_b + t[:, None] * base
+
+        # Right triangles (foot, base end, apex) for both halves; a half
+        # with no length along the base is dropped
+        corners = np.concatenate([foot, foot])
+        leg_ends = np.concatenate([end_b, end_c])
+        apexes = np.concatenate([apex, apex])
+        along = leg_ends - corners
+        up = apexes - corners
+        along_lengths = np.sqrt(np.einsum('fd,fd->f', along, along))
+        up_lengths = np.sqrt(np.einsum('fd,fd->f', up, up))
+        keep = along_lengths > 1e-9
+        corners, along, up = corners[keep], along[keep], up[keep]
+        along_lengths, up_lengths = along_lengths[keep], up_lengths[keep]
+
+        # Cells at most resolution / sqrt(2) on a side have a diagonal of at
+        # most one resolution step; coarsen them if that is too many points
+        spacing = self.resolution / np.sqrt(2)
+        for _ in range(2):
+            along_divisions = np.maximum(1, np.ceil(along_lengths / spacing)).astype(int)
+            up_divisions = np.maximum(1, np.ceil(up_lengths / spacing)).astype(int)
+            num_points = np.sum((along_divisions + 1) * (up_divisions + 2) // 2)
+            if num_points <= COLLISION_LATTICE_MAX_POINTS:
+                break
+            spacing *= np.sqrt(num_points / COLLISION_LATTICE_MAX_POINTS)
+
+        cell_diagonals = np.hypot(along_lengths / along_divisions, up_lengths / up_divisions)
+        gap = max(gap, float(cell_diagonals.max()))
+
+        # Halves sharing both division counts share one lattice
+        divisions = np.column_stack([along_divisions, up_divisions])
+        unique_divisions, groups = np.unique(divisions, axis=0, return_inverse=True)
+        groups = groups.ravel()
+
+        lattice_points = []
+        for k, (n_along, n_up) in enumerate(unique_divisions):
+            i, j = np.meshgrid(np.arange(n_along + 1), np.arange(n_up + 1), indexing='ij')
+            inside = i * n_up + j * n_along <= n_along * n_up
+            weights_along = i[inside] / n_along
+            weights_up = j[inside] / n_up
+            group = groups == k
+            lattice_points.append((corners[group, None, :] +
+                                   weights_along[None, :, None] * along[group, None, :] +
+                                   weights_up[None, :, None] * up[group, None, :]).reshape(-1, 3))
+
+        return np.vstack(lattice_points), gap
+
+    def _query_workers(self, num_points):
+        """Number of cKDTree workers to use for a batch of num_points queries"""
+        return -1 if num_points >= PARALLEL_QUERY_MIN_POINTS else 1
+
+    def _nearest_distances(self, points, upper_bound=np.inf):
+        """
+        Distance from each query point to the nearest collision point
+
+        Args:
+            points: (N, 3) array of query points
+            upper_bound: Stop searching beyond this distance; points with no
+                collision point in range get a distance of inf
+
+        Returns:
+            (N,) array of distances
+        """
+        if isinstance(self.kdtree, cKDTree):
+            distances, _ = self.kdtree.query(points, k=1, distance_upper_bound=upper_bound,
+                                             workers=self._query_workers(len(points)))
+        else:
+            # pykdtree requires the query dtype to match the tree data
+            points = np.asarray(points, dtype=self.collision_points.dtype)
+            bound = None if np.isinf(upper_bound) else upper_bound
+            distances, _ = self.kdtree.query(points, k=1, distance_upper_bound=bound)
+        return distances
+
+    def _points_within(self, centers, radii):
+        """
+        Indices of collision points within each radius of each center
+
+        Args:
+            centers: (N, 3) array of query points
+            radii: (N,) array of search radii
+
+        Returns:
+            List of N arrays of collision point indices
+        """
+        if isinstance(self.kdtree, cKDTree):
+            neighbors = self.kdtree.query_ball_point(centers, radii,
+                                                     workers=self._query_workers(len(centers)))
+            return [np.asarray(n, dtype=np.intp) for n in neighbors]
+
+        # pykdtree has no radius query; grow k until each ball is exhausted
+        num_points = len(self.collision_points)
+        queries = np.asarray(centers, dtype=self.collision_points.dtype)
+        result = []
+        for query, radius in zip(queries, radii):
+            k = 32
+            while True:
+                k = min(k, num_points)
+                distances, indices = self.kdtree.query(query[None, :], k=k,
+                                                       distance_upper_bound=radius)
+                distances = np.atleast_1d(distances.ravel())
+                indices = np.atleast_1d(indices.ravel())
+                found = np.isfinite(distances)
+                if not found.all() or k == num_points:
+                    result.append(indices[found].astype(np.intp))
+                    break
+                k *= 4
+        return result
+
+    def _point_hits(self, points, collision_radii):
+        """
+        Test which points lie within their collision radius of the model
+
+        The KD-tree over surface samples is used as a coarse filter: a sample
+        within range is a guaranteed hit, and points farther than the sample
+        gap can't be close to any triangle. Only the points in between are
+        resolved with an exact closest-point query.
+
+        Args:
+            points: (N, 3) array of query points
+            collision_radii: Scalar or (N,) array of collision radii
+
+        Returns:
+            (N,) bool array, True where the point collides
+        """
+        collision_radii = np.broadcast_to(collision_radii, (len(points),))
+
+        # Prune the search at the widest radius that can still matter
+        search_radius = float(np.max(collision_radii)) + self.surface_sample_gap
+        distances = self._nearest_distances(points, upper_bound=search_radius)
+
+        hits = distances < collision_radii
+        ambiguous = ~hits & (distances < collision_radii + self.surface_sample_gap)
+        if np.any(ambiguous):
+            # Unsigned distance: inside/outside tests are unreliable on the
+            # overlapping part shells most miniature STLs are built from
+            _, surface_distances, _ = self.proximity.on_surface(points[ambiguous])
+            hits[ambiguous] = surface_distances < collision_radii[ambiguous]
+        return hits
+
+    def _sample_segments(self, starts, ends):
+        """
+        Sample points along segment axes at the collision resolution
+
+        Each segment gets max(3, length / resolution) evenly spaced samples,
+        all written into one flat array.
+
+        Args:
+            starts: (S, 3) array of segment starts
+            ends: (S, 3) array of segment ends
+
+        Returns:
+            tuple: ((N, 3) sample points, (N,) index of each sample's segment)
+        """
+        axes = ends - starts
+        lengths = np.linalg.norm(axes, axis=1)
+
+        counts = np.maximum(3, (lengths / self.resolution).astype(int))
+        segment_ids = np.repeat(np.arange(len(counts)), counts)
+        first_sample = np.cumsum(counts) - counts
+        ts = (np.arange(counts.sum()) - first_sample[segment_ids]) / (counts[segment_ids] - 1)
+
+        points = starts[segment_ids] + ts[:, None].astype(np.float32) * axes[segment_ids]
+        return points, segment_ids
+
+    def _segment_hits(self, starts, ends, collision_radii, stop_at_first=False, tip=None):
+        """
+        Test which segments pass within their collision radius of the model
+
+        Segments the distance grid places well clear of the model are
+        dropped first. Broad phase: one batched ball query collects the
+        surface points inside each segment's bounding sphere. Narrow phase: exact
+        point-to-segment distances against those candidates. Segments
+        shorter than the resolution skip both and test their midpoint. Axis
+        samples are only generated for segments that might still graze the interior
+        of a large triangle, and only those go through _point_hits.
 
-    def check_cylinder_collision(self, start, end, radius):
+        Args:
+            starts: (S, 3) float32 array of segment starts
+            ends: (S, 3) float32 array of segment ends
+            collision_radii: (S,) array of collision radii
+            stop_at_first: Return as soon as any segment is known to collide
+                (the remaining entries are then left unresolved)
+            tip: Optional support contact point [x, y, z]. The contact lies
+                on the model surface, so the part of each segment within
+                TIP_EXEMPT_RADII collision radii of the tip is not tested
+
+        Returns:
+            (S,) bool array, True where the segment collides
+        """
+        if tip is not None:
+            starts, ends, tested = clip_segments_to_tip(starts, ends, tip,
+                                                        collision_radii * TIP_EXEMPT_RADII)
+            hits = np.zeros(len(starts), dtype=bool)
+            tested = np.flatnonzero(tested)
+            if len(tested) > 0:
+                hits[tested] = self._segment_hits(starts[tested], ends[tested],
+                                                  collision_radii[tested], stop_at_first)
+            return hits
+
+        hits = np.zeros(len(starts), dtype=bool)
+        lengths = np.linalg.norm(ends - starts, axis=1)
+
+        # Skip degenerate segments. Those shorter than the collision
+        # resolution are tested at their midpoint only; the endpoints are
+        # within half a resolution of it, which the resolution margin on
+        # collision_radii already covers
+        short = np.flatnonzero((lengths >= 0.001) & (lengths < self.resolution))
+        if len(short) > 0:
+            midpoints = (starts[short] + ends[short]) * 0.5
+            hits[short] = self._point_hits(midpoints, collision_radii[short])
+            if stop_at_first and np.any(hits[short]):
+                return hits
+
+        valid = np.flatnonzero(lengths >= self.resolution)
+        if len(valid) == 0:
+            return hits
+
+        midpoints = (starts[valid] + ends[valid]) * 0.5
+        reach = lengths[valid] * 0.5 + collision_radii[valid]
+
+        # A segment whose bounding sphere stays farther than the sample gap
+        # from every surface sample is clear (see the gap check below), and
+        # the distance grid proves that for most segments away from the
+        # model without a KD-tree query
+        maybe_near = self._distance_lower_bounds(midpoints) < reach + self.surface_sample_gap
+        valid, midpoints, reach = valid[maybe_near], midpoints[maybe_near], reach[maybe_near]
+        if len(valid) == 0:
+            return hits
+        starts, ends = starts[valid], ends[valid]
+        collision_radii = collision_radii[valid]
+
+        candidate_lists = self._points_within(midpoints, reach)
+        for k, candidates in enumerate(candidate_lists):
+            if len(candidates) == 0:
+                continue
+            dist_sq = point_segment_distances_sq(self.collision_points[candidates], starts[k], ends[k])
+            if np.any(dist_sq < collision_radii[k] ** 2):
+                hits[valid[k]] = True
+                if stop_at_first:
+                    return hits
+
+        # No surface sample is in range, but a large triangle's interior may
+        # still be. That's only possible if some sample lies within the
+        # sample gap of a bounding sphere; otherwise the segment is clear.
+        near = np.flatnonzero(~hits[valid])
+        if len(near) == 0:
+            return hits
+        gap_reach = reach[near] + self.surface_sample_gap
+        nearest = self._nearest_distances(midpoints[near], upper_bound=float(gap_reach.max()))
+        near = near[nearest < gap_reach]
+        if len(near) == 0:
+            return hits
+
+        points, segment_ids = self._sample_segments(starts[near], ends[near])
+        point_hits = self._point_hits(points, collision_radii[near][segment_ids])
+        hits[valid[near]] = np.bincount(segment_ids, weights=point_hits, minlength=len(near)) > 0
+        return hits
+
+    def _segments_collide(self, starts, ends, collision_radii, tip=None):
+        """True if any of the segments collides (see _segment_hits)"""
+        return bool(np.any(self._segment_hits(starts, ends, collision_radii,
+                                              stop_at_first=True, tip=tip)))
+
+    def check_cylinder_collision(self, start, end, radius, tip=None):
         """
         Check if a cylindrical support segment collides with the model
 
@@ -55,67 +604,116 @@ class CollisionDetector:
             start: Start point [x, y, z]
             end: End point [x, y, z]
             radius: Cylinder radius
+            tip: Optional contact point of the support the segment belongs
+                to; the model surface right at the tip is not a collision
 
         Returns:
             bool: True if collision detected
         """
-        if not SupportConfig.COLLISION_CHECK_ENABLED:
+        if not self._collision_enabled:
             return False
 
-        start = np.array(start)
-        end = np.array(end)
+        # Match the collision point dtype; asarray skips the copy when the
+        # caller already passes float32 arrays
+        start = np.asarray(start, dtype=np.float32)
+        end = np.asarray(end, dtype=np.float32)
 
-        # Sample points along the cylinder axis
-        direction = end - start
-        length = np.linalg.norm(direction)
+        # Check if any collision points are within the cylinder radius
+        # Add small margin for safety
+        collision_radius = radius + self.resolution
 
-        if length < 0.001:
-            return False
-
-        direction = direction / length
+        return self._segments_collide(start[None, :], end[None, :], np.array([collision_radius]),
+                                      tip=tip)
 
-        # Number of samples based on resolution
-        num_samples = max(3, int(length / self.resolution))
+    def check_cylinders_collision(self, starts, ends, radius, tip=None):
+        """
+        Check many independent cylindrical segments against the model
 
-        for i in range(num_samples):
-            t = i / (num_samples - 1)
-            point = start + t * direction * length
+        Batched form of check_cylinder_collision: all segments share one
+        broad-phase query.
 
-            # Check if any collision points are within the cylinder radius
-            # Add small margin for safety
-            collision_radius = radius + self.resolution
+        Args:
+            starts: (K, 3) segment start points
+            ends: (K, 3) segment end points
+            radius: Shared cylinder radius, or one radius per segment
+            tip: Optional contact point of the support the segments belong
+                to (see check_cylinder_collision)
 
-            distances, indices = self.kdtree.query(point, k=10)
+        Returns:
+            (K,) bool array, True where the segment collides
+        """
+        starts = np.asarray(starts, dtype=np.float32).reshape(-1, 3)
+        ends = np.asarray(ends, dtype=np.float32).reshape(-1, 3)
+        if not self._collision_enabled or len(starts) == 0:
+            return np.zeros(len(starts), dtype=bool)
 
-            for dist in distances:
-                if dist < collision_radius:
-                    return True
+        radii = np.broadcast_to(np.asarray(radius, dtype=float), (len(starts),))
 
-        return False
+        return self._segment_hits(starts, ends, radii + self.resolution, tip=tip)
 
     def check_path_collision(self, path, radius):
         """
         Check if a path (series of points) collides with the model
 
+        All segments go through one batched broad phase.
+
         Args:
             path: List of [x, y, z] points
-            radius: Path radius
+            radius: Path radius, or a sequence with one radius per segment
 
         Returns:
             bool: True if collision detected
         """
-        if not SupportConfig.COLLISION_CHECK_ENABLED:
+        if not self._collision_enabled:
             return False
 
         if len(path) < 2:
             return False
 
-        # Check each segment
-        for i in range(len(path) - 1):
-            if self.check_cylinder_collision(path[i], path[i+1], radius):
-                return True
+        path = np.asarray(path, dtype=np.float32)
+        segment_radii = np.broadcast_to(np.asarray(radius, dtype=float), (len(path) - 1,))
+
+        return self._segments_collide(path[:-1], path[1:], segment_radii + self.resolution)
+
+    def check_paths_collision(self, paths, radii):
+        """
+        Check many paths against the model in one batch
+
+        Segments from every path share a single broad-phase query, and the
+        results are scattered back per path. Prefer this over calling
+        check_path_collision in a loop when checking all supports at once.
 
-        return False
+        Args:
+            paths: List of paths, each a list of [x, y, z] points
+            radii: Shared radius, or a sequence with one radius per path
+
+        Returns:
+            (P,) bool array, True where the path collides
+        """
+        collides = np.zeros(len(paths), dtype=bool)
+        if not self._collision_enabled or len(paths) == 0:
+            return collides
+
+        radii = np.broadcast_to(np.asarray(radii, dtype=float), (len(paths),))
+
+        starts, ends, segment_radii, path_ids = [], [], [], []
+        for path_idx, path in enumerate(paths):
+            if len(path) < 2:
+                continue
+            path = np.asarray(path, dtype=np.float32)
+            starts.append(path[:-1])
+            ends.append(path[1:])
+            segment_radii.append(np.full(len(path) - 1, radii[path_idx]))
+            path_ids.append(np.full(len(path) - 1, path_idx))
+
+        if not starts:
+            return collides
+
+        path_ids = np.concatenate(path_ids)
+        segment_hits = self._segment_hits(np.vstack(starts), np.vstack(ends),
+                                          np.concatenate(segment_radii) + self.resolution)
+        collides[path_ids[segment_hits]] = True
+        return collides
 
     def get_closest_distance_to_model(self, point):
         """
@@ -127,14 +725,25 @@ class CollisionDetector:
         Returns:
             float: Distance to nearest model surface
         """
-        point = np.array(point)
-        distance, _ = self.kdtree.query(point)
-        return distance
+        point = np.array(point, dtype=float)
+        return float(self._nearest_distances(point[None, :])[0])
+
+    def points_inside(self, points):
+        """
+        Check which points are inside the model volume
+
+        Args:
+            points: (N, 3) array of [x, y, z] positions
+
+        Returns:
+            numpy.array: (N,) boolean array, True where the point is inside
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        return self._ray.contains_points(points)
 
     def is_point_inside_model(self, point):
         """
         Check if a point is inside the model volume
-        Uses ray casting method
 
         Args:
             point: [x, y, z] position
@@ -142,63 +751,66 @@ class CollisionDetector:
         Returns:
             bool: True if point is inside model
         """
-        point = np.array(point)
-
-        # Cast a ray in positive Z direction
-        ray_origin = point.copy()
-        ray_direction = np.array([0, 0, 1])
-
-        # Count intersections
-        locations, index_ray, index_tri = self.mesh.ray.intersects_location(
-            ray_origins=[ray_origin],
-            ray_directions=[ray_direction]
-        )
+        return bool(self.points_inside([point])[0])
 
-        # Odd number of intersections = inside
-        return len(locations) % 2 == 1
-
-    def find_clear_direction(self, point, preferred_direction, radius, search_angles=12):
+    def find_clear_direction(self, point, preferred_direction, radius, search_angles=12,
+                             cone_angle=None):
         """
         Find a clear direction from a point that avoids collisions
 
+        Candidates are spread over a spherical cap around the preferred
+        direction with a Fibonacci spiral, ordered by increasing deviation,
+        so the closest clear direction wins.
+
         Args:
             point: Starting point [x, y, z]
             preferred_direction: Preferred direction vector
             radius: Support radius
-            search_angles: Number of angles to search around preferred direction
+            search_angles: Number of directions to sample on the cap
+            cone_angle: Half-angle of the cap in degrees
+                (default: SupportConfig.MAX_ROUTING_ANGLE)
 
         Returns:
             numpy.array: Clear direction vector, or None if no clear path
         """
-        point = np.array(point)
-        preferred_direction = np.array(preferred_direction)
+        if cone_angle is None:
+            cone_angle = SupportConfig.MAX_ROUTING_ANGLE
+
+        point = np.asarray(point, dtype=np.float32)
+        preferred_direction = np.asarray(preferred_direction, dtype=float)
         preferred_direction = preferred_direction / np.linalg.norm(preferred_direction)
 
-        # Try preferred direction first
-        test_point = point + preferred_direction * (self.resolution * 2)
-        if not self.check_cylinder_collision(point, test_point, radius):
-            return preferred_direction
-
-        # Create a set of test directions around the preferred direction
-        # Use spherical coordinates to sample directions
-        for angle in np.linspace(0, 2*np.pi, search_angles, endpoint=False):
-            # Rotate around Z axis
-            cos_a = np.cos(angle)
-            sin_a = np.sin(angle)
-
-            # Create rotation matrix around Z axis
-            rotation = np.array([
-                [cos_a, -sin_a, 0],
-                [sin_a, cos_a, 0],
-                [0, 0, 1]
+        # Fibonacci spiral on the cap around +Z; index 0 is the pole itself,
+        # i.e. the preferred direction is always tried first
+        i = np.arange(max(1, search_angles))
+        phi = i * np.pi * (3 - np.sqrt(5))
+        z = 1 - (1 - np.cos(np.radians(cone_angle))) * i / len(i)
+        r = np.sqrt(np.maximum(0.0, 1 - z * z))
+        cap = np.column_stack([r * np.cos(phi), r * np.sin(phi), z])
+
+        directions = cap @ _rotation_from_z(preferred_direction).T
+
+        step = self._resolution2x
+        test_points = (point + directions * step).astype(np.float32)
+        collision_radius_sq = (radius + self.resolution) ** 2
+
+        # Every test segment starts at `point`, so one ball query around it
+        # covers the candidates for the whole fan
+        candidates = self._points_within(point[None, :], [step + radius + self.resolution])[0]
+        if len(candidates) > 0:
+            candidate_points = self.collision_points[candidates]
+            fan_hits = np.array([
+                np.any(point_segment_distances_sq(candidate_points, point, end) < collision_radius_sq)
+                for end in test_points
             ])
+        else:
+            fan_hits = np.zeros(len(directions), dtype=bool)
 
-            # Rotate preferred direction
-            test_direction = rotation @ preferred_direction
-            test_point = point + test_direction * (self.resolution * 2)
-
-            if not self.check_cylinder_collision(point, test_point, radius):
-                return test_direction
+        # Confirm the first directions that pass the narrow phase with the
+        # full check (covers the large-face refinement)
+        for idx in np.flatnonzero(~fan_hits):
+            if not self.check_cylinder_collision(point, test_points[idx], radius):
+                return directions[idx]
 
         # No clear direction found
         return None
@@ -214,25 +826,49 @@ class CollisionDetector:
         Returns:
             tuple: (hit_point, hit_distance) or (None, None) if no hit
         """
-        start_point = np.array(start_point)
+        hit_points, hit_distances = self.raycast_to_buildplate_batch([start_point], direction)
 
-        if direction is None:
-            direction = np.array([0, 0, -1])  # Downward
-        else:
-            direction = np.array(direction)
-            direction = direction / np.linalg.norm(direction)
+        if np.isnan(hit_distances[0]):
+            return None, None
 
-        # Cast ray
-        locations, index_ray, index_tri = self.mesh.ray.intersects_location(
-            ray_origins=[start_point],
-            ray_directions=[direction]
-        )
+        return hit_points[0], hit_distances[0]
 
-        if len(locations) == 0:
-            return None, None
+    def raycast_to_buildplate_batch(self, start_points, direction=None):
+        """
+        Raycast many points toward the build plate in one BVH query
+
+        Only the first hit per ray is traced; the hit point is recovered by
+        intersecting the ray with the plane of the triangle it hit.
+
+        Args:
+            start_points: (N, 3) array of starting points
+            direction: Shared direction vector (default: downward)
 
-        # Find closest intersection
-        distances = np.linalg.norm(locations - start_point, axis=1)
-        closest_idx = np.argmin(distances)
+        Returns:
+            tuple: ((N, 3) hit points, (N,) hit distances), NaN where a ray
+                misses the model
+        """
+        start_points = np.asarray(start_points, dtype=float).reshape(-1, 3)
+
+        if direction is None:
+            direction = np.array([0.0, 0.0, -1.0])  # Downward
+        else:
+            direction = np.asarray(direction, dtype=float)
+            direction = direction / np.linalg.norm(direction)
 
-        return locations[closest_idx], distances[closest_idx]
+        directions = np.broadcast_to(direction, start_points.shape)
+        index_tri = self._ray.intersects_first(ray_origins=start_points,
+                                               ray_directions=directions)
+
+        hit_distances = np.full(len(start_points), np.nan)
+        hit = np.flatnonzero(index_tri >= 0)
+        if len(hit) > 0:
+            # Ray-plane intersection with each hit triangle
+            tris = index_tri[hit]
+            normals = self.mesh.face_normals[tris]
+            to_plane = self.mesh.triangles[tris, 0] - start_points[hit]
+            hit_distances[hit] = (np.einsum('ij,ij->i', normals, to_plane) /
+                                  (normals @ direction))
+
+        hit_points = start_points + hit_distances[:, None] * direction
+        return hit_points, hit_distances
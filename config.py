@@ -3,6 +3,8 @@ Configuration for the Battlefield Support Generator
 Default values optimized for Anycubic Photon Mono 4 with Elegoo ABS-Like V3+ resin
 """
 
+from dataclasses import dataclass, field, fields, replace
+
 class PrinterConfig:
     """Printer-specific configuration"""
 
@@ -81,9 +83,11 @@ class SupportConfig:
     # Collision avoidance and routing
     COLLISION_CHECK_ENABLED = True  # Check for collisions with model
     COLLISION_RESOLUTION = 0.5  # mm - resolution for collision checking
+    COLLISION_KDTREE_LEAFSIZE = 32  # points per KD-tree leaf - 32 beat the default 16 on query-heavy runs
     ROUTING_STEP_SIZE = 0.5  # mm - step size for pathfinding
     MAX_ROUTING_ANGLE = 30.0  # degrees - maximum bend angle per segment
     LATERAL_ROUTING_ENABLED = True  # Allow supports to route laterally
+    ROUTING_WORKERS = None  # processes for support routing and geometry (None = all CPUs, 1 = serial)
 
     # Detection thresholds - optimized for modern resins
     MAX_BRIDGE_LENGTH = 6.0  # mm - increased from 5mm (ABS-like resins handle this)
@@ -123,6 +127,7 @@ class AnalysisConfig:
 
     # Slicing
     SLICE_LAYER_HEIGHT = 0.05  # mm
+    SLICE_WORKERS = None  # processes for island slicing (None = all CPUs, 1 = serial)
 
     # Island detection
     MIN_ISLAND_PERIMETER = 1.0  # mm
@@ -138,11 +143,90 @@ class AnalysisConfig:
     BRIDGE_SAMPLE_POINTS = 20  # number of points to sample along potential bridges
     BRIDGE_MIN_LENGTH = 1.0  # mm - minimum bridge length to consider
 
+    # Heightmap precheck
+    PLATE_CONTACT_TOLERANCE = 0.5  # mm - overhangs this close to the bottom rest on the plate
+
     # Mesh analysis
     MESH_REPAIR = True  # attempt to repair non-manifold meshes
     MERGE_TOLERANCE = 0.001  # mm - tolerance for merging nearby vertices
 
 
+def config_snapshot():
+    """Current detection and support settings, which may have been overridden at runtime"""
+    return {
+        config: {name: value for name, value in vars(config).items() if name.isupper()}
+        for config in (AnalysisConfig, SupportConfig)
+    }
+
+
+def apply_config_snapshot(snapshot):
+    """
+    Re-apply settings captured by config_snapshot
+
+    Spawned worker processes re-import config with its defaults, so pool
+    initializers call this before building anything from the config.
+    """
+    for config, settings in snapshot.items():
+        for name, value in settings.items():
+            setattr(config, name, value)
+
+
+def _override(config):
+    """RunConfig field overriding the same-named UPPER_CASE attribute of config"""
+    return field(default=None, metadata={'config': config})
+
+
+@dataclass(frozen=True, slots=True)
+class RunConfig:
+    """
+    Per-run overrides of the config class defaults (CLI flags, presets)
+
+    Built once from the command line and applied in one place, instead of
+    assigning config attributes one by one. Each field overrides the
+    attribute with the same name in upper case; fields left as None keep
+    the class default.
+    """
+
+    support_tip_diameter: float = _override(SupportConfig)
+    support_base_diameter: float = _override(SupportConfig)
+    support_tip_diameter_micro: float = _override(SupportConfig)
+    support_spacing: float = _override(SupportConfig)
+    edge_support_spacing: float = _override(SupportConfig)
+    max_overhang_angle: float = _override(SupportConfig)
+    max_bridge_length: float = _override(SupportConfig)
+    min_island_area: float = _override(SupportConfig)
+    merge_radius: float = _override(SupportConfig)
+    safety_margin: float = _override(SupportConfig)
+    slice_layer_height: float = _override(AnalysisConfig)
+    slice_workers: int = _override(AnalysisConfig)
+    routing_workers: int = _override(SupportConfig)
+
+    def replace(self, **changes):
+        """Copy of this config with the given fields changed"""
+        return replace(self, **changes)
+
+    def apply(self):
+        """Write every field that is set onto its config class"""
+        for run_field in fields(self):
+            value = getattr(self, run_field.name)
+            if value is not None:
+                setattr(run_field.metadata['config'], run_field.name.upper(), value)
+
+
+# Miniature mode: aggressive detail preservation, replaces the per-flag settings
+MINIATURE_RUN_CONFIG = RunConfig(
+    support_spacing=5.0,  # Very sparse
+    edge_support_spacing=3.0,
+    max_overhang_angle=55.0,  # Let resin self-support more
+    max_bridge_length=7.0,  # Longer bridges
+    min_island_area=1.0,  # Skip tiny islands
+    merge_radius=2.0,  # Aggressive merging
+    safety_margin=1.0,  # No safety margin
+    support_tip_diameter=0.25,  # Smaller tips
+    support_base_diameter=0.7,  # Thinner supports
+)
+
+
 def get_config():
     """Get default configuration as dictionary"""
     return {
@@ -14,95 +14,65 @@ import trimesh
 # - Weapons (bridges/islands)
 # - Head (small overhang on top)
 
+# Rotation that lays a Z-aligned cylinder along X
+HORIZONTAL = trimesh.transformations.rotation_matrix(np.pi/2, [0, 1, 0])[:3, :3]
+
+
 def create_test_mech():
     """Create a test mech model with support challenges"""
 
-    meshes = []
+    # Accumulate raw vertex/face arrays and build a single Trimesh at the
+    # end, instead of transforming and concatenating a Trimesh per part
+    verts_list = []
+    faces_list = []
+    offset = 0
+
+    def add_part(part, translation, rotation=None):
+        nonlocal offset
+        verts = part.vertices
+        if rotation is not None:
+            verts = verts @ rotation.T
+        verts_list.append(verts + translation)
+        faces_list.append(part.faces + offset)
+        offset += len(part.vertices)
 
     # Torso - main body (slightly angled trapezoid)
-    torso = trimesh.creation.box(extents=[8, 6, 10])
-    torso.apply_translation([0, 0, 12])
-    meshes.append(torso)
+    add_part(trimesh.creation.box(extents=[8, 6, 10]), [0, 0, 12])
 
     # Legs - two cylinders for stability
-    leg_left = trimesh.creation.cylinder(radius=2, height=10, sections=16)
-    leg_left.apply_translation([-3, 0, 5])
-    meshes.append(leg_left)
-
-    leg_right = trimesh.creation.cylinder(radius=2, height=10, sections=16)
-    leg_right.apply_translation([3, 0, 5])
-    meshes.append(leg_right)
+    add_part(trimesh.creation.cylinder(radius=2, height=10, sections=16), [-3, 0, 5])
+    add_part(trimesh.creation.cylinder(radius=2, height=10, sections=16), [3, 0, 5])
 
     # Arms - extended horizontally (will need supports)
-    # Left arm
-    arm_left = trimesh.creation.cylinder(radius=1.5, height=8, sections=12)
-    # Rotate to horizontal
-    arm_left.apply_transform(trimesh.transformations.rotation_matrix(
-        np.pi/2, [0, 1, 0]
-    ))
-    arm_left.apply_translation([-8, 0, 12])
-    meshes.append(arm_left)
-
-    # Right arm
-    arm_right = trimesh.creation.cylinder(radius=1.5, height=8, sections=12)
-    arm_right.apply_transform(trimesh.transformations.rotation_matrix(
-        np.pi/2, [0, 1, 0]
-    ))
-    arm_right.apply_translation([8, 0, 12])
-    meshes.append(arm_right)
+    add_part(trimesh.creation.cylinder(radius=1.5, height=8, sections=12), [-8, 0, 12], HORIZONTAL)
+    add_part(trimesh.creation.cylinder(radius=1.5, height=8, sections=12), [8, 0, 12], HORIZONTAL)
 
     # Shoulder joints
-    shoulder_left = trimesh.creation.icosphere(radius=2, subdivisions=2)
-    shoulder_left.apply_translation([-5, 0, 12])
-    meshes.append(shoulder_left)
-
-    shoulder_right = trimesh.creation.icosphere(radius=2, subdivisions=2)
-    shoulder_right.apply_translation([5, 0, 12])
-    meshes.append(shoulder_right)
+    add_part(trimesh.creation.icosphere(radius=2, subdivisions=2), [-5, 0, 12])
+    add_part(trimesh.creation.icosphere(radius=2, subdivisions=2), [5, 0, 12])
 
     # Weapons on arms (small cylinders - potential bridges)
-    weapon_left = trimesh.creation.cylinder(radius=0.5, height=6, sections=8)
-    weapon_left.apply_transform(trimesh.transformations.rotation_matrix(
-        np.pi/2, [0, 1, 0]
-    ))
-    weapon_left.apply_translation([-12, 2, 12])
-    meshes.append(weapon_left)
-
-    weapon_right = trimesh.creation.cylinder(radius=0.5, height=6, sections=8)
-    weapon_right.apply_transform(trimesh.transformations.rotation_matrix(
-        np.pi/2, [0, 1, 0]
-    ))
-    weapon_right.apply_translation([12, -2, 12])
-    meshes.append(weapon_right)
+    add_part(trimesh.creation.cylinder(radius=0.5, height=6, sections=8), [-12, 2, 12], HORIZONTAL)
+    add_part(trimesh.creation.cylinder(radius=0.5, height=6, sections=8), [12, -2, 12], HORIZONTAL)
 
     # Head - small box on top (overhang)
-    head = trimesh.creation.box(extents=[4, 4, 3])
-    head.apply_translation([0, 0, 18.5])
-    meshes.append(head)
+    add_part(trimesh.creation.box(extents=[4, 4, 3]), [0, 0, 18.5])
 
     # Cockpit canopy (angled face)
-    canopy = trimesh.creation.box(extents=[3, 3, 2])
-    canopy.apply_translation([0, 2, 18])
-    meshes.append(canopy)
+    add_part(trimesh.creation.box(extents=[3, 3, 2]), [0, 2, 18])
 
     # Antenna (thin cylinder - island risk)
-    antenna = trimesh.creation.cylinder(radius=0.3, height=4, sections=8)
-    antenna.apply_translation([0, 0, 22])
-    meshes.append(antenna)
+    add_part(trimesh.creation.cylinder(radius=0.3, height=4, sections=8), [0, 0, 22])
 
     # Create backpack/jump jets (overhang on back)
-    backpack = trimesh.creation.box(extents=[6, 2, 6])
-    backpack.apply_translation([0, -4, 14])
-    meshes.append(backpack)
-
-    # Combine all meshes
-    combined = trimesh.util.concatenate(meshes)
+    add_part(trimesh.creation.box(extents=[6, 2, 6]), [0, -4, 14])
 
-    # Move so bottom is at Z=0
-    bounds = combined.bounds
-    combined.apply_translation([0, 0, -bounds[0, 2]])
+    # Combine all parts, moving the bottom to Z=0
+    vertices = np.vstack(verts_list)
+    vertices[:, 2] -= vertices[:, 2].min()
 
-    return combined
+    # process=False skips vertex merging/validation, matching concatenate
+    return trimesh.Trimesh(vertices=vertices, faces=np.vstack(faces_list), process=False)
 
 if __name__ == '__main__':
     print("Creating test mech model...")
@@ -8,6 +8,110 @@ import trimesh
 from config import SupportConfig
 
 
+def _path_frames(path):
+    """
+    Local frame at each point of a swept path
+
+    The direction points toward the next point at the start, from the
+    previous point at the end, and is the sum of both (i.e. the central
+    difference) in between. Cross products against the fixed reference
+    axis are written out per component, which avoids np.cross overhead on
+    the short paths supports use.
+
+    Args:
+        path: (N, 3) array of points, N >= 2
+
+    Returns:
+        tuple: (directions, rights, ups), each an (N, 3) array of unit vectors
+    """
+    directions = np.empty_like(path)
+    directions[0] = path[1] - path[0]
+    directions[-1] = path[-1] - path[-2]
+    directions[1:-1] = path[2:] - path[:-2]
+
+    return _direction_frames(directions)
+
+
+def _direction_frames(directions):
+    """
+    Local frame for each of a set of sweep directions (see _path_frames)
+
+    Args:
+        directions: (N, 3) array of unnormalized directions
+
+    Returns:
+        tuple: (directions, rights, ups), each an (N, 3) array of unit vectors
+    """
+    directions = directions / (np.sqrt(np.einsum('ij,ij->i', directions, directions))[:, None] + 1e-6)
+    dx, dy, dz = directions.T
+
+    # Create perpendicular vectors for each circle plane, starting from a
+    # reference axis that isn't close to parallel with the direction:
+    # right = direction x +Z, or direction x +X near vertical
+    near_vertical = np.abs(dz) >= 0.9
+    right = np.empty_like(directions)
+    right[:, 0] = np.where(near_vertical, 0.0, dy)
+    right[:, 1] = np.where(near_vertical, dz, -dx)
+    right[:, 2] = np.where(near_vertical, -dy, 0.0)
+    right /= np.sqrt(np.einsum('ij,ij->i', right, right))[:, None] + 1e-6
+    rx, ry, rz = right.T
+
+    # up = right x direction
+    up = np.column_stack([ry * dz - rz * dy, rz * dx - rx * dz, rx * dy - ry * dx])
+    up /= np.sqrt(np.einsum('ij,ij->i', up, up))[:, None] + 1e-6
+
+    return directions, right, up
+
+
+def stack_arrays(parts):
+    """
+    Stack (vertices, faces) pairs into one vertex and one face array
+
+    Both buffers are allocated once at the final size and face indices
+    are offset in place while copying.
+
+    Args:
+        parts: Non-empty list of ((N, 3) vertex array, (M, 3) face array)
+
+    Returns:
+        tuple: ((sum N, 3) float64 vertex array, (sum M, 3) int64 face array)
+    """
+    vertex_counts = [len(part_vertices) for part_vertices, _ in parts]
+    face_counts = [len(part_faces) for _, part_faces in parts]
+    vertices = np.empty((sum(vertex_counts), 3), dtype=np.float64)
+    faces = np.empty((sum(face_counts), 3), dtype=np.int64)
+
+    v_start = f_start = 0
+    for (part_vertices, part_faces), v_count, f_count in zip(parts, vertex_counts, face_counts):
+        vertices[v_start:v_start + v_count] = part_vertices
+        np.add(part_faces, v_start, out=faces[f_start:f_start + f_count])
+        v_start += v_count
+        f_start += f_count
+
+    return vertices, faces
+
+
+def concatenate_meshes(meshes):
+    """
+    Combine meshes into one by stacking their vertex and face arrays
+
+    Unlike trimesh.util.concatenate this does not merge visuals, normals or
+    metadata and skips all processing, which is what dominates when joining
+    hundreds of small support meshes.
+
+    Args:
+        meshes: List of Trimesh objects
+
+    Returns:
+        Trimesh object, or None if the list is empty
+    """
+    if not meshes:
+        return None
+
+    vertices, faces = stack_arrays([(mesh.vertices, mesh.faces) for mesh in meshes])
+    return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+
+
 class CurvedSupportGenerator:
     """Generate curved support structures along paths"""
 
@@ -16,6 +120,20 @@ class CurvedSupportGenerator:
         self.segments_per_mm = 2  # Resolution of curve
         self.radial_segments = 12  # Number of sides in cylinder
 
+    @property
+    def radial_segments(self):
+        """Number of sides in cylinder"""
+        return self._radial_segments
+
+    @radial_segments.setter
+    def radial_segments(self, value):
+        # Circle angles are the same for every ring of every support, so
+        # compute them once per setting rather than per sweep
+        self._radial_segments = value
+        angles = 2 * np.pi * np.arange(value) / value
+        self._cos_angles = np.cos(angles)
+        self._sin_angles = np.sin(angles)
+
     def create_curved_support(self, path, tip_radius, base_radius=None):
         """
         Create a curved support following a path
@@ -28,6 +146,66 @@ class CurvedSupportGenerator:
         Returns:
             Trimesh object of curved support
         """
+        arrays = self._curved_support_arrays(path, tip_radius, base_radius)
+        if arrays is None:
+            return None
+
+        vertices, faces = arrays
+        return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+
+    def create_curved_supports(self, paths, tip_radii, base_radii):
+        """
+        Create curved supports for many paths as a single mesh
+
+        Equivalent to concatenating create_curved_support for every path,
+        but each sweep stays as raw arrays that are copied once into the
+        combined buffers, so no per-support Trimesh is ever built.
+
+        Args:
+            paths: List of paths, each a list of [x, y, z] waypoints
+            tip_radii: Tip radius for each path
+            base_radii: Base radius for each path
+
+        Returns:
+            tuple: (Trimesh object or None if no path produced geometry,
+                number of supports generated)
+        """
+        parts = self.curved_support_arrays(paths, tip_radii, base_radii)
+        if not parts:
+            return None, 0
+
+        vertices, faces = stack_arrays(parts)
+        return trimesh.Trimesh(vertices=vertices, faces=faces, process=False), len(parts)
+
+    def curved_support_arrays(self, paths, tip_radii, base_radii):
+        """
+        Vertex and face arrays of a curved support for each of many paths
+
+        For callers that stack the sweeps together with other geometry
+        (see stack_arrays). Degenerate paths are left out.
+
+        Args:
+            paths: List of paths, each a list of [x, y, z] waypoints
+            tip_radii: Tip radius for each path
+            base_radii: Base radius for each path
+
+        Returns:
+            list: (vertices, faces) array pairs, one per generated support
+        """
+        parts = []
+        for path, tip_radius, base_radius in zip(paths, tip_radii, base_radii):
+            arrays = self._curved_support_arrays(path, tip_radius, base_radius)
+            if arrays is not None:
+                parts.append(arrays)
+        return parts
+
+    def _curved_support_arrays(self, path, tip_radius, base_radius=None):
+        """
+        Vertex and face arrays of a curved support (see create_curved_support)
+
+        Returns:
+            tuple: (vertices, faces) arrays, or None for a degenerate path
+        """
         if len(path) < 2:
             return None
 
@@ -35,72 +213,58 @@ class CurvedSupportGenerator:
             base_radius = tip_radius
 
         # Ensure path is numpy array
-        path = [np.array(p, dtype=float) for p in path]
+        path = np.asarray(path, dtype=float)
 
         # Interpolate path for smooth curve
-        interpolated_path = self._interpolate_path(path)
+        interpolated_path, arc_length = self._interpolate_path(path)
 
         if len(interpolated_path) < 2:
             return None
 
-        # Calculate radius at each point (taper from tip to base)
-        total_length = self._path_length(interpolated_path)
-        radii = []
-        current_length = 0.0
-
-        for i in range(len(interpolated_path)):
-            if i > 0:
-                segment_length = np.linalg.norm(
-                    interpolated_path[i] - interpolated_path[i-1]
-                )
-                current_length += segment_length
+        # Calculate radius at each point (taper from tip to base), based on
+        # distance along path
+        total_length = arc_length[-1]
+        t = arc_length / total_length if total_length > 0 else np.zeros_like(arc_length)
+        radii = tip_radius + t * (base_radius - tip_radius)
 
-            # Interpolate radius based on distance along path
-            t = current_length / total_length if total_length > 0 else 0
-            radius = tip_radius + t * (base_radius - tip_radius)
-            radii.append(radius)
-
-        # Create mesh by sweeping circle along path
-        mesh = self._sweep_circle_along_path(interpolated_path, radii)
-
-        return mesh
+        # Sweep circle along path
+        return self._sweep_arrays(interpolated_path, radii)
 
     def _interpolate_path(self, path):
         """
         Interpolate path with more points for smooth curves
 
+        Each segment is split into max(2, length * segments_per_mm) steps,
+        so the original waypoints are kept exactly.
+
         Args:
             path: List of waypoints
 
         Returns:
-            List of interpolated points
+            tuple: ((N, 3) array of interpolated points, (N,) cumulative
+                arc length at each point)
         """
+        path = np.asarray(path, dtype=float)
         if len(path) < 2:
-            return path
+            return path, np.zeros(len(path))
 
-        interpolated = [path[0]]
+        segments = np.diff(path, axis=0)
+        segment_lengths = np.linalg.norm(segments, axis=1)
 
-        for i in range(len(path) - 1):
-            start = path[i]
-            end = path[i + 1]
-            segment_length = np.linalg.norm(end - start)
+        # Number of interpolation points per segment, generated in one pass
+        counts = np.maximum(2, (segment_lengths * self.segments_per_mm).astype(int))
+        segment_ids = np.repeat(np.arange(len(counts)), counts)
+        first_point = np.cumsum(counts) - counts
+        t = (np.arange(counts.sum()) - first_point[segment_ids] + 1) / counts[segment_ids]
 
-            # Number of interpolation points
-            num_points = max(2, int(segment_length * self.segments_per_mm))
+        interpolated = path[segment_ids] + t[:, None] * segments[segment_ids]
 
-            for j in range(1, num_points + 1):
-                t = j / num_points
-                point = start + t * (end - start)
-                interpolated.append(point)
+        # Points are evenly spaced within a segment, so arc length follows
+        # from the segment prefix sums without measuring the new points
+        segment_starts = np.cumsum(segment_lengths) - segment_lengths
+        arc_length = segment_starts[segment_ids] + t * segment_lengths[segment_ids]
 
-        return interpolated
-
-    def _path_length(self, path):
-        """Calculate total path length"""
-        length = 0.0
-        for i in range(len(path) - 1):
-            length += np.linalg.norm(path[i+1] - path[i])
-        return length
+        return np.vstack([path[:1], interpolated]), np.concatenate([[0.0], arc_length])
 
     def _sweep_circle_along_path(self, path, radii):
         """
@@ -113,114 +277,100 @@ class CurvedSupportGenerator:
         Returns:
             Trimesh object
         """
-        if len(path) < 2 or len(radii) != len(path):
+        arrays = self._sweep_arrays(path, radii)
+        if arrays is None:
             return None
 
-        vertices = []
-        faces = []
-
-        # For each point along path, create a circle perpendicular to path direction
-        for i, (center, radius) in enumerate(zip(path, radii)):
-            # Calculate local coordinate system
-            if i == 0:
-                # First point: use direction to next point
-                direction = path[i+1] - path[i]
-            elif i == len(path) - 1:
-                # Last point: use direction from previous point
-                direction = path[i] - path[i-1]
-            else:
-                # Middle points: average of directions
-                dir1 = path[i] - path[i-1]
-                dir2 = path[i+1] - path[i]
-                direction = dir1 + dir2
-
-            direction = direction / (np.linalg.norm(direction) + 1e-6)
-
-            # Create perpendicular vectors for circle plane
-            # Find a vector perpendicular to direction
-            if abs(direction[2]) < 0.9:
-                up = np.array([0, 0, 1])
-            else:
-                up = np.array([1, 0, 0])
-
-            right = np.cross(direction, up)
-            right = right / (np.linalg.norm(right) + 1e-6)
-
-            up = np.cross(right, direction)
-            up = up / (np.linalg.norm(up) + 1e-6)
-
-            # Create circle vertices
-            circle_vertices = []
-            for j in range(self.radial_segments):
-                angle = 2 * np.pi * j / self.radial_segments
-                offset = radius * (np.cos(angle) * right + np.sin(angle) * up)
-                vertex = center + offset
-                circle_vertices.append(vertex)
-
-            # Add vertices to list
-            vertex_start_idx = len(vertices)
-            vertices.extend(circle_vertices)
-
-            # Create faces connecting to previous circle
-            if i > 0:
-                prev_start = vertex_start_idx - self.radial_segments
-                curr_start = vertex_start_idx
-
-                for j in range(self.radial_segments):
-                    next_j = (j + 1) % self.radial_segments
-
-                    # Two triangles per quad
-                    # Triangle 1
-                    faces.append([
-                        prev_start + j,
-                        curr_start + j,
-                        prev_start + next_j
-                    ])
-
-                    # Triangle 2
-                    faces.append([
-                        curr_start + j,
-                        curr_start + next_j,
-                        prev_start + next_j
-                    ])
-
-        # Add caps at both ends
-        if len(vertices) >= self.radial_segments * 2:
-            # Bottom cap
-            bottom_center_idx = len(vertices)
-            vertices.append(path[0])
-
-            for j in range(self.radial_segments):
-                next_j = (j + 1) % self.radial_segments
-                faces.append([bottom_center_idx, next_j, j])
-
-            # Top cap
-            top_center_idx = len(vertices)
-            vertices.append(path[-1])
-
-            top_start = len(vertices) - self.radial_segments - 2
-
-            for j in range(self.radial_segments):
-                next_j = (j + 1) % self.radial_segments
-                faces.append([
-                    top_center_idx,
-                    top_start + j,
-                    top_start + next_j
-                ])
-
-        # Create mesh
-        if len(vertices) < 3 or len(faces) < 1:
+        vertices, faces = arrays
+        return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+
+    def _sweep_arrays(self, path, radii):
+        """
+        Vertex and face arrays of a swept circle (see _sweep_circle_along_path)
+
+        Returns:
+            tuple: (vertices, faces) arrays, or None for a degenerate path
+        """
+        if len(path) < 2 or len(radii) != len(path):
             return None
 
-        vertices = np.array(vertices)
-        faces = np.array(faces)
+        path = np.asarray(path, dtype=float)
+        radii = np.asarray(radii, dtype=float)
+        num_rings = len(path)
+
+        _, right, up = _path_frames(path)
+
+        rs = self.radial_segments
+        num_ring_vertices = num_rings * rs
+
+        # Ring vertices followed by the two cap centers in one buffer
+        vertices = np.empty((num_ring_vertices + 2, 3))
+
+        # Create all circle vertices at once: (rings, radial_segments, 3),
+        # flattened ring by ring
+        offsets = (self._cos_angles[None, :, None] * right[:, None, :] +
+                   self._sin_angles[None, :, None] * up[:, None, :])
+        vertices[:num_ring_vertices] = (path[:, None, :] + radii[:, None, None] * offsets).reshape(-1, 3)
+        vertices[num_ring_vertices] = path[0]
+        vertices[num_ring_vertices + 1] = path[-1]
+
+        faces = self._sweep_faces(num_rings)
+
+        # Winding is consistent by construction, so skip the adjacency-based
+        # fix_normals pass; a sweep that folds back on itself can still come
+        # out inside-out (negative signed volume), which a single flip corrects
+        tris = vertices[faces]
+        signed_volume = np.einsum('ij,ij->', tris[:, 0], np.cross(tris[:, 1], tris[:, 2]))
+        if signed_volume < 0:
+            faces = faces[:, ::-1]
 
-        mesh = trimesh.Trimesh(vertices=vertices, faces=faces)
+        return vertices, faces
 
-        # Fix normals
-        mesh.fix_normals()
+    def _sweep_faces(self, num_rings):
+        """
+        Face indices of a swept circle with `num_rings` rings
+
+        Vertices are expected ring by ring followed by the start and end cap
+        centers, as laid out by _sweep_arrays.
+
+        Args:
+            num_rings: Number of rings along the path (>= 2)
 
-        return mesh
+        Returns:
+            (F, 3) int64 array of side faces followed by the two caps
+        """
+        # Create faces connecting each circle to the previous one: two
+        # triangles per quad, written as a (rings - 1, radial_segments, 2, 3)
+        # view of the side faces
+        rs = self.radial_segments
+        num_ring_vertices = num_rings * rs
+        num_side_faces = 2 * rs * (num_rings - 1)
+        faces = np.empty((num_side_faces + 2 * rs, 3), dtype=np.int64)
+
+        j = np.arange(rs)
+        next_j = (j + 1) % rs
+        prev_start = (np.arange(num_rings - 1) * rs)[:, None]
+        curr_start = prev_start + rs
+
+        side = faces[:num_side_faces].reshape(num_rings - 1, rs, 2, 3)
+        side[:, :, 0] = np.stack([prev_start + j, curr_start + j, prev_start + next_j], axis=-1)
+        side[:, :, 1] = np.stack([curr_start + j, curr_start + next_j, prev_start + next_j], axis=-1)
+
+        # Add caps at both ends. The (right, up, direction) frame is
+        # left-handed, so with this ordering the sides and both caps all
+        # wind outward
+        bottom_cap = faces[num_side_faces:num_side_faces + rs]
+        bottom_cap[:, 0] = num_ring_vertices
+        bottom_cap[:, 1] = j
+        bottom_cap[:, 2] = next_j
+
+        top_start = (num_rings - 1) * rs
+        top_cap = faces[num_side_faces + rs:]
+        top_cap[:, 0] = num_ring_vertices + 1
+        top_cap[:, 1] = top_start + next_j
+        top_cap[:, 2] = top_start + j
+
+        return faces
 
     def create_straight_segment(self, start, end, radius_start, radius_end):
         """
@@ -244,6 +394,60 @@ class CurvedSupportGenerator:
 
         return self._sweep_circle_along_path(path, radii)
 
+    def create_straight_segments(self, starts, ends, radii_start, radii_end):
+        """
+        Create many straight tapered segments as a single mesh
+
+        Equivalent to concatenating create_straight_segment for every
+        start/end pair, but all rings, caps and faces are built in one
+        vectorized pass instead of one small sweep per segment.
+
+        Args:
+            starts: (S, 3) segment start points
+            ends: (S, 3) segment end points
+            radii_start: Radius at each start (scalar or (S,) array)
+            radii_end: Radius at each end (scalar or (S,) array)
+
+        Returns:
+            Trimesh object, or None if there are no segments
+        """
+        starts = np.asarray(starts, dtype=float).reshape(-1, 3)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 3)
+        num_segments = len(starts)
+        if num_segments == 0:
+            return None
+
+        # A straight segment has the same frame at both of its rings
+        _, right, up = _direction_frames(ends - starts)
+
+        rs = self.radial_segments
+        offsets = (self._cos_angles[None, :, None] * right[:, None, :] +
+                   self._sin_angles[None, :, None] * up[:, None, :])
+        radii_start = np.broadcast_to(np.asarray(radii_start, dtype=float), (num_segments,))
+        radii_end = np.broadcast_to(np.asarray(radii_end, dtype=float), (num_segments,))
+
+        # Per segment: start ring, end ring, start cap center, end cap
+        # center (the _sweep_arrays layout for a two-ring path)
+        vertices = np.empty((num_segments, 2 * rs + 2, 3))
+        vertices[:, :rs] = starts[:, None, :] + radii_start[:, None, None] * offsets
+        vertices[:, rs:2 * rs] = ends[:, None, :] + radii_end[:, None, None] * offsets
+        vertices[:, 2 * rs] = starts
+        vertices[:, 2 * rs + 1] = ends
+
+        template = self._sweep_faces(2)
+        faces = np.repeat(template[None], num_segments, axis=0)
+
+        # Same inside-out correction as _sweep_arrays, per segment
+        tris = vertices[:, template]
+        signed_volume = np.einsum('sfi,sfi->s', tris[:, :, 0],
+                                  np.cross(tris[:, :, 1], tris[:, :, 2]))
+        faces[signed_volume < 0] = template[:, ::-1]
+
+        faces += (np.arange(num_segments) * (2 * rs + 2))[:, None, None]
+
+        return trimesh.Trimesh(vertices=vertices.reshape(-1, 3),
+                               faces=faces.reshape(-1, 3), process=False)
+
     def create_branching_support(self, trunk_path, branch_points, tip_radius, base_radius):
         """
         Create a support with multiple branches from a main trunk
@@ -257,22 +461,24 @@ class CurvedSupportGenerator:
         Returns:
             Trimesh object combining trunk and branches
         """
-        meshes = []
+        parts = []
 
         # Create main trunk
-        trunk_mesh = self.create_curved_support(trunk_path, tip_radius, base_radius)
-        if trunk_mesh is not None:
-            meshes.append(trunk_mesh)
+        trunk = self._curved_support_arrays(trunk_path, tip_radius, base_radius)
+        if trunk is not None:
+            parts.append(trunk)
 
         # Create branches
         for branch_start, branch_end in branch_points:
             branch_path = [branch_start, branch_end]
-            branch_mesh = self.create_curved_support(branch_path, tip_radius, tip_radius)
-            if branch_mesh is not None:
-                meshes.append(branch_mesh)
-
-        # Combine all meshes
-        if len(meshes) > 0:
-            return trimesh.util.concatenate(meshes)
+            branch = self._curved_support_arrays(branch_path, tip_radius, tip_radius)
+            if branch is not None:
+                parts.append(branch)
+
+        # Combine all parts by stacking their arrays; the parts are
+        # independent, so there is nothing to merge or validate
+        if len(parts) > 0:
+            vertices, faces = stack_arrays(parts)
+            return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
         else:
             return None
@@ -5,6 +5,7 @@ Debug script to check lattice tower clustering
 
 import trimesh
 import numpy as np
+from scipy.spatial.distance import pdist
 from support_structures import SupportGenerator
 from overhang_detector import OverhangDetector
 from island_detector import IslandDetector
@@ -90,13 +91,8 @@ for i, cluster in enumerate(clusters):
 # Calculate distances between endpoints
 print("\nAnalyzing endpoint spacing...")
 if len(endpoints) > 1:
-    distances = []
-    for i in range(len(endpoints)):
-        for j in range(i+1, len(endpoints)):
-            dist_2d = np.linalg.norm(np.array(endpoints[i][:2]) - np.array(endpoints[j][:2]))
-            distances.append(dist_2d)
-
-    distances = np.array(distances)
+    # Pairwise 2D distances (condensed, each pair once)
+    distances = pdist(np.array(endpoints)[:, :2])
     print(f"  Min distance: {distances.min():.2f}mm")
     print(f"  Max distance: {distances.max():.2f}mm")
     print(f"  Mean distance: {distances.mean():.2f}mm")
@@ -3,11 +3,39 @@ Island detection through layer-by-layer slicing
 Islands are regions that appear in a layer without connection to previous layers
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
 import numpy as np
-from shapely.geometry import Polygon, MultiPolygon, Point
+import shapely
+from shapely.geometry import Polygon, MultiPolygon
 from shapely.ops import unary_union
 import trimesh
-from config import AnalysisConfig, SupportConfig
+from config import AnalysisConfig, SupportConfig, apply_config_snapshot, config_snapshot
+from overhang_detector import ISLAND_TYPE, SupportPoints
+
+# Below this many layers per process, pool startup costs more than it saves
+MIN_LAYERS_PER_SLICE_WORKER = 200
+
+# Detector used by slicing worker processes (set by _init_slice_worker)
+_worker_detector = None
+
+
+def _init_slice_worker(vertices, faces, layer_height, snapshot):
+    """Process pool initializer: rebuild the mesh once per worker"""
+    global _worker_detector
+
+    # Re-apply the parent's settings (e.g. CLI overrides) first
+    apply_config_snapshot(snapshot)
+
+    mesh = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+    _worker_detector = IslandDetector(mesh, layer_height)
+
+
+def _process_layer_chunk(slice_heights, start, stop):
+    """Process pool task: slice and find islands in layers [start, stop)"""
+    return _worker_detector._process_layers(slice_heights, start, stop)
 
 
 class IslandDetector:
@@ -38,17 +66,49 @@ class IslandDetector:
 
         print(f"  Slicing {num_layers} layers at {self.layer_height}mm height...")
 
-        # Slice the mesh
-        self.layers = []
+        workers = self._slice_workers(num_layers)
+        if workers > 1:
+            print(f"  Splitting layers across {workers} processes...")
+            self.layers, islands_found = self._process_layers_parallel(slice_heights, workers)
+        else:
+            self.layers, islands_found = self._process_layers(slice_heights, 0, num_layers,
+                                                              report_progress=True)
+
+        self.islands = islands_found
+        print(f"  Found {len(self.islands)} total islands requiring support")
+
+        return self.islands
+
+    def _slice_workers(self, num_layers):
+        """Number of processes to slice num_layers layers with"""
+        workers = AnalysisConfig.SLICE_WORKERS or os.cpu_count() or 1
+        return max(1, min(workers, num_layers // MIN_LAYERS_PER_SLICE_WORKER))
+
+    def _process_layers(self, slice_heights, start, stop, report_progress=False):
+        """
+        Slice layers [start, stop) and find the islands in them
+
+        The layer below start is sliced too, so the first layer of a chunk
+        is compared against its real predecessor.
+
+        Args:
+            slice_heights: Array of all slice heights
+            start: Index of the first layer to process
+            stop: Index one past the last layer to process
+            report_progress: Print progress every 50 layers
+
+        Returns:
+            tuple: (list of layer dicts, list of island support points)
+        """
+        layers = []
         prev_polygons = []
 
         islands_found = []
 
-        for i, z in enumerate(slice_heights):
-            # Slice mesh at this height
-            slice_2d = self.mesh.section(plane_origin=[0, 0, z],
-                                          plane_normal=[0, 0, 1])
+        first = max(0, start - 1)
+        heights = slice_heights[first:stop]
 
+        for i, (z, slice_2d) in enumerate(zip(heights, self._slice_layers(heights)), start=first):
             if slice_2d is None:
                 # No geometry at this layer
                 current_polygons = []
@@ -56,6 +116,11 @@ class IslandDetector:
                 # Convert to 2D polygons
                 current_polygons = self._extract_polygons(slice_2d)
 
+            if i < start:
+                # Previous chunk's last layer, only needed for comparison
+                prev_polygons = current_polygons
+                continue
+
             # Detect islands by comparing with previous layer
             if i > 0 and current_polygons:
                 layer_islands = self._find_layer_islands(
@@ -63,7 +128,7 @@ class IslandDetector:
                 )
                 islands_found.extend(layer_islands)
 
-            self.layers.append({
+            layers.append({
                 'z': z,
                 'polygons': current_polygons,
                 'islands': len(islands_found) if i > 0 else 0
@@ -71,13 +136,96 @@ class IslandDetector:
 
             prev_polygons = current_polygons
 
-            if (i + 1) % 50 == 0:
-                print(f"    Processed {i+1}/{num_layers} layers, found {len(islands_found)} islands so far...")
+            if report_progress and (i + 1) % 50 == 0:
+                print(f"    Processed {i+1}/{len(slice_heights)} layers, found {len(islands_found)} islands so far...")
 
-        self.islands = islands_found
-        print(f"  Found {len(self.islands)} total islands requiring support")
+        return layers, islands_found
 
-        return self.islands
+    def _process_layers_parallel(self, slice_heights, workers):
+        """
+        Process contiguous chunks of layers in a process pool
+
+        Each worker rebuilds the mesh once from its vertex and face arrays,
+        then slices its chunk. Per-layer island counts are offset to stay
+        cumulative across chunks.
+
+        Args:
+            slice_heights: Array of all slice heights
+            workers: Number of worker processes
+
+        Returns:
+            tuple: (list of layer dicts, list of island support points)
+        """
+        bounds = np.linspace(0, len(slice_heights), workers + 1).astype(int)
+
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_slice_worker,
+                                 initargs=(self.mesh.vertices, self.mesh.faces,
+                                           self.layer_height, config_snapshot())) as executor:
+            chunks = list(executor.map(_process_layer_chunk, repeat(slice_heights),
+                                       bounds[:-1], bounds[1:]))
+
+        layers = []
+        islands_found = []
+        for chunk_layers, chunk_islands in chunks:
+            for layer in chunk_layers:
+                layer['islands'] += len(islands_found)
+            layers.extend(chunk_layers)
+            islands_found.extend(chunk_islands)
+            print(f"    Processed {len(layers)}/{len(slice_heights)} layers, found {len(islands_found)} islands so far...")
+
+        return layers, islands_found
+
+    def _slice_layers(self, slice_heights):
+        """
+        Slice the mesh at increasing Z heights
+
+        Triangles are sorted by their lowest Z and kept in an active set
+        while they span the current height, so each layer only intersects
+        the triangles that actually cross it.
+
+        Args:
+            slice_heights: Increasing array of Z heights
+
+        Returns:
+            Generator of Path2D slices in the XY frame (None for empty layers)
+        """
+        triangles = self.mesh.triangles
+        tri_z = triangles[:, :, 2]
+        z_min = tri_z.min(axis=1)
+        z_max = tri_z.max(axis=1)
+
+        order = np.argsort(z_min, kind='stable')
+        z_min_sorted = z_min[order]
+
+        active = np.empty(0, dtype=np.intp)
+        next_start = 0
+
+        for z in slice_heights:
+            # Add triangles that start at or below this height, drop those
+            # that ended below it
+            end = np.searchsorted(z_min_sorted, z, side='right')
+            active = np.concatenate([active, order[next_start:end]])
+            next_start = end
+            active = active[z_max[active] > z]
+
+            if len(active) == 0:
+                yield None
+                continue
+
+            # Vertices on the plane count as below it, so every active
+            # triangle has exactly two edges crossing the plane
+            tris = triangles[active]
+            above = tris[:, :, 2] > z
+            starts = tris
+            ends = np.roll(tris, -1, axis=1)
+            crossing = above != np.roll(above, -1, axis=1)
+
+            dz = ends[:, :, 2] - starts[:, :, 2]
+            t = np.divide(z - starts[:, :, 2], dz, out=np.zeros_like(dz), where=crossing)
+            points = starts[:, :, :2] + t[:, :, None] * (ends[:, :, :2] - starts[:, :, :2])
+
+            yield trimesh.load_path(points[crossing].reshape(-1, 2, 2))
 
     def _extract_polygons(self, slice_2d):
         """
@@ -94,14 +242,14 @@ class IslandDetector:
         try:
             # Get the 2D path
             if hasattr(slice_2d, 'polygons_full'):
-                # Multiple polygons
-                for polygon_data in slice_2d.polygons_full:
-                    shell = polygon_data.exterior.coords
-                    holes = [interior.coords for interior in polygon_data.interiors]
-                    poly = Polygon(shell, holes)
-
-                    if poly.is_valid and poly.area >= SupportConfig.MIN_ISLAND_AREA:
-                        polygons.append(poly)
+                # Multiple polygons. trimesh already repairs invalid loops
+                # when it builds these, so they are used as they are, and
+                # only filtered by area once all of them are collected
+                candidates = np.array([poly for poly in slice_2d.polygons_full if poly is not None],
+                                      dtype=object)
+                if len(candidates) > 0:
+                    keep = shapely.area(candidates) >= SupportConfig.MIN_ISLAND_AREA
+                    polygons = list(candidates[keep])
 
             elif hasattr(slice_2d, 'vertices'):
                 # Single path - try to create polygons from the vertices
@@ -147,41 +295,66 @@ class IslandDetector:
                         islands.append(island_info)
             return islands
 
-        # Create union of all previous polygons for faster checking
-        try:
-            prev_union = unary_union(prev_polygons)
-        except:
-            # If union fails, check against each polygon individually
-            prev_union = None
-
-        for poly in current_polygons:
-            # Check if this polygon overlaps with previous layer
-            is_island = False
-
-            if prev_union is not None:
-                # Use union for efficient checking
-                # Allow small tolerance for connection
-                buffered_prev = prev_union.buffer(AnalysisConfig.ISLAND_CONNECTION_TOLERANCE)
-                if not poly.intersects(buffered_prev):
-                    is_island = True
-            else:
-                # Check against each previous polygon
-                connected = False
-                for prev_poly in prev_polygons:
-                    buffered_prev = prev_poly.buffer(AnalysisConfig.ISLAND_CONNECTION_TOLERANCE)
-                    if poly.intersects(buffered_prev):
-                        connected = True
-                        break
-                if not connected:
-                    is_island = True
-
-            if is_island:
-                island_info = self._create_island_support(poly, z_height)
-                if island_info:
-                    islands.append(island_info)
+        tolerance = AnalysisConfig.ISLAND_CONNECTION_TOLERANCE
+
+        current = np.asarray(current_polygons, dtype=object)
+
+        # Bounding boxes of previous polygons, grown by the connection
+        # tolerance, as a cheap reject before any GEOS call: a (current,
+        # previous) overlap matrix from one shapely.bounds call per layer
+        prev_bounds = shapely.bounds(prev_polygons)
+        prev_bounds[:, :2] -= tolerance
+        prev_bounds[:, 2:] += tolerance
+        cur_bounds = shapely.bounds(current)
+
+        box_overlap = (
+            (prev_bounds[None, :, 0] <= cur_bounds[:, None, 2]) &
+            (prev_bounds[None, :, 2] >= cur_bounds[:, None, 0]) &
+            (prev_bounds[None, :, 1] <= cur_bounds[:, None, 3]) &
+            (prev_bounds[None, :, 3] >= cur_bounds[:, None, 1])
+        )
+
+        # Polygons with no nearby bounding box are islands. Most of the
+        # others overlap a previous polygon outright, which a batched
+        # pairwise test on the raw (unbuffered) polygons settles without
+        # building the grown union at all
+        cur_idx, prev_idx = np.nonzero(box_overlap)
+        prev = np.asarray(prev_polygons, dtype=object)
+        connected = np.zeros(len(current), dtype=bool)
+        connected[cur_idx[shapely.intersects(current[cur_idx], prev[prev_idx])]] = True
+
+        # Only polygons that are near but not touching the previous layer
+        # need the tolerance test against its grown union
+        is_island = ~box_overlap.any(axis=1)
+        undecided = ~is_island & ~connected
+        if np.any(undecided):
+            buffered_prev = self._buffered_union(prev_polygons, tolerance)
+            is_island[undecided] = ~shapely.intersects(buffered_prev, current[undecided])
+
+        for poly in current[is_island]:
+            island_info = self._create_island_support(poly, z_height)
+            if island_info:
+                islands.append(island_info)
 
         return islands
 
+    def _buffered_union(self, polygons, tolerance):
+        """
+        Prepared union of polygons grown by tolerance
+
+        Slice polygons aren't validated up front; if the union trips over
+        an invalid one, the polygons are repaired with buffer(0) and the
+        union is retried.
+        """
+        try:
+            union = unary_union(polygons)
+        except shapely.errors.GEOSException:
+            union = unary_union([poly.buffer(0) for poly in polygons])
+
+        buffered = union.buffer(tolerance)
+        shapely.prepare(buffered)
+        return buffered
+
     def _create_island_support(self, polygon, z_height):
         """
         Create support point information for an island
@@ -229,23 +402,25 @@ class IslandDetector:
         x_samples = np.linspace(minx, maxx, grid_size + 2)[1:-1]
         y_samples = np.linspace(miny, maxy, grid_size + 2)[1:-1]
 
-        for x in x_samples:
-            for y in y_samples:
-                point = Point(x, y)
-                if polygon.contains(point):
-                    supports.append({
-                        'x': x,
-                        'y': y,
-                        'z': z_height,
-                        'area': area / num_supports,
-                        'type': 'island',
-                        'polygon': polygon
-                    })
-
-                if len(supports) >= num_supports:
-                    break
-            if len(supports) >= num_supports:
-                break
+        # Test the whole grid in one call on raw coordinates (no Point
+        # objects), keeping the x-major order of the samples so the first
+        # num_supports inside points are used. The grid lies inside the
+        # bounds by construction, so only the prepared containment test is
+        # needed
+        xs, ys = np.meshgrid(x_samples, y_samples, indexing='ij')
+        xs, ys = xs.ravel(), ys.ravel()
+        shapely.prepare(polygon)
+        inside = shapely.contains_xy(polygon, xs, ys)
+
+        for x, y in zip(xs[inside][:num_supports], ys[inside][:num_supports]):
+            supports.append({
+                'x': x,
+                'y': y,
+                'z': z_height,
+                'area': area / num_supports,
+                'type': 'island',
+                'polygon': polygon
+            })
 
         # If we didn't get enough points, add centroid
         if not supports:
@@ -260,17 +435,33 @@ class IslandDetector:
 
         return supports if len(supports) > 1 else supports[0]
 
+    def get_support_points(self):
+        """
+        Flatten the detected islands into one set of support points
+
+        Large islands are stored as a list of several supports; this
+        unpacks them in island order.
+
+        Returns:
+            SupportPoints of type ISLAND_TYPE
+        """
+        points = [point for island in self.islands
+                  for point in (island if isinstance(island, list) else (island,))]
+        xyz = np.array([[p['x'], p['y'], p['z']] for p in points], dtype=float)
+        area = np.array([p['area'] for p in points], dtype=float)
+        return SupportPoints.from_arrays(xyz, area, ISLAND_TYPE)
+
     def get_island_summary(self):
         """Get summary statistics about detected islands"""
         if not self.islands:
             return "No islands detected"
 
+        # Large islands hold a list of supports whose areas add up to the
+        # island's area, so total over the flattened support points
+        points = self.get_support_points()
         total = len(self.islands)
-        total_area = sum(island['area'] for island in self.islands)
-        z_range = (
-            min(island['z'] for island in self.islands),
-            max(island['z'] for island in self.islands)
-        )
+        total_area = points.area.sum()
+        z_range = (points.xyz[:, 2].min(), points.xyz[:, 2].max())
 
         return f"""Island Detection Summary:
   Total islands: {total}
@@ -3,11 +3,18 @@ Lattice tower generation
 Creates triangular braced lattice towers to consolidate support roots
 """
 
+from itertools import combinations
+
 import numpy as np
-import trimesh
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import ConvexHull, cKDTree
 from config import SupportConfig
 from curved_support import CurvedSupportGenerator
 
+# Hull vertex cap for the largest-triangle search (C(60, 3) = 34220 triples)
+MAX_TRIANGLE_SEARCH_HULL = 60
+
 
 class LatticeTowerGenerator:
     """Generate triangular lattice towers for support consolidation"""
@@ -31,37 +38,29 @@ class LatticeTowerGenerator:
         if spacing is None:
             spacing = SupportConfig.LATTICE_SPACING
 
-        endpoints = [np.array(p) for p in support_endpoints]
-        initial_clusters = []
-        unclustered = set(range(len(endpoints)))
-
-        # Phase 1: Initial clustering based on spacing
-        while unclustered:
-            # Start new cluster with first unclustered point
-            seed_idx = min(unclustered)
-            cluster = [seed_idx]
-            unclustered.remove(seed_idx)
-
-            # Find all points within spacing of cluster
-            changed = True
-            while changed:
-                changed = False
-                to_add = []
-
-                for idx in unclustered:
-                    # Check distance to any point in cluster
-                    for cluster_idx in cluster:
-                        dist = np.linalg.norm(endpoints[idx][:2] - endpoints[cluster_idx][:2])
-                        if dist <= spacing:
-                            to_add.append(idx)
-                            changed = True
-                            break
-
-                for idx in to_add:
-                    cluster.append(idx)
-                    unclustered.remove(idx)
-
-            initial_clusters.append(cluster)
+        if len(support_endpoints) == 0:
+            return []
+        endpoints = np.asarray(support_endpoints, dtype=np.float64)
+
+        # Phase 1: Initial clustering based on spacing. Clusters are the
+        # connected components of the graph linking endpoints within
+        # spacing of each other in XY. The tree is queried once, so skip
+        # the median balancing and node compaction that only pay off for
+        # repeated queries
+        points_2d = np.ascontiguousarray(endpoints[:, :2])
+        tree = cKDTree(points_2d, balanced_tree=False, compact_nodes=False)
+        pairs = tree.query_pairs(spacing, output_type='ndarray')
+        adjacency = csr_matrix(
+            (np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])),
+            shape=(len(endpoints), len(endpoints))
+        )
+        num_clusters, labels = connected_components(adjacency, directed=False)
+
+        # Components are labelled in order of their lowest index; list each
+        # cluster's members in index order
+        order = np.argsort(labels, kind='stable')
+        splits = np.cumsum(np.bincount(labels, minlength=num_clusters))[:-1]
+        initial_clusters = [members.tolist() for members in np.split(order, splits)]
 
         # Phase 2: Subdivide oversized clusters
         final_clusters = []
@@ -83,35 +82,31 @@ class LatticeTowerGenerator:
 
         Args:
             cluster: List of point indices
-            endpoints: List of all endpoint positions
+            endpoints: (N, 3) array of all endpoint positions
             max_size: Maximum cluster size
 
         Returns:
             List of sub-clusters
         """
-        cluster_points = [endpoints[i] for i in cluster]
-
         # Determine number of sub-clusters needed
         num_subclusters = (len(cluster) + max_size - 1) // max_size
+        if num_subclusters <= 1:
+            return [list(cluster)]
 
-        # Use simple spatial subdivision
-        # Sort by X coordinate and divide into strips
-        sorted_indices = sorted(cluster, key=lambda idx: endpoints[idx][0])
-
-        subclusters = []
-        subcluster_size = len(cluster) // num_subclusters
+        # Recursive median split: cut along the axis with the larger XY
+        # spread so sub-towers stay compact on long narrow clusters, with
+        # the cut placed so each side has room for its share of the
+        # sub-clusters (every part ends up with at most max_size points)
+        cluster = np.asarray(cluster)
+        coords = endpoints[cluster, :2]
+        axis = int(np.argmax(coords.var(axis=0)))
+        order = np.argsort(coords[:, axis], kind='stable')
 
-        for i in range(num_subclusters):
-            start = i * subcluster_size
-            if i == num_subclusters - 1:
-                # Last cluster gets remaining points
-                end = len(sorted_indices)
-            else:
-                end = (i + 1) * subcluster_size
-
-            subclusters.append(sorted_indices[start:end])
+        left_parts = num_subclusters // 2
+        split = int(round(len(cluster) * left_parts / num_subclusters))
 
-        return subclusters
+        return (self._subdivide_cluster(cluster[order[:split]].tolist(), endpoints, max_size) +
+                self._subdivide_cluster(cluster[order[split:]].tolist(), endpoints, max_size))
 
     def create_lattice_tower(self, base_points, build_plate_z, tower_height=None):
         """
@@ -130,15 +125,15 @@ class LatticeTowerGenerator:
         if len(base_points) == 0:
             return None, {}
 
-        base_points = [np.array(p) for p in base_points]
+        base_points = np.asarray(base_points, dtype=np.float64)
 
         # Calculate tower parameters
-        center = np.mean([p for p in base_points], axis=0)
+        center = base_points.mean(axis=0)
         center[2] = build_plate_z  # Tower base at build plate
 
         if tower_height is None:
             # Tower height based on highest support point
-            max_z = max(p[2] for p in base_points)
+            max_z = base_points[:, 2].max()
             tower_height = max_z - build_plate_z
 
         # For single or two points, create simple vertical supports
@@ -149,28 +144,29 @@ class LatticeTowerGenerator:
         # Find three vertices that form largest triangle for tower base
         tower_base = self._find_tower_base_triangle(base_points, center[:2])
 
-        # Create main vertical columns at tower vertices
-        meshes = []
+        # Segment endpoints of every column, strut and brace; the meshes
+        # are built together in one batched call below
         attachment_points = {}
+        starts = []
+        ends = []
+        radii = []
 
-        # Main vertical columns
+        # Tower config, read once for all columns and struts
         main_radius = SupportConfig.LATTICE_MAIN_DIAMETER / 2
         strut_radius = SupportConfig.LATTICE_STRUT_DIAMETER / 2
+        brace_angle = SupportConfig.LATTICE_BRACE_ANGLE
 
         tower_top_z = build_plate_z + tower_height
-        tower_vertices = []
 
+        # Main vertical columns
         for vertex_xy in tower_base:
             bottom = np.array([vertex_xy[0], vertex_xy[1], build_plate_z])
             top = np.array([vertex_xy[0], vertex_xy[1], tower_top_z])
-            tower_vertices.append((bottom, top))
 
-            # Create vertical column
-            column = self.curved_generator.create_straight_segment(
-                bottom, top, main_radius, main_radius
-            )
-            if column is not None:
-                meshes.append(column)
+            # Vertical column
+            starts.append(bottom)
+            ends.append(top)
+            radii.append(main_radius)
 
         # Horizontal bracing at multiple heights
         num_levels = max(3, int(tower_height / 10.0))
@@ -184,17 +180,11 @@ class LatticeTowerGenerator:
 
             # Connect triangle edges
             for i in range(3):
-                start = level_points[i]
-                end = level_points[(i + 1) % 3]
-
-                strut = self.curved_generator.create_straight_segment(
-                    start, end, strut_radius, strut_radius
-                )
-                if strut is not None:
-                    meshes.append(strut)
+                starts.append(level_points[i])
+                ends.append(level_points[(i + 1) % 3])
+                radii.append(strut_radius)
 
         # Diagonal bracing
-        brace_angle = SupportConfig.LATTICE_BRACE_ANGLE
         for level in range(num_levels):
             z_bottom = build_plate_z + (level / num_levels) * tower_height
             z_top = build_plate_z + ((level + 1) / num_levels) * tower_height
@@ -205,41 +195,34 @@ class LatticeTowerGenerator:
                 bottom_xy = tower_base[i]
                 top_xy = tower_base[(i + 1) % 3]
 
-                start = np.array([bottom_xy[0], bottom_xy[1], z_bottom])
-                end = np.array([top_xy[0], top_xy[1], z_top])
-
-                brace = self.curved_generator.create_straight_segment(
-                    start, end, strut_radius, strut_radius
-                )
-                if brace is not None:
-                    meshes.append(brace)
+                starts.append(np.array([bottom_xy[0], bottom_xy[1], z_bottom]))
+                ends.append(np.array([top_xy[0], top_xy[1], z_top]))
+                radii.append(strut_radius)
 
         # Attachment points for supports to connect to tower
         # Distribute base points around tower top
         tower_top_center = center.copy()
         tower_top_center[2] = tower_top_z
 
-        for i, base_point in enumerate(base_points):
-            # Find closest tower vertex
-            min_dist = float('inf')
-            closest_vertex = None
-
-            for vertex_xy in tower_base:
-                vertex_3d = np.array([vertex_xy[0], vertex_xy[1], tower_top_z])
-                dist = np.linalg.norm(base_point[:2] - vertex_xy)
-                if dist < min_dist:
-                    min_dist = dist
-                    closest_vertex = vertex_3d
-
-            attachment_points[i] = closest_vertex
-
-        # Combine all tower components
-        if meshes:
-            tower_mesh = trimesh.util.concatenate(meshes)
-            return tower_mesh, attachment_points
-        else:
+        # Closest tower vertex (in XY) for every base point at once
+        vertices_xy = np.asarray(tower_base, dtype=float)
+        base_xy = base_points[:, :2]
+        dist2 = ((base_xy[:, None, :] - vertices_xy[None, :, :]) ** 2).sum(axis=2)
+        nearest = dist2.argmin(axis=1)
+
+        for i, vertex_index in enumerate(nearest):
+            vertex_xy = vertices_xy[vertex_index]
+            attachment_points[i] = np.array([vertex_xy[0], vertex_xy[1], tower_top_z])
+
+        # Build all tower components as one mesh
+        tower_mesh = self.curved_generator.create_straight_segments(
+            starts, ends, radii, radii
+        )
+        if tower_mesh is None:
             return None, {}
 
+        return tower_mesh, attachment_points
+
     def _find_tower_base_triangle(self, points, center):
         """
         Find three points that form a good triangle for tower base
@@ -251,7 +234,7 @@ class LatticeTowerGenerator:
         Returns:
             List of three [x, y] vertices
         """
-        points_2d = [p[:2] for p in points]
+        points_2d = np.asarray(points, dtype=float)[:, :2]
 
         # If 3 or fewer points, use them directly
         if len(points_2d) <= 3:
@@ -266,36 +249,33 @@ class LatticeTowerGenerator:
             return vertices
 
         # Find convex hull
-        from scipy.spatial import ConvexHull
-
         try:
             hull = ConvexHull(points_2d)
-            hull_points = [points_2d[i] for i in hull.vertices]
+            hull_points = points_2d[hull.vertices]
+
+            # Bound the O(H^3) search on very detailed hulls by using an
+            # evenly spaced subset of the hull vertices
+            if len(hull_points) > MAX_TRIANGLE_SEARCH_HULL:
+                keep = np.linspace(0, len(hull_points), MAX_TRIANGLE_SEARCH_HULL,
+                                   endpoint=False).astype(int)
+                hull_points = hull_points[keep]
 
             if len(hull_points) >= 3:
-                # Find three points with maximum spread
-                max_area = 0
-                best_triangle = None
-
-                for i in range(len(hull_points)):
-                    for j in range(i+1, len(hull_points)):
-                        for k in range(j+1, len(hull_points)):
-                            p1 = np.array(hull_points[i])
-                            p2 = np.array(hull_points[j])
-                            p3 = np.array(hull_points[k])
-
-                            # Calculate triangle area
-                            area = 0.5 * abs(
-                                (p2[0] - p1[0]) * (p3[1] - p1[1]) -
-                                (p3[0] - p1[0]) * (p2[1] - p1[1])
-                            )
-
-                            if area > max_area:
-                                max_area = area
-                                best_triangle = [p1.tolist(), p2.tolist(), p3.tolist()]
-
-                if best_triangle:
-                    return best_triangle
+                # Find three points with maximum spread: triangle areas of
+                # every vertex triple at once
+                triples = np.array(list(combinations(range(len(hull_points)), 3)))
+                p1 = hull_points[triples[:, 0]]
+                p2 = hull_points[triples[:, 1]]
+                p3 = hull_points[triples[:, 2]]
+
+                areas = 0.5 * np.abs(
+                    (p2[:, 0] - p1[:, 0]) * (p3[:, 1] - p1[:, 1]) -
+                    (p3[:, 0] - p1[:, 0]) * (p2[:, 1] - p1[:, 1])
+                )
+
+                best = np.argmax(areas)
+                if areas[best] > 0:
+                    return hull_points[triples[best]].tolist()
 
         except Exception:
             pass
@@ -321,31 +301,24 @@ class LatticeTowerGenerator:
         Returns:
             tuple: (tower_mesh, attachment_points)
         """
-        meshes = []
-        attachment_points = {}
         radius = SupportConfig.LATTICE_MAIN_DIAMETER / 2
 
-        for i, point in enumerate(base_points):
-            point = np.array(point)
-            bottom = point.copy()
-            bottom[2] = build_plate_z
-
-            support = self.curved_generator.create_straight_segment(
-                bottom, point, radius, radius
-            )
-
-            if support is not None:
-                meshes.append(support)
+        # One vertical segment from the build plate up to each point, all
+        # built as a single mesh
+        tops = np.asarray(base_points, dtype=np.float64)
+        bottoms = tops.copy()
+        bottoms[:, 2] = build_plate_z
 
-            # Attachment point is the top of the support
-            attachment_points[i] = point.tolist()
-
-        if meshes:
-            tower_mesh = trimesh.util.concatenate(meshes)
-            return tower_mesh, attachment_points
-        else:
+        tower_mesh = self.curved_generator.create_straight_segments(
+            bottoms, tops, radius, radius
+        )
+        if tower_mesh is None:
             return None, {}
 
+        # Attachment point is the top of each support
+        attachment_points = dict(enumerate(tops.tolist()))
+        return tower_mesh, attachment_points
+
     def consolidate_supports_with_towers(self, support_paths, build_plate_z):
         """
         Consolidate multiple support paths using lattice towers
@@ -362,15 +335,19 @@ class LatticeTowerGenerator:
         if not SupportConfig.LATTICE_TOWER_ENABLED:
             return [], support_paths
 
-        # Extract endpoints (lowest points of each support)
+        min_cluster_size = SupportConfig.LATTICE_MIN_CLUSTER_SIZE
+
+        # Extract endpoints (lowest points of each support) as one (N, 3)
+        # array
         endpoints = []
         for path in support_paths:
             if len(path) > 0:
                 # Find point with lowest Z
-                lowest = min(path, key=lambda p: p[2])
-                endpoints.append(lowest)
+                path = np.asarray(path, dtype=np.float64)
+                endpoints.append(path[np.argmin(path[:, 2])])
+        endpoints = np.array(endpoints, dtype=np.float64).reshape(-1, 3)
 
-        if len(endpoints) < SupportConfig.LATTICE_MIN_CLUSTER_SIZE:
+        if len(endpoints) < min_cluster_size:
             # Not enough supports to warrant towers
             return [], support_paths
 
@@ -379,7 +356,7 @@ class LatticeTowerGenerator:
 
         print(f"    Clustered {len(endpoints)} endpoints into {len(clusters)} clusters")
         for i, cluster in enumerate(clusters):
-            if len(cluster) >= SupportConfig.LATTICE_MIN_CLUSTER_SIZE:
+            if len(cluster) >= min_cluster_size:
                 print(f"    Cluster {i}: {len(cluster)} supports -> creating tower")
             else:
                 print(f"    Cluster {i}: {len(cluster)} supports -> too small, using individual supports")
@@ -387,20 +364,23 @@ class LatticeTowerGenerator:
         tower_meshes = []
         modified_paths = []
 
-        # Track which supports belong to which tower
-        support_to_cluster = {}
+        # Track which supports belong to which tower (-1 = none), and each
+        # support's position within its cluster
+        support_to_cluster = np.full(len(support_paths), -1, dtype=np.int32)
+        support_to_local = np.zeros(len(support_paths), dtype=np.int32)
         for cluster_idx, cluster in enumerate(clusters):
-            for support_idx in cluster:
-                support_to_cluster[support_idx] = cluster_idx
+            members = np.asarray(cluster, dtype=np.int32)
+            support_to_cluster[members] = cluster_idx
+            support_to_local[members] = np.arange(len(members))
 
         # Create towers for each cluster
         cluster_towers = {}
         for cluster_idx, cluster in enumerate(clusters):
-            if len(cluster) < SupportConfig.LATTICE_MIN_CLUSTER_SIZE:
+            if len(cluster) < min_cluster_size:
                 # Too few supports for tower
                 continue
 
-            cluster_endpoints = [endpoints[i] for i in cluster]
+            cluster_endpoints = endpoints[cluster]
 
             tower_mesh, attachment_points = self.create_lattice_tower(
                 cluster_endpoints, build_plate_z
@@ -412,23 +392,18 @@ class LatticeTowerGenerator:
 
         # Modify support paths to connect to towers
         for support_idx, path in enumerate(support_paths):
-            if support_idx in support_to_cluster:
-                cluster_idx = support_to_cluster[support_idx]
-
-                if cluster_idx in cluster_towers:
-                    # Get attachment point on tower
-                    cluster = clusters[cluster_idx]
-                    local_idx = cluster.index(support_idx)
-                    attachment_point = cluster_towers[cluster_idx][local_idx]
-
-                    # Modify path to end at attachment point instead of build plate
-                    modified_path = path.copy()
-                    # Replace lowest point with attachment point
-                    if len(modified_path) > 0:
-                        modified_path[-1] = attachment_point
-                    modified_paths.append(modified_path)
-                else:
-                    modified_paths.append(path)
+            cluster_idx = int(support_to_cluster[support_idx])
+            if cluster_idx >= 0 and cluster_idx in cluster_towers:
+                # Get attachment point on tower
+                local_idx = int(support_to_local[support_idx])
+                attachment_point = cluster_towers[cluster_idx][local_idx]
+
+                # Modify path to end at attachment point instead of build plate
+                modified_path = path.copy()
+                # Replace lowest point with attachment point
+                if len(modified_path) > 0:
+                    modified_path[-1] = attachment_point
+                modified_paths.append(modified_path)
             else:
                 modified_paths.append(path)
 
@@ -2,9 +2,86 @@
 Mesh loading and analysis utilities
 """
 
+import hashlib
+import os
+from pathlib import Path
+
 import numpy as np
 import trimesh
-from config import AnalysisConfig
+from config import AnalysisConfig, SupportConfig
+
+# Faces with less area than this (mm²) are treated as degenerate on load
+DEGENERATE_FACE_AREA = 1e-10
+
+# Prepared (loaded, repaired, oriented) meshes are cached here between runs
+MESH_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'battlefield-support'
+
+# Bump when the cached arrays or the steps that produce them change
+MESH_CACHE_VERSION = 1
+
+# One binary STL facet record: normal, three vertices, attribute byte count
+STL_FACET_DTYPE = np.dtype([('normal', '<f4', 3),
+                            ('vertices', '<f4', (3, 3)),
+                            ('attributes', '<u2')])
+
+# Facets converted and written per chunk by export_stl
+STL_EXPORT_CHUNK_FACES = 1 << 16
+
+
+def mesh_cache_key(filepath, **settings):
+    """
+    Cache key for a prepared mesh
+
+    BLAKE2b over the file contents and every setting that shapes the
+    prepared mesh, so changing either misses the cache.
+
+    Args:
+        filepath: Path to the input mesh file
+        **settings: Values the preparation depends on (must have stable reprs)
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    digest.update(repr((MESH_CACHE_VERSION, sorted(settings.items()))).encode())
+    return digest.hexdigest()
+
+
+def export_stl(mesh, filepath):
+    """
+    Write a mesh as binary STL
+
+    Facets are converted to float32 records and written in fixed-size
+    chunks, so peak memory stays at one chunk instead of whole-mesh
+    float64 copies. The output is byte-identical to trimesh's exporter.
+    Paths with another extension go through mesh.export.
+
+    Args:
+        mesh: trimesh.Trimesh to write
+        filepath: Output path
+    """
+    if Path(filepath).suffix.lower() != '.stl':
+        mesh.export(filepath)
+        return
+
+    faces = mesh.faces
+    vertices = mesh.vertices
+    normals = mesh.face_normals
+    count = len(faces)
+    records = np.zeros(min(count, STL_EXPORT_CHUNK_FACES), dtype=STL_FACET_DTYPE)
+
+    with open(filepath, 'wb') as f:
+        f.write(bytes(80))
+        f.write(np.uint32(count).tobytes())
+        for start in range(0, count, STL_EXPORT_CHUNK_FACES):
+            stop = min(start + STL_EXPORT_CHUNK_FACES, count)
+            chunk = records[:stop - start]
+            chunk['normal'] = normals[start:stop]
+            chunk['vertices'] = vertices[faces[start:stop]]
+            f.write(chunk)
 
 
 class MeshLoader:
@@ -35,12 +112,61 @@ class MeshLoader:
 
         return self.mesh
 
+    def load_cached(self, cache_key):
+        """
+        Load a prepared mesh saved by save_cached
+
+        Args:
+            cache_key: Key from mesh_cache_key
+
+        Returns:
+            dict of the extra arrays saved with the mesh, or None on a miss
+            (self.mesh is only replaced on a hit)
+        """
+        path = MESH_CACHE_DIR / f"{cache_key}_oriented.npz"
+        if not path.exists():
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError, KeyError):
+            print(f"  Warning: ignoring unreadable mesh cache {path}")
+            return None
+
+        self.mesh = trimesh.Trimesh(vertices=arrays.pop('vertices'),
+                                    faces=arrays.pop('faces'), process=False)
+        print(f"Loaded prepared mesh from cache: {len(self.mesh.vertices)} vertices, "
+              f"{len(self.mesh.faces)} faces")
+        return arrays
+
+    def save_cached(self, cache_key, **arrays):
+        """
+        Save the current mesh, plus extra arrays, for load_cached
+
+        Failures only print a warning; the cache is an optimization.
+
+        Args:
+            cache_key: Key from mesh_cache_key
+            **arrays: Extra arrays to store alongside the mesh
+        """
+        path = MESH_CACHE_DIR / f"{cache_key}_oriented.npz"
+        try:
+            MESH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Write then rename so a concurrent run never reads a partial file
+            tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+            np.savez(tmp_path, vertices=self.mesh.vertices, faces=self.mesh.faces, **arrays)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"  Warning: could not write mesh cache: {e}")
+
     def _repair_mesh(self):
         """Attempt to repair common mesh issues"""
         print("  Checking mesh integrity...")
 
         # Check if mesh is watertight
-        if not self.mesh.is_watertight:
+        watertight = self.mesh.is_watertight
+        if not watertight:
             print("    Warning: Mesh is not watertight, attempting repair...")
             trimesh.repair.fix_normals(self.mesh)
             trimesh.repair.fix_inversion(self.mesh)
@@ -54,16 +180,26 @@ class MeshLoader:
             else:
                 print("    Warning: Could not fully repair mesh, results may be suboptimal")
 
-        # Remove degenerate faces (if method exists)
-        if hasattr(self.mesh, 'remove_degenerate_faces'):
-            self.mesh.remove_degenerate_faces()
-
-        # Merge close vertices
-        if hasattr(self.mesh, 'merge_vertices'):
+        # Remove degenerate (zero-area) faces
+        nondegenerate = self.mesh.area_faces > DEGENERATE_FACE_AREA
+        if not nondegenerate.all():
+            self.mesh.update_faces(nondegenerate)
+            self.mesh.remove_unreferenced_vertices()
+
+        if watertight:
+            # A watertight mesh from trimesh.load already has merged
+            # vertices, so only the winding needs checking: the
+            # adjacency-based fix_normals pass is needed only when the
+            # winding is inconsistent, otherwise at most an inversion
+            if not self.mesh.is_winding_consistent:
+                self.mesh.fix_normals()
+            else:
+                trimesh.repair.fix_inversion(self.mesh)
+        else:
+            # Merge close vertices
             self.mesh.merge_vertices()
 
-        # Ensure correct winding
-        if hasattr(self.mesh, 'fix_normals'):
+            # Ensure correct winding
             self.mesh.fix_normals()
 
         print(f"    Final mesh: {len(self.mesh.vertices)} vertices, {len(self.mesh.faces)} faces")
@@ -102,7 +238,7 @@ class MeshLoader:
 
     def export(self, filepath):
         """Export mesh to STL file"""
-        self.mesh.export(filepath)
+        export_stl(self.mesh, filepath)
         print(f"Exported mesh to {filepath}")
 
 
@@ -122,42 +258,30 @@ class MeshAnalyzer:
         Returns:
             Array of face indices that need support
         """
-        # Get face normals
-        normals = self.mesh.face_normals
-
-        # Calculate angle from vertical (Z-axis)
-        # Vertical up is [0, 0, 1]
-        # Angle from vertical is arccos(dot(normal, [0,0,1]))
-        vertical = np.array([0, 0, 1])
-        dot_products = np.dot(normals, vertical)
+        # Angle from vertical (Z-axis) is arccos(normal_z). arccos is
+        # decreasing, so angle > max_angle is the same test as
+        # normal_z < cos(max_angle), done in one pass over the Z components
+        # without computing any angles
+        normal_z = self.mesh.face_normals[:, 2]
 
-        # Clip to valid range for arccos
-        dot_products = np.clip(dot_products, -1.0, 1.0)
+        # Overhanging faces (angle > max_angle from vertical), only
+        # considering downward-facing components (negative Z normal)
+        threshold = min(np.cos(np.radians(max_angle)), 0.0)
 
-        # Calculate angles in degrees
-        angles = np.degrees(np.arccos(dot_products))
-
-        # Find overhanging faces (angle > max_angle from vertical)
-        # Faces pointing down (angle > 90) definitely need support
-        # Faces with angle > max_angle also need support
-        overhang_faces = angles > max_angle
-
-        # Only consider downward-facing components
-        # (normals with negative Z component)
-        downward_faces = normals[:, 2] < 0
-
-        return np.where(overhang_faces & downward_faces)[0]
+        return np.flatnonzero(normal_z < threshold)
 
     def get_face_centers(self, face_indices=None):
         """Get centers of specified faces (or all faces)"""
-        if face_indices is None:
-            face_indices = np.arange(len(self.mesh.faces))
-
         vertices = self.mesh.vertices
-        faces = self.mesh.faces[face_indices]
+        faces = self.mesh.faces
+        if face_indices is not None:
+            faces = faces[face_indices]
 
-        # Calculate center of each face
-        centers = np.mean(vertices[faces], axis=1)
+        # Calculate center of each face from its three corners directly,
+        # without materializing the (F, 3, 3) triangle array
+        centers = vertices[faces[:, 0]] + vertices[faces[:, 1]]
+        centers += vertices[faces[:, 2]]
+        centers /= 3.0
 
         return centers
 
@@ -180,6 +304,35 @@ class MeshAnalyzer:
 
         return np.where(bottom_faces)[0]
 
+    def rests_on_build_plate(self, max_angle=None, tolerance=None):
+        """
+        Check whether every overhanging face lies on the build plate
+
+        When all faces that would need support are within tolerance of
+        the lowest Z (a flat-bottomed, heightmap-like model), the plate
+        supports them and nothing above it can be an island, overhang
+        or bridge.
+
+        Args:
+            max_angle: Maximum overhang angle (default: SupportConfig.MAX_OVERHANG_ANGLE)
+            tolerance: Height above the bottom still counted as on the plate
+                (default: AnalysisConfig.PLATE_CONTACT_TOLERANCE)
+
+        Returns:
+            bool: True if no face above the plate needs support
+        """
+        if max_angle is None:
+            max_angle = SupportConfig.MAX_OVERHANG_ANGLE
+        if tolerance is None:
+            tolerance = AnalysisConfig.PLATE_CONTACT_TOLERANCE
+
+        overhang_faces = self.get_overhang_faces(max_angle)
+        if len(overhang_faces) == 0:
+            return True
+
+        highest = self.mesh.vertices[self.mesh.faces[overhang_faces], 2].max()
+        return highest - self.mesh.bounds[0, 2] < tolerance
+
     def sample_points_on_surface(self, count=1000):
         """
         Sample random points on the mesh surface
@@ -201,10 +354,12 @@ class MeshAnalyzer:
             points: Array of 3D points to cast from
 
         Returns:
-            Array of Z-distances to first hit (or None if no hit)
+            Float array of Z-distances to the closest hit (np.inf if no hit)
         """
+        points = np.asarray(points, dtype=np.float64)
+
         # Cast rays downward (-Z direction)
-        ray_directions = np.tile([0, 0, -1], (len(points), 1))
+        ray_directions = np.tile([0.0, 0.0, -1.0], (len(points), 1))
 
         # Perform raycasting
         locations, index_ray, index_tri = self.mesh.ray.intersects_location(
@@ -212,10 +367,9 @@ class MeshAnalyzer:
             ray_directions=ray_directions
         )
 
-        # Calculate distances
-        distances = np.full(len(points), None)
-        for i, ray_idx in enumerate(index_ray):
-            if distances[ray_idx] is None:
-                distances[ray_idx] = points[ray_idx, 2] - locations[i, 2]
+        # Keep the closest hit per ray (scattered in C, no Python loop)
+        distances = np.full(len(points), np.inf, dtype=np.float64)
+        hit_distances = points[index_ray, 2] - locations[:, 2]
+        np.minimum.at(distances, index_ray, hit_distances)
 
         return distances
@@ -21,6 +21,25 @@ AXIS_VECTORS = {
     '-Y': np.array([0.0, -1.0, 0.0]),
 }
 
+# Canonical mech poses as (name, tilt of the front about the tilt axis in
+# degrees). Upright variants tilt the front upward by [-30, -15, 0, +15,
+# +30] degrees: positive tilt = front rotates up (good, the front face
+# points up-away from the plate), negative tilt = front rotates down
+# (allowed but penalized later). Prone poses for aerospace / artillery lay
+# the mech on its back or belly: back-down rotates 90 degrees such that
+# what was the original +Z becomes either +front or -front.
+MECH_POSES = (
+    ("upright tilt +0°", 0),
+    ("upright tilt +15°", 15),
+    ("upright tilt +30°", 30),
+    ("upright tilt -15°", -15),
+    ("upright tilt -30°", -30),
+    ("prone on back", 90),
+    ("prone on belly", -90),
+)
+MECH_POSE_NAMES = tuple(name for name, _ in MECH_POSES)
+MECH_POSE_TILTS_DEG = np.array([angle for _, angle in MECH_POSES], dtype=float)
+
 
 def parse_front_axis(value):
     """Convert a string like '+Y' into a unit vector. Returns None for 'auto'."""
@@ -41,6 +60,7 @@ class OrientationOptimizer:
         self.mesh = mesh
         self.config = config or {}
         self.analyzer = MeshAnalyzer(mesh)
+        self._cache_mesh_arrays()
 
         # Front axis is the world vector the mech's visible front points along
         # BEFORE any orientation transform. May be auto-detected lazily.
@@ -62,6 +82,22 @@ class OrientationOptimizer:
                     self.front_axis_label = label
                     break
 
+    def _cache_mesh_arrays(self):
+        """
+        Snapshot the mesh arrays pose scoring reads, so trimesh's cached
+        properties are resolved once rather than on every access.
+        Vertices are restricted to the referenced ones (what mesh.bounds
+        uses) with faces re-indexed into them.
+        """
+        referenced = self.mesh.referenced_vertices
+        self._vertices = np.ascontiguousarray(self.mesh.vertices[referenced])
+        # New index of each referenced vertex is the count of referenced
+        # vertices before it: a linear remap from the boolean mask
+        self._faces = (np.cumsum(referenced) - 1)[self.mesh.faces]
+        self._normals = np.ascontiguousarray(self.mesh.face_normals)
+        self._areas = self.mesh.area_faces
+        self._surface_area = float(self.mesh.area)
+
     def _auto_detect_front(self):
         """
         Guess which world-axis is the mech's "front" by looking at the mid-Z
@@ -77,8 +113,8 @@ class OrientationOptimizer:
         z_hi = bounds[0, 2] + 0.7 * (bounds[1, 2] - bounds[0, 2])
 
         centers = self.mesh.triangles_center
-        normals = self.mesh.face_normals
-        areas = self.mesh.area_faces
+        normals = self._normals
+        areas = self._areas
 
         mid_band = (centers[:, 2] >= z_lo) & (centers[:, 2] <= z_hi)
         # Faces whose normals are within 60deg of horizontal (|n_z| < sin(30deg) = 0.5)
@@ -136,13 +172,17 @@ class OrientationOptimizer:
         best_transform = np.eye(4)
         best_name = ''
 
-        for name, rotation_matrix in poses:
+        # Rotation only changes vertex positions and normals, so all poses
+        # are scored together from the original arrays instead of
+        # transforming a copy of the mesh per pose
+        names = [name for name, _ in poses]
+        rotations = np.stack([rotation_matrix for _, rotation_matrix in poses])
+        scores = self._score_orientations(rotations)
+
+        for name, rotation_matrix, score in zip(names, rotations, scores):
             transform = np.eye(4)
             transform[:3, :3] = rotation_matrix
-            test_mesh = self.mesh.copy()
-            test_mesh.apply_transform(transform)
 
-            score = self._score_orientation(test_mesh, rotation_matrix)
             print(f"  {name:<24} score = {score:.2f}")
 
             if score < best_score:
@@ -170,22 +210,15 @@ class OrientationOptimizer:
             tilt_axis = np.array([1.0, 0.0, 0.0])
         tilt_axis = tilt_axis / np.linalg.norm(tilt_axis)
 
-        # Upright variants: tilt the front upward by [-30, -15, 0, +15, +30] degrees.
-        # Positive tilt = front rotates up (good — front-face points up-away from plate).
-        # Negative tilt = front rotates down (allowed but penalized later).
-        for angle_deg in (0, 15, 30, -15, -30):
-            R = Rotation.from_rotvec(tilt_axis * np.radians(angle_deg)).as_matrix()
-            yield (f"upright tilt {angle_deg:+d}°", R)
-
-        # Prone poses for aerospace / artillery: lay the mech on its back or
-        # belly. Back-down rotates 90° such that what was the original +Z
-        # becomes either +front or -front.
-        R_back = Rotation.from_rotvec(tilt_axis * np.radians(90)).as_matrix()
-        yield ("prone on back", R_back)
-        R_belly = Rotation.from_rotvec(tilt_axis * np.radians(-90)).as_matrix()
-        yield ("prone on belly", R_belly)
-
-    def _score_orientation(self, mesh, rotation_matrix):
+        # All pose rotations about the tilt axis in one batched call
+        rotations = Rotation.from_rotvec(
+            np.outer(np.radians(MECH_POSE_TILTS_DEG), tilt_axis)
+        ).as_matrix()
+
+        for name, R in zip(MECH_POSE_NAMES, rotations):
+            yield (name, R)
+
+    def _score_orientation(self, rotation_matrix):
         """
         Score an orientation (lower is better). Combines:
           1. Overhang area penalty
@@ -193,27 +226,88 @@ class OrientationOptimizer:
           3. Z-height stability
           4. Build-volume fit (hard penalty)
           5. Front-face scar penalty (BattleTech-specific)
+
+        Args:
+            rotation_matrix: 3x3 candidate rotation of the original mesh
+
+        Returns:
+            Orientation score
+        """
+        return float(self._score_orientations(rotation_matrix[None])[0])
+
+    def _score_orientations(self, rotations):
+        """
+        Score a batch of orientations without transforming the mesh.
+
+        All poses are evaluated on the cached mesh arrays with two matmuls:
+        one rotating the vertices for bounds and face-center heights, and
+        one rotating the face normals' Z component for the poses that fit
+        the build volume. Face areas and total area are rotation-invariant.
+
+        Args:
+            rotations: (S, 3, 3) candidate rotation matrices
+
+        Returns:
+            (S,) array of orientation scores (lower is better)
+        """
+        vertices = self._vertices
+        faces = self._faces
+        areas = self._areas
+        count = len(rotations)
+
+        # (V, S, 3) rotated vertices, reduced to (S, 3) bounds per pose
+        rotated = (vertices @ rotations.reshape(-1, 3).T).reshape(-1, count, 3)
+        lower = rotated.min(axis=0)
+        upper = rotated.max(axis=0)
+
+        # Poses that don't fit the build volume get the hard penalty in
+        # _pose_penalty regardless, so skip their face analysis. In its
+        # place they take the worst case of the overhang term (the whole
+        # surface overhanging), which keeps them ranked behind fitting
+        # poses, plus their size to rank them among themselves
+        build_volume = np.array([PrinterConfig.BUILD_VOLUME_X,
+                                 PrinterConfig.BUILD_VOLUME_Y,
+                                 PrinterConfig.BUILD_VOLUME_Z])
+        sizes = upper - lower
+        fits = np.all(sizes <= build_volume, axis=1)
+        scores = np.where(fits, 0.0, self._surface_area * 10.0 + sizes.sum(axis=1))
+
+        if np.any(fits):
+            # (F, S') rotated normal Z per face and fitting pose
+            normals_z = self._normals @ rotations[fits, 2, :].T
+
+            # 1. Overhang penalty (same test as MeshAnalyzer.get_overhang_faces).
+            # Vertical faces sit at a normal Z of about 0, and rotated cached
+            # normals round differently from normals recomputed on a rotated
+            # copy, so at a zero threshold some of them can count here that
+            # the copy-based score left out, or the other way around
+            threshold = min(np.cos(np.radians(SupportConfig.MAX_OVERHANG_ANGLE)), 0.0)
+            face_scores = (areas @ (normals_z < threshold)) * 10.0
+
+            # 2. Bottom contact reward (faces whose centers are in the lowest 10%)
+            z_threshold = lower[fits, 2] + sizes[fits, 2] * 0.1
+            center_z = rotated[:, fits, 2][faces].mean(axis=1)
+            bottom_up = (center_z <= z_threshold) & (normals_z > 0.9)
+            face_scores -= (areas @ bottom_up) * 5.0
+
+            scores[fits] = face_scores
+
+        for i in range(count):
+            bounds = np.array([lower[i], upper[i]])
+            scores[i] += self._pose_penalty(bounds, rotations[i], self._surface_area)
+
+        return scores
+
+    def _pose_penalty(self, bounds, rotation_matrix, surface_area):
+        """
+        Score terms that only depend on the rotated bounds and front axis:
+          3. Z-height stability
+          4. Build-volume fit (hard penalty)
+          5. Front-face scar penalty (BattleTech-specific)
         """
         score = 0.0
-        analyzer = MeshAnalyzer(mesh)
-
-        # 1. Overhang penalty
-        overhang_faces = analyzer.get_overhang_faces(
-            max_angle=SupportConfig.MAX_OVERHANG_ANGLE
-        )
-        overhang_area = float(np.sum(mesh.area_faces[overhang_faces])) if len(overhang_faces) else 0.0
-        score += overhang_area * 10.0
-
-        # 2. Bottom contact reward
-        bottom_faces = analyzer.get_bottom_faces()
-        if len(bottom_faces) > 0:
-            bottom_normals = mesh.face_normals[bottom_faces]
-            facing_up = bottom_normals[:, 2] > 0.9
-            bottom_up_area = float(np.sum(mesh.area_faces[bottom_faces[facing_up]]))
-            score -= bottom_up_area * 5.0
 
         # 3. Z-height stability
-        bounds = mesh.bounds
         z_height = bounds[1, 2] - bounds[0, 2]
         xy_footprint = (bounds[1, 0] - bounds[0, 0]) * (bounds[1, 1] - bounds[0, 1])
         footprint_diag = np.sqrt(xy_footprint) if xy_footprint > 0 else 0.0
@@ -237,11 +331,11 @@ class OrientationOptimizer:
             # front points down — bad
             penalty = SupportConfig.FRONT_FACE_SCAR_PENALTY * (-front_world[2])
             # Scale by mesh size so it's comparable to overhang area terms
-            score += penalty * mesh.area * 0.05
+            score += penalty * surface_area * 0.05
         elif front_world[2] > 0.9:
             # front points straight up — also bad (the table-facing side is now hidden
             # under the model and the BACK is exposed)
-            score += SupportConfig.FRONT_FACE_SCAR_PENALTY * 0.4 * front_world[2] * mesh.area * 0.05
+            score += SupportConfig.FRONT_FACE_SCAR_PENALTY * 0.4 * front_world[2] * surface_area * 0.05
 
         return score
 
@@ -249,4 +343,5 @@ class OrientationOptimizer:
         """Find and apply the optimal canonical pose to the mesh."""
         transform = self.optimize(num_samples)
         self.mesh.apply_transform(transform)
+        self._cache_mesh_arrays()
         return transform
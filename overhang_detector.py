@@ -2,10 +2,119 @@
 Overhang and bridge detection for support generation
 """
 
+from dataclasses import dataclass
+
 import numpy as np
 from mesh_loader import MeshAnalyzer
 from config import SupportConfig, AnalysisConfig
 
+# Support point type ids stored in SupportPoints.type_id, indexing
+# SUPPORT_TYPE_NAMES for the legacy 'type' strings
+OVERHANG_TYPE = 0
+BRIDGE_TYPE = 1
+ISLAND_TYPE = 2
+SUPPORT_TYPE_NAMES = ('overhang', 'bridge', 'island')
+
+# Slack on the normal Z threshold for the float32 face screening pass,
+# so faces on the edge of a threshold are kept and settled by the exact
+# float64 test (float32 rounding of a unit normal is ~1e-7)
+SCREEN_NORMAL_MARGIN = 1e-5
+
+
+@dataclass
+class SupportPoints:
+    """
+    Overhang, bridge and island support points stored as parallel arrays
+
+    Iterating yields the legacy support point dicts, so consumers that
+    expect a list of dicts keep working. Fields that don't apply to a
+    point's type (angle for bridges and islands, length for overhangs
+    and islands) are NaN.
+    """
+    xyz: np.ndarray
+    area: np.ndarray
+    angle: np.ndarray
+    length: np.ndarray
+    type_id: np.ndarray
+
+    @classmethod
+    def empty(cls):
+        """Create an empty set of support points"""
+        return cls(np.zeros((0, 3)), np.zeros(0), np.zeros(0), np.zeros(0),
+                   np.zeros(0, dtype=np.int8))
+
+    @classmethod
+    def from_arrays(cls, xyz, area, type_id, angle=None, length=None):
+        """
+        Create support points of a single type
+
+        Args:
+            xyz: (N, 3) array of positions
+            area: Scalar or (N,) array of supported areas
+            type_id: OVERHANG_TYPE, BRIDGE_TYPE or ISLAND_TYPE
+            angle: Optional (N,) array of overhang angles in degrees
+            length: Optional (N,) array of bridge lengths in mm
+
+        Returns:
+            SupportPoints
+        """
+        xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
+        n = len(xyz)
+        missing = np.full(n, np.nan)
+        return cls(
+            xyz,
+            np.broadcast_to(np.asarray(area, dtype=float), (n,)).copy(),
+            missing if angle is None else np.asarray(angle, dtype=float),
+            missing.copy() if length is None else np.asarray(length, dtype=float),
+            np.full(n, type_id, dtype=np.int8),
+        )
+
+    def __len__(self):
+        return len(self.xyz)
+
+    def __iter__(self):
+        for (x, y, z), area, angle, length, type_id in zip(
+            self.xyz.tolist(), self.area.tolist(), self.angle.tolist(),
+            self.length.tolist(), self.type_id.tolist()
+        ):
+            point = {'x': x, 'y': y, 'z': z, 'area': area, 'type': SUPPORT_TYPE_NAMES[type_id]}
+            if type_id == OVERHANG_TYPE:
+                point['angle'] = angle
+            elif type_id == BRIDGE_TYPE:
+                point['length'] = length
+            yield point
+
+    def __add__(self, other):
+        if isinstance(other, SupportPoints):
+            combined = SupportPoints(self.xyz, self.area, self.angle, self.length, self.type_id)
+            combined.extend(other)
+            return combined
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def extend(self, other):
+        """Append the points of another SupportPoints in place"""
+        self.xyz = np.concatenate([self.xyz, other.xyz])
+        self.area = np.concatenate([self.area, other.area])
+        self.angle = np.concatenate([self.angle, other.angle])
+        self.length = np.concatenate([self.length, other.length])
+        self.type_id = np.concatenate([self.type_id, other.type_id])
+
+    def filter(self, mask):
+        """
+        Select a subset of the points
+
+        Args:
+            mask: Boolean mask or index array over the points
+
+        Returns:
+            SupportPoints with the selected points
+        """
+        return SupportPoints(self.xyz[mask], self.area[mask], self.angle[mask],
+                             self.length[mask], self.type_id[mask])
+
 
 class OverhangDetector:
     """Detect overhangs and bridges that need support"""
@@ -14,6 +123,34 @@ class OverhangDetector:
         self.mesh = mesh
         self.analyzer = MeshAnalyzer(mesh)
 
+        # Classify the faces for both detectors in one scan: overhang
+        # thresholds are at most 0 and bridge candidates need normal Z
+        # below 0.1, so every face either detector can use has float32
+        # normal Z under 0.1 (plus slack). Only these survivors are kept,
+        # with their exact normal Z and angle from horizontal in degrees
+        # (the mesh doesn't change during analysis)
+        normal_z = mesh.face_normals[:, 2]
+        self._screened_faces = np.flatnonzero(
+            normal_z.astype(np.float32) < 0.1 + SCREEN_NORMAL_MARGIN
+        )
+        self._screened_normal_z = normal_z[self._screened_faces]
+        self._screened_angles = np.degrees(
+            np.arccos(np.clip(np.abs(self._screened_normal_z), 0.0, 1.0))
+        )
+
+    def _overhang_faces(self, max_angle):
+        """
+        Overhanging faces among the screened faces
+
+        Same test as MeshAnalyzer.get_overhang_faces, in face order.
+
+        Returns:
+            tuple: (face indices, their positions in the screened arrays)
+        """
+        threshold = min(np.cos(np.radians(max_angle)), 0.0)
+        local = np.flatnonzero(self._screened_normal_z < threshold)
+        return self._screened_faces[local], local
+
     def detect_overhangs(self, max_angle=None):
         """
         Detect overhang areas that need support
@@ -22,7 +159,7 @@ class OverhangDetector:
             max_angle: Maximum overhang angle in degrees (default from config)
 
         Returns:
-            List of support points for overhangs
+            SupportPoints for overhangs
         """
         if max_angle is None:
             max_angle = SupportConfig.MAX_OVERHANG_ANGLE
@@ -30,92 +167,65 @@ class OverhangDetector:
         print(f"Detecting overhangs (max angle: {max_angle}°)...")
 
         # Get faces that exceed overhang angle
-        overhang_faces = self.analyzer.get_overhang_faces(max_angle)
+        overhang_faces, local = self._overhang_faces(max_angle)
 
         if len(overhang_faces) == 0:
             print("  No overhangs detected")
-            return []
+            return SupportPoints.empty()
 
         print(f"  Found {len(overhang_faces)} overhanging faces")
 
-        # Calculate support points for these faces
-        support_points = []
-
-        # Get centers of overhang faces
-        face_centers = self.analyzer.get_face_centers(overhang_faces)
-        face_areas = self.mesh.area_faces[overhang_faces]
-
         # Filter by minimum area
-        significant_faces = face_areas >= AnalysisConfig.OVERHANG_MIN_AREA
-
-        for idx, (center, area) in enumerate(zip(face_centers[significant_faces],
-                                                   face_areas[significant_faces])):
-            # Calculate number of supports needed based on area
-            # and face angle
-            face_normal = self.mesh.face_normals[overhang_faces[idx]]
-
-            # More supports for more horizontal faces
-            angle_from_horizontal = np.degrees(
-                np.arccos(abs(face_normal[2]))
+        face_areas = self.mesh.area_faces[overhang_faces]
+        keep = face_areas >= AnalysisConfig.OVERHANG_MIN_AREA
+        significant = overhang_faces[keep]
+        areas = face_areas[keep]
+        centers = self.analyzer.get_face_centers(significant)
+
+        # Calculate number of supports needed based on area and face
+        # angle, for all faces at once. More supports for more horizontal
+        # faces
+        angles = self._screened_angles[local[keep]]
+
+        # Calculate support density based on angle
+        # Near-horizontal surfaces need more support, but not excessively:
+        # very horizontal faces (< 20°) use edge spacing, moderately
+        # horizontal ones (< 40°) standard spacing, and more vertical ones
+        # can use sparser spacing
+        base_spacing = np.select(
+            [angles < 20, angles < 40],
+            [SupportConfig.EDGE_SUPPORT_SPACING, SupportConfig.SUPPORT_SPACING],
+            default=SupportConfig.SUPPORT_SPACING * 1.5
+        )
+
+        # Adaptive spacing: larger areas get proportionally sparser supports
+        # This prevents "mat of supports" on large flat areas
+        # The relationship is: effective_spacing = base_spacing * (1 + log10(area/10))
+        # So a 10mm² area uses base_spacing, 100mm² uses 2x spacing, etc.
+        area_factor = 1.0 + 0.3 * np.log10(np.maximum(areas, 10.0) / 10.0)
+        spacing = base_spacing * np.minimum(area_factor, 2.5)  # Cap at 2.5x
+
+        # Number of supports for each face - with reasonable cap to
+        # prevent over-support
+        num_supports = np.clip(np.ceil(areas / spacing ** 2).astype(int), 1, 8)
+
+        # One row per support point, grouped by face in face order. Single
+        # supports sit at the face center, multiple supports are sampled
+        # on the face
+        point_faces = np.repeat(np.arange(len(significant)), num_supports)
+        positions = centers[point_faces]
+        multi = num_supports > 1
+        if np.any(multi):
+            triangles = self.mesh.vertices[self.mesh.faces[significant[multi]]]
+            positions[multi[point_faces]] = self._sample_points_on_triangles(
+                triangles, num_supports[multi]
             )
 
-            # Calculate support density based on angle
-            # Near-horizontal surfaces need more support, but not excessively
-            if angle_from_horizontal < 20:
-                # Very horizontal - needs good support but scale with area
-                base_spacing = SupportConfig.EDGE_SUPPORT_SPACING
-            elif angle_from_horizontal < 40:
-                # Moderately horizontal - standard spacing
-                base_spacing = SupportConfig.SUPPORT_SPACING
-            else:
-                # More vertical - can use sparser spacing
-                base_spacing = SupportConfig.SUPPORT_SPACING * 1.5
-
-            # Adaptive spacing: larger areas get proportionally sparser supports
-            # This prevents "mat of supports" on large flat areas
-            # The relationship is: effective_spacing = base_spacing * (1 + log10(area/10))
-            # So a 10mm² area uses base_spacing, 100mm² uses 2x spacing, etc.
-            if area > 10.0:
-                area_factor = 1.0 + 0.3 * np.log10(area / 10.0)
-                spacing = base_spacing * min(area_factor, 2.5)  # Cap at 2.5x
-            else:
-                spacing = base_spacing
-
-            # Number of supports for this face - with reasonable cap
-            num_supports = max(1, int(np.ceil(area / (spacing ** 2))))
-            # Cap maximum supports per face to prevent over-support
-            num_supports = min(num_supports, 8)
-
-            if num_supports == 1:
-                # Single support at center
-                support_points.append({
-                    'x': center[0],
-                    'y': center[1],
-                    'z': center[2],
-                    'area': area,
-                    'type': 'overhang',
-                    'angle': angle_from_horizontal
-                })
-            else:
-                # Multiple supports - sample on the face
-                # Get vertices of this face
-                face_idx = overhang_faces[idx]
-                vertices = self.mesh.vertices[self.mesh.faces[face_idx]]
-
-                # Create grid of points on the triangular face
-                supports = self._sample_points_on_triangle(
-                    vertices, num_supports
-                )
-
-                for point in supports:
-                    support_points.append({
-                        'x': point[0],
-                        'y': point[1],
-                        'z': point[2],
-                        'area': area / num_supports,
-                        'type': 'overhang',
-                        'angle': angle_from_horizontal
-                    })
+        point_areas = areas[point_faces] / num_supports[point_faces]
+
+        support_points = SupportPoints.from_arrays(
+            positions, point_areas, OVERHANG_TYPE, angle=angles[point_faces]
+        )
 
         print(f"  Generated {len(support_points)} overhang support points")
         return support_points
@@ -128,75 +238,64 @@ class OverhangDetector:
             max_length: Maximum bridge length in mm (default from config)
 
         Returns:
-            List of support points for bridges
+            SupportPoints for bridges
         """
         if max_length is None:
             max_length = SupportConfig.MAX_BRIDGE_LENGTH
 
         print(f"Detecting bridges (max length: {max_length}mm)...")
 
-        support_points = []
-
-        # Find near-horizontal faces
-        normals = self.mesh.face_normals
-        z_component = abs(normals[:, 2])
+        # Repeat the tests exactly on the faces that passed the shared
+        # float32 screen
+        screened = self._screened_faces
+        normal_z = self._screened_normal_z
 
         # Horizontal faces have Z component close to 0
         horizontal_threshold = 0.3  # cos(72°) - fairly horizontal
-        horizontal_faces = z_component < horizontal_threshold
+        horizontal_faces = np.abs(normal_z) < horizontal_threshold
 
         # Only consider downward-facing or side faces
-        downward_faces = normals[:, 2] < 0.1
+        downward_faces = normal_z < 0.1
         candidate_faces = horizontal_faces & downward_faces
 
         if not np.any(candidate_faces):
             print("  No bridge candidates detected")
-            return []
+            return SupportPoints.empty()
 
-        candidate_indices = np.where(candidate_faces)[0]
+        candidate_indices = screened[candidate_faces]
         print(f"  Checking {len(candidate_indices)} potential bridge faces...")
 
-        # Check each face for bridge length
-        for face_idx in candidate_indices:
-            # Get vertices of this face
-            vertices = self.mesh.vertices[self.mesh.faces[face_idx]]
-
-            # Calculate edge lengths
-            edge_lengths = [
-                np.linalg.norm(vertices[1] - vertices[0]),
-                np.linalg.norm(vertices[2] - vertices[1]),
-                np.linalg.norm(vertices[0] - vertices[2])
-            ]
-
-            max_edge = max(edge_lengths)
-
-            # If any edge exceeds max bridge length, need support
-            if max_edge > max_length:
-                # Find the long edge
-                long_edge_idx = edge_lengths.index(max_edge)
-
-                if long_edge_idx == 0:
-                    v1, v2 = vertices[0], vertices[1]
-                elif long_edge_idx == 1:
-                    v1, v2 = vertices[1], vertices[2]
-                else:
-                    v1, v2 = vertices[2], vertices[0]
-
-                # Add supports along the bridge
-                num_supports = int(np.ceil(max_edge / max_length)) + 1
-
-                for i in range(1, num_supports):
-                    t = i / num_supports
-                    point = v1 + t * (v2 - v1)
-
-                    support_points.append({
-                        'x': point[0],
-                        'y': point[1],
-                        'z': point[2],
-                        'area': 0.0,  # Bridge support
-                        'type': 'bridge',
-                        'length': max_edge
-                    })
+        # Edge lengths of every candidate face at once: edge k runs from
+        # vertex k to vertex (k + 1) % 3. Pick the longest by squared
+        # length and only take the sqrt of that one
+        tris = self.mesh.vertices[self.mesh.faces[candidate_indices]]
+        edges = tris[:, [1, 2, 0]] - tris
+        edge_lengths_sq = np.einsum('ijk,ijk->ij', edges, edges)
+        long_edge_idx = edge_lengths_sq.argmax(axis=1)
+        max_edge = np.sqrt(edge_lengths_sq[np.arange(len(tris)), long_edge_idx])
+
+        # If any edge exceeds max bridge length, need support
+        bridges = max_edge > max_length
+        tris = tris[bridges]
+        long_edge_idx = long_edge_idx[bridges]
+        max_edge = max_edge[bridges]
+        rows = np.arange(len(tris))
+        v1 = tris[rows, long_edge_idx]
+        v2 = tris[rows, (long_edge_idx + 1) % 3]
+
+        # Add supports along each bridge at t = i / num_supports for
+        # i = 1 .. num_supports - 1, all bridges in one pass
+        num_supports = np.ceil(max_edge / max_length).astype(int) + 1
+        counts = num_supports - 1
+        point_bridges = np.repeat(rows, counts)
+        steps = np.arange(len(point_bridges)) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+        t = steps / num_supports[point_bridges]
+        points = v1[point_bridges] + t[:, None] * (v2 - v1)[point_bridges]
+
+        # Bridge supports carry no area
+        support_points = SupportPoints.from_arrays(
+            points, 0.0, BRIDGE_TYPE, length=max_edge[point_bridges]
+        )
 
         print(f"  Generated {len(support_points)} bridge support points")
         return support_points
@@ -212,31 +311,75 @@ class OverhangDetector:
         Returns:
             Array of sampled points
         """
-        points = []
+        return self._sample_points_on_triangles(
+            np.asarray(vertices)[None], np.array([num_points])
+        )
+
+    def _sample_points_on_triangles(self, triangles, counts):
+        """
+        Sample random points on many triangles in one pass
+
+        Args:
+            triangles: (F, 3, 3) array of triangle vertices
+            counts: (F,) number of points to sample on each triangle
+
+        Returns:
+            (sum(counts), 3) array of points, grouped by triangle in order
+        """
+        point_triangles = triangles[np.repeat(np.arange(len(triangles)), counts)]
+
+        # Random barycentric coordinates, drawn in the same order as one
+        # np.random.random(2) call per point
+        r1, r2 = np.random.random((len(point_triangles), 2)).T
+
+        # Ensure uniform distribution: reflect samples from the far half of
+        # the unit square back into the triangle
+        flip = r1 + r2 > 1
+        r1 = np.where(flip, 1 - r1, r1)
+        r2 = np.where(flip, 1 - r2, r2)
+        r3 = 1 - r1 - r2
+
+        # Calculate points
+        return (r1[:, None] * point_triangles[:, 0] +
+                r2[:, None] * point_triangles[:, 1] +
+                r3[:, None] * point_triangles[:, 2])
+
+    def sample_overhang_points(self, total_points, max_angle=None):
+        """
+        Sample points on the overhanging surface, uniformly by area
 
-        for _ in range(num_points):
-            # Random barycentric coordinates
-            r1, r2 = np.random.random(2)
+        Faces are chosen by inverse CDF over their cumulative areas, so
+        each point lands on a face with probability proportional to its
+        area, then placed uniformly on that face.
+
+        Args:
+            total_points: Number of points to sample
+            max_angle: Maximum overhang angle in degrees (default from config)
 
-            # Ensure uniform distribution
-            if r1 + r2 > 1:
-                r1 = 1 - r1
-                r2 = 1 - r2
+        Returns:
+            (total_points, 3) array of points, empty if there are no overhangs
+        """
+        if max_angle is None:
+            max_angle = SupportConfig.MAX_OVERHANG_ANGLE
 
-            r3 = 1 - r1 - r2
+        overhang_faces, _ = self._overhang_faces(max_angle)
+        if len(overhang_faces) == 0:
+            return np.zeros((0, 3))
 
-            # Calculate point
-            point = r1 * vertices[0] + r2 * vertices[1] + r3 * vertices[2]
-            points.append(point)
+        cdf = np.cumsum(self.mesh.area_faces[overhang_faces])
+        cdf /= cdf[-1]
+        chosen = np.searchsorted(cdf, np.random.random(total_points), side='right')
+        chosen = np.minimum(chosen, len(overhang_faces) - 1)
 
-        return np.array(points)
+        triangles = self.mesh.vertices[self.mesh.faces[overhang_faces[chosen]]]
+        return self._sample_points_on_triangles(triangles, np.ones(len(triangles), dtype=int))
 
     def get_all_support_points(self):
         """
         Detect all types of support needs and return combined list
 
         Returns:
-            List of all support points needed
+            SupportPoints with all support points needed
         """
         print("\nAnalyzing model for support requirements...")
 
@@ -258,10 +401,15 @@ class OverhangDetector:
         if not support_points:
             return "No overhangs or bridges requiring support"
 
-        overhang_count = sum(1 for p in support_points if p['type'] == 'overhang')
-        bridge_count = sum(1 for p in support_points if p['type'] == 'bridge')
-
-        total_area = sum(p['area'] for p in support_points if 'area' in p)
+        if isinstance(support_points, SupportPoints):
+            overhang_count = int(np.count_nonzero(support_points.type_id == OVERHANG_TYPE))
+            bridge_count = int(np.count_nonzero(support_points.type_id == BRIDGE_TYPE))
+            total_area = float(support_points.area.sum())
+        else:
+            # Mixed list of support point dicts (e.g. with islands)
+            overhang_count = sum(1 for p in support_points if p['type'] == 'overhang')
+            bridge_count = sum(1 for p in support_points if p['type'] == 'bridge')
+            total_area = sum(p['area'] for p in support_points if 'area' in p)
 
         return f"""Overhang/Bridge Detection Summary:
   Overhang support points: {overhang_count}
@@ -3,6 +3,8 @@ Path routing for support structures
 Routes supports around model obstacles using RRT-based pathfinding
 """
 
+import math
+
 import numpy as np
 from config import SupportConfig
 import heapq
@@ -23,6 +25,13 @@ class PathRouter:
         self.build_plate_z = build_plate_z
         self.step_size = SupportConfig.ROUTING_STEP_SIZE
 
+        # Trig of the routing angle limit, computed once per router rather
+        # than per RRT sample/segment (SupportConfig may be overridden
+        # before the router is built, so not at import time)
+        max_angle = math.radians(SupportConfig.MAX_ROUTING_ANGLE)
+        self._tan_max_routing = math.tan(max_angle)
+        self._cos_max_routing = math.cos(max_angle)
+
     def route_support_path(self, start_point, target_z=None, radius=0.5, max_iterations=500):
         """
         Route a support path from start point to build plate or target Z
@@ -54,28 +63,18 @@ class PathRouter:
         tree = RRTTree(start_point)
 
         # Goal region: any point at target_z
-        goal_reached = False
         best_node = None
 
-        for iteration in range(max_iterations):
-            # Sample random point with bias toward goal
-            if np.random.random() < 0.3:  # 30% bias toward goal
-                # Sample point directly below current position
-                sample = start_point.copy()
-                sample[2] = np.random.uniform(target_z, start_point[2])
-            else:
-                # Random sample in reachable space
-                sample = self._sample_random_point(start_point, target_z)
-
-            # Find nearest node in tree
-            nearest_node = tree.nearest(sample)
-
-            # Steer toward sample
-            new_point = self._steer(nearest_node.point, sample, self.step_size)
+        # Draw every iteration's sample up front rather than calling the
+        # RNG several times per iteration
+        samples = self._sample_rrt_points(start_point, target_z, max_iterations)
 
-            # Check constraints: max angle and collision
-            if not self._check_routing_constraints(nearest_node.point, new_point, radius):
+        for sample in samples:
+            # Nearest node, steer and constraint checks in one step
+            extension = self._extend_toward(tree, sample, radius)
+            if extension is None:
                 continue
+            nearest_node, new_point = extension
 
             # Add to tree
             new_node = tree.add_node(new_point, nearest_node)
@@ -83,29 +82,21 @@ class PathRouter:
             # Check if we reached target Z
             if new_point[2] <= target_z + self.step_size:
                 # Reached goal region
-                goal_reached = True
                 best_node = new_node
                 break
 
             # Track best node (closest to target Z)
-            if best_node is None or new_point[2] < best_node.point[2]:
+            if best_node is None or new_point[2] < tree.points[best_node][2]:
                 best_node = new_node
 
-        # Extract path
-        if goal_reached:
-            path = tree.extract_path(best_node)
-            # Ensure final point is exactly at target Z
-            final_point = path[-1].copy()
-            final_point[2] = target_z
-            path.append(final_point)
-            return path
-        elif best_node is not None:
-            # Partial path - extend straight down from best node
-            path = tree.extract_path(best_node)
-            final_point = path[-1].copy()
-            final_point[2] = target_z
-            path.append(final_point)
-            return path
+        # Extract path. On reaching the goal, ensure the final point is
+        # exactly at target Z; a partial path is extended straight down
+        # from the best node the same way
+        if best_node is not None:
+            path = tree.extract_path(best_node, extra_points=1)
+            path[-1] = path[-2]
+            path[-1, 2] = target_z
+            return path.tolist()
         else:
             # Fallback to straight path
             print(f"    Warning: Could not find routed path, using straight fallback")
@@ -122,82 +113,109 @@ class PathRouter:
 
         return [start_point.tolist(), end_point.tolist()]
 
-    def _sample_random_point(self, start_point, target_z):
-        """Sample a random point in the reachable space"""
-        # Sample within a cone below the start point
-        z_height = start_point[2] - target_z
-        max_lateral = z_height * np.tan(np.radians(SupportConfig.MAX_ROUTING_ANGLE))
+    def _sample_rrt_points(self, start_point, target_z, count):
+        """
+        Sample RRT target points with bias toward the goal
 
-        # Random point within cylinder
-        angle = np.random.uniform(0, 2*np.pi)
-        radius = np.random.uniform(0, max_lateral)
-        z = np.random.uniform(target_z, start_point[2])
+        30% of the samples lie directly below the start point, the rest
+        anywhere in the reachable space.
 
-        x = start_point[0] + radius * np.cos(angle)
-        y = start_point[1] + radius * np.sin(angle)
+        Args:
+            start_point: Starting point [x, y, z]
+            target_z: Target Z height
+            count: Number of samples
 
-        return np.array([x, y, z])
+        Returns:
+            (count, 3) array of sample points
+        """
+        goal_biased = np.random.random(count) < 0.3
+        samples = self._sample_random_points(start_point, target_z, count)
 
-    def _steer(self, from_point, to_point, max_distance):
-        """Steer from one point toward another with max distance"""
-        from_point = np.array(from_point)
-        to_point = np.array(to_point)
+        # Goal samples: point directly below the start position
+        samples[goal_biased, 0] = start_point[0]
+        samples[goal_biased, 1] = start_point[1]
+        return samples
 
-        direction = to_point - from_point
-        distance = np.linalg.norm(direction)
+    def _sample_random_points(self, start_point, target_z, count):
+        """Sample count random points in the reachable space"""
+        # Sample within a cone below the start point
+        z_height = start_point[2] - target_z
+        max_lateral = z_height * self._tan_max_routing
 
-        if distance <= max_distance:
-            return to_point
+        # Random points within cylinder
+        angle = np.random.uniform(0, 2*np.pi, count)
+        radius = np.random.uniform(0, max_lateral, count)
+        z = np.random.uniform(target_z, start_point[2], count)
 
-        # Limit to max_distance
-        direction = direction / distance
-        return from_point + direction * max_distance
+        x = start_point[0] + radius * np.cos(angle)
+        y = start_point[1] + radius * np.sin(angle)
 
-    def _check_routing_constraints(self, from_point, to_point, radius):
+        return np.column_stack([x, y, z])
+
+    def _extend_toward(self, tree, sample, radius):
         """
-        Check if a routing segment satisfies all constraints
+        Try to grow the tree one step toward a sample
+
+        Steps at most step_size from the nearest node toward the sample.
+        The step must head downward, stay within the routing angle of
+        vertical and not collide with the model. The steer and geometric
+        checks run on Python floats, since NumPy's per-call overhead
+        dominates for single 3-vectors, leaving a single collision query
+        for steps that pass them.
 
         Args:
-            from_point: Start point
-            to_point: End point
+            tree: RRTTree being grown
+            sample: Sample point [x, y, z]
             radius: Support radius
 
         Returns:
-            bool: True if segment is valid
+            tuple: (nearest node index, new point array), or None if the
+            step violates a routing constraint
         """
-        from_point = np.array(from_point)
-        to_point = np.array(to_point)
-
-        # Check 1: Must be generally downward
-        if to_point[2] > from_point[2]:
-            return False
-
-        # Check 2: Angle constraint
-        direction = to_point - from_point
-        distance = np.linalg.norm(direction)
-
-        if distance < 0.001:
-            return False
-
-        # Calculate angle from vertical
-        vertical = np.array([0, 0, -1])
-        angle = np.degrees(np.arccos(np.clip(np.dot(direction / distance, vertical), -1, 1)))
-
-        if angle > SupportConfig.MAX_ROUTING_ANGLE:
-            return False
-
-        # Check 3: Collision with model
-        if self.collision_detector.check_cylinder_collision(from_point, to_point, radius):
-            return False
-
-        return True
+        nearest_node = tree.nearest(sample)
+        nearest_point = tree.points[nearest_node]
+        fx, fy, fz = nearest_point.tolist()
+        sx, sy, sz = sample.tolist()
+
+        # Steer toward sample, limited to one step. Compare squared lengths;
+        # the sqrt is only needed to scale
+        dx, dy, dz = sx - fx, sy - fy, sz - fz
+        distance_sq = dx * dx + dy * dy + dz * dz
+        step = self.step_size
+        if distance_sq <= step * step:
+            tx, ty, tz = sx, sy, sz
+        else:
+            scale = step / math.sqrt(distance_sq)
+            tx, ty, tz = fx + dx * scale, fy + dy * scale, fz + dz * scale
+
+        # Must be generally downward
+        if tz > fz:
+            return None
+
+        # Angle from vertical (-Z) exceeds the limit exactly when its
+        # cosine -dz / distance is below the limit's cosine. Steps too short
+        # to have a direction are rejected, so compare without dividing
+        dx, dy, dz = tx - fx, ty - fy, tz - fz
+        distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+        if distance < 0.001 or -dz < self._cos_max_routing * distance:
+            return None
+
+        # The root is the contact point on the model surface, which every
+        # step near it would otherwise collide with
+        new_point = np.array([tx, ty, tz])
+        if self.collision_detector.check_cylinder_collision(nearest_point, new_point, radius,
+                                                            tip=tree.points[0]):
+            return None
+
+        return nearest_node, new_point
 
     def smooth_path(self, path, radius, iterations=3):
         """
         Smooth a path by removing unnecessary waypoints
 
         Args:
-            path: List of [x, y, z] points
+            path: List of [x, y, z] points, starting at the support's
+                contact with the model
             radius: Support radius
             iterations: Number of smoothing iterations
 
@@ -207,21 +225,82 @@ class PathRouter:
         if len(path) <= 2:
             return path
 
-        smoothed = path.copy()
+        points = np.asarray(path, dtype=float)
+        current = list(range(len(path)))
+
+        # Shortcut results keyed by (from, to) indices into the original
+        # path; later passes retest many of the same shortcuts
+        shortcut_hits = {}
 
         for _ in range(iterations):
+            # Greedy pass: from each kept anchor, drop waypoints for as long
+            # as the anchor connects straight to the point after them. The
+            # shortcuts from an anchor are checked in batches, and the
+            # first blocked one fixes the next anchor
+            smoothed = [current[0]]
             i = 0
-            while i < len(smoothed) - 2:
-                # Try to connect point i directly to point i+2
-                if not self.collision_detector.check_cylinder_collision(
-                    smoothed[i], smoothed[i+2], radius
-                ):
-                    # Can skip point i+1
-                    smoothed.pop(i+1)
-                else:
-                    i += 1
-
-        return smoothed
+            while i < len(current) - 2:
+                blocked = self._first_blocked_shortcut(points, current, i, radius, shortcut_hits)
+                if blocked is None:
+                    # Anchor connects directly to the final point
+                    i = len(current) - 2
+                    break
+                i = blocked - 1
+                smoothed.append(current[i])
+            smoothed.extend(current[i + 1:])
+
+            # Collision checks are deterministic, so a pass that removes
+            # nothing means later passes won't either
+            if len(smoothed) == len(current):
+                break
+            current = smoothed
+
+        return [path[k] for k in current]
+
+    def _first_blocked_shortcut(self, points, current, anchor, radius, shortcut_hits):
+        """
+        Find the first waypoint the anchor cannot connect to directly
+
+        Tests shortcuts from current[anchor] to current[anchor + 2],
+        current[anchor + 3], ... in growing batches. Only shortcuts missing
+        from shortcut_hits go to the collision detector.
+
+        Args:
+            points: (N, 3) array of all original path points
+            current: Indices into points of the remaining waypoints
+            anchor: Position in current to connect from
+            radius: Support radius
+            shortcut_hits: Dict of (from, to) point indices to collision
+                results, read and updated in place
+
+        Returns:
+            Position in current of the first blocked shortcut target, or
+            None if every later waypoint is reachable
+        """
+        start = current[anchor]
+        first = anchor + 2
+        batch = 1
+
+        while first < len(current):
+            last = min(first + batch, len(current))
+            targets = current[first:last]
+
+            unknown = [k for k in targets if (start, k) not in shortcut_hits]
+            if unknown:
+                end_points = points[unknown]
+                hits = self.collision_detector.check_cylinders_collision(
+                    np.broadcast_to(points[start], end_points.shape), end_points, radius,
+                    tip=points[0]
+                )
+                shortcut_hits.update(zip(((start, k) for k in unknown), hits.tolist()))
+
+            for offset, k in enumerate(targets):
+                if shortcut_hits[(start, k)]:
+                    return first + offset
+            first = last
+            batch *= 2
+
+        return None
 
     def calculate_path_cost(self, path):
         """
@@ -236,70 +315,75 @@ class PathRouter:
         if len(path) < 2:
             return 0.0
 
-        total_cost = 0.0
-        prev_direction = None
+        # All segments at once: lengths, unit directions and the bend
+        # angle between each consecutive pair
+        segments = np.diff(np.asarray(path, dtype=float), axis=0)
+        lengths = np.sqrt(np.einsum('ij,ij->i', segments, segments))
+        directions = segments / (lengths[:, None] + 1e-6)
+        cosines = np.einsum('ij,ij->i', directions[1:], directions[:-1])
+        angles = np.degrees(np.arccos(np.clip(cosines, -1, 1)))
 
-        for i in range(len(path) - 1):
-            segment = np.array(path[i+1]) - np.array(path[i])
-            length = np.linalg.norm(segment)
-            total_cost += length
-
-            # Add penalty for direction changes
-            if prev_direction is not None:
-                direction = segment / (length + 1e-6)
-                angle = np.degrees(np.arccos(np.clip(np.dot(direction, prev_direction), -1, 1)))
-                total_cost += angle * 0.1  # Penalty for bending
-
-            prev_direction = segment / (length + 1e-6)
-
-        return total_cost
+        # Length plus a penalty for bending
+        return float(lengths.sum() + 0.1 * angles.sum())
 
 
 class RRTTree:
-    """Simple RRT tree structure for pathfinding"""
+    """
+    Simple RRT tree structure for pathfinding
+
+    Nodes are indices into a points array that grows by doubling, with
+    each node's parent index (-1 for the root) in a parallel array.
+    """
 
-    def __init__(self, root_point):
+    def __init__(self, root_point, capacity=64):
         """Initialize tree with root node"""
-        self.root = RRTNode(root_point)
-        self.nodes = [self.root]
+        self.points = np.empty((capacity, 3))
+        self.parents = np.empty(capacity, dtype=np.int64)
+        self.points[0] = root_point
+        self.parents[0] = -1
+        self.size = 1
 
     def add_node(self, point, parent):
-        """Add a new node to the tree"""
-        node = RRTNode(point, parent)
-        self.nodes.append(node)
+        """Add a new node to the tree, returning its index"""
+        if self.size == len(self.points):
+            self.points = np.concatenate([self.points, np.empty_like(self.points)])
+            self.parents = np.concatenate([self.parents, np.empty_like(self.parents)])
+
+        node = self.size
+        self.points[node] = point
+        self.parents[node] = parent
+        self.size += 1
         return node
 
     def nearest(self, point):
-        """Find nearest node to a point"""
-        point = np.array(point)
-        min_dist = float('inf')
-        nearest_node = None
-
-        for node in self.nodes:
-            dist = np.linalg.norm(node.point - point)
-            if dist < min_dist:
-                min_dist = dist
-                nearest_node = node
-
-        return nearest_node
-
-    def extract_path(self, node):
-        """Extract path from root to node"""
-        path = []
-        current = node
+        """Find index of the nearest node to a point"""
+        offsets = self.points[:self.size] - point
+        return int(np.argmin(np.einsum('ij,ij->i', offsets, offsets)))
 
-        while current is not None:
-            path.append(current.point.tolist())
-            current = current.parent
+    def extract_path(self, node, extra_points=0):
+        """
+        Extract path from root to node
 
-        path.reverse()
-        return path
+        Args:
+            node: Index of the path's last node
+            extra_points: Number of uninitialized rows to leave at the end
+                for the caller to fill
 
+        Returns:
+            (depth + extra_points, 3) array of points
+        """
+        # Count the depth first so the path is written into one
+        # preallocated array, from the end back to the root
+        depth = 0
+        current = node
+        while current >= 0:
+            depth += 1
+            current = self.parents[current]
 
-class RRTNode:
-    """Node in RRT tree"""
+        path = np.empty((depth + extra_points, 3))
+        current = node
+        for row in range(depth - 1, -1, -1):
+            path[row] = self.points[current]
+            current = self.parents[current]
 
-    def __init__(self, point, parent=None):
-        """Initialize node"""
-        self.point = np.array(point, dtype=float)
-        self.parent = parent
+        return path
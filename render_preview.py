@@ -9,8 +9,17 @@ import matplotlib
 matplotlib.use('Agg')  # headless
 import matplotlib.pyplot as plt
 from matplotlib import patches
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+import copy
 import os
 
+try:
+    # VTK renders offscreen on the GPU; matplotlib's 3D backend sorts and
+    # draws every face in Python, which dominates preview time on real STLs
+    import pyvista as pv
+except ImportError:
+    pv = None
+
 
 FACE_CLASS_COLOR = {
     'front': '#2ecc71',   # green = visible front (we want zero of these)
@@ -19,10 +28,111 @@ FACE_CLASS_COLOR = {
     'unknown': '#7f8c8d',
 }
 
+def _camera_position(mesh, elev, azim):
+    """
+    PyVista camera looking at the mesh from a matplotlib-style view angle
+
+    Args:
+        mesh: trimesh.Trimesh being viewed
+        elev: Elevation in degrees above the XY plane
+        azim: Azimuth in degrees from +X, counterclockwise
+
+    Returns:
+        [position, focal_point, view_up] camera position
+    """
+    center = mesh.bounds.mean(axis=0)
+    elev, azim = np.radians([elev, azim])
+    direction = np.array([np.cos(elev) * np.cos(azim),
+                          np.cos(elev) * np.sin(azim),
+                          np.sin(elev)])
+    position = center + 3.0 * mesh.extents.max() * direction
+    return [tuple(position), tuple(center), (0.0, 0.0, 1.0)]
+
+
+def _render_panels(panels, shape, output_image, window_size, build_plate=False):
+    """
+    Render mesh views into one image with a single offscreen PyVista plotter
+
+    Each mesh is converted to a VTK dataset once and shared by all the
+    panels that show it.
+
+    Args:
+        panels: List of (mesh, title, elev, azim, cmap, opacity) per panel,
+            filled row by row
+        shape: (rows, columns) of the panel grid
+        output_image: Output PNG path
+        window_size: (width, height) of the image in pixels
+        build_plate: Draw a translucent build plate under each mesh
+    """
+    plotter = pv.Plotter(shape=shape, off_screen=True, window_size=window_size)
+    plotter.set_background('white')
+    datasets = {}
+
+    for index, (mesh, title, elev, azim, cmap, opacity) in enumerate(panels):
+        if id(mesh) not in datasets:
+            dataset = pv.wrap(mesh)
+            dataset['z'] = mesh.vertices[:, 2]
+            datasets[id(mesh)] = dataset
+
+        plotter.subplot(*divmod(index, shape[1]))
+        plotter.add_text(title, font_size=10, color='black')
+        plotter.add_mesh(datasets[id(mesh)], scalars='z', cmap=cmap,
+                         opacity=opacity, show_scalar_bar=False)
+
+        if build_plate:
+            (x_min, y_min, _), (x_max, y_max, _) = mesh.bounds
+            plate = pv.Plane(center=((x_min + x_max) * 0.5, (y_min + y_max) * 0.5, 0.0),
+                             i_size=x_max - x_min, j_size=y_max - y_min)
+            plotter.add_mesh(plate, color='gray', opacity=0.2)
+
+        plotter.camera_position = _camera_position(mesh, elev, azim)
+        plotter.reset_camera()
+
+    plotter.screenshot(output_image)
+    plotter.close()
+
+
+def _mesh_collection(mesh, cmap, alpha):
+    """
+    Build a Poly3DCollection of the mesh, colored by face height
+
+    Matches plot_trisurf's colormap shading. The colormap is evaluated
+    here once into fixed face colors, rather than by every axis at draw
+    time. Build it once per mesh and add a shallow copy to each axis
+    (matplotlib binds an artist to one axes) instead of re-triangulating
+    the mesh per view.
+
+    Args:
+        mesh: trimesh.Trimesh to draw
+        cmap: Matplotlib colormap name
+        alpha: Face opacity
+
+    Returns:
+        Poly3DCollection
+    """
+    triangles = mesh.vertices[mesh.faces]
+    heights = triangles[:, :, 2].mean(axis=1)
+    norm = plt.Normalize(heights.min(), heights.max())
+    face_colors = plt.get_cmap(cmap)(norm(heights))
+
+    return Poly3DCollection(triangles, facecolors=face_colors, alpha=alpha,
+                            edgecolor='none', linewidth=0)
+
+
 def render_stl_views(filepath, output_image):
     """Render front, side, and top views of an STL"""
     mesh = trimesh.load(filepath)
 
+    if pv is not None:
+        _render_panels(
+            [(mesh, 'Front View (XZ)', 0, 0, 'viridis', 0.8),
+             (mesh, 'Side View (YZ)', 0, 90, 'viridis', 0.8),
+             (mesh, 'Perspective View', 20, 45, 'viridis', 0.8)],
+            (1, 3), output_image, (2250, 750)
+        )
+        print(f"Saved render: {output_image}")
+        return
+
     # Create figure with subplots
     fig = plt.figure(figsize=(15, 5))
 
@@ -38,33 +148,19 @@ def render_stl_views(filepath, output_image):
     ax3 = fig.add_subplot(133, projection='3d')
     ax3.set_title('Perspective View', fontsize=12, fontweight='bold')
 
+    # Set equal aspect ratio, from bounds computed once for all views
+    bounds = mesh.bounds
+    max_range = (bounds[1] - bounds[0]).max() / 2.0
+    mid = (bounds[0] + bounds[1]) * 0.5
+
     # Plot mesh on each subplot
+    collection = _mesh_collection(mesh, 'viridis', 0.8)
     for ax in [ax1, ax2, ax3]:
-        ax.plot_trisurf(
-            mesh.vertices[:, 0],
-            mesh.vertices[:, 1],
-            mesh.vertices[:, 2],
-            triangles=mesh.faces,
-            cmap='viridis',
-            alpha=0.8,
-            edgecolor='none',
-            linewidth=0
-        )
-
-        # Set equal aspect ratio
-        max_range = np.array([
-            mesh.vertices[:, 0].max() - mesh.vertices[:, 0].min(),
-            mesh.vertices[:, 1].max() - mesh.vertices[:, 1].min(),
-            mesh.vertices[:, 2].max() - mesh.vertices[:, 2].min()
-        ]).max() / 2.0
+        ax.add_collection3d(copy.copy(collection))
 
-        mid_x = (mesh.vertices[:, 0].max() + mesh.vertices[:, 0].min()) * 0.5
-        mid_y = (mesh.vertices[:, 1].max() + mesh.vertices[:, 1].min()) * 0.5
-        mid_z = (mesh.vertices[:, 2].max() + mesh.vertices[:, 2].min()) * 0.5
-
-        ax.set_xlim(mid_x - max_range, mid_x + max_range)
-        ax.set_ylim(mid_y - max_range, mid_y + max_range)
-        ax.set_zlim(mid_z - max_range, mid_z + max_range)
+        ax.set_xlim(mid[0] - max_range, mid[0] + max_range)
+        ax.set_ylim(mid[1] - max_range, mid[1] + max_range)
+        ax.set_zlim(mid[2] - max_range, mid[2] + max_range)
 
         ax.set_xlabel('X (mm)', fontsize=9)
         ax.set_ylabel('Y (mm)', fontsize=9)
@@ -88,6 +184,19 @@ def render_comparison(original_file, supported_file, output_image):
     orig = trimesh.load(original_file)
     supp = trimesh.load(supported_file)
 
+    if pv is not None:
+        _render_panels(
+            [(orig, 'Original - Front', 0, 0, 'coolwarm', 0.9),
+             (orig, 'Original - Side', 0, 90, 'coolwarm', 0.9),
+             (orig, 'Original - Perspective', 20, 45, 'coolwarm', 0.9),
+             (supp, 'With Supports - Front', 0, 0, 'summer', 0.9),
+             (supp, 'With Supports - Side', 0, 90, 'summer', 0.9),
+             (supp, 'With Supports - Perspective', 20, 45, 'summer', 0.9)],
+            (2, 3), output_image, (2400, 1200), build_plate=True
+        )
+        print(f"Saved comparison: {output_image}")
+        return
+
     fig = plt.figure(figsize=(16, 8))
 
     # Original model - front view
@@ -114,47 +223,35 @@ def render_comparison(original_file, supported_file, output_image):
     ax6 = fig.add_subplot(236, projection='3d')
     ax6.set_title('With Supports - Perspective', fontsize=11, fontweight='bold', color='green')
 
+    # Bounds once per mesh, shared by the build plate and axis setup
+    orig_bounds = orig.bounds
+    supp_bounds = supp.bounds
+
     # Plot original
+    collection = _mesh_collection(orig, 'coolwarm', 0.9)
     for ax in [ax1, ax2, ax3]:
-        ax.plot_trisurf(
-            orig.vertices[:, 0],
-            orig.vertices[:, 1],
-            orig.vertices[:, 2],
-            triangles=orig.faces,
-            cmap='coolwarm',
-            alpha=0.9,
-            edgecolor='none'
-        )
+        ax.add_collection3d(copy.copy(collection))
 
         # Build plate indicator
-        x_min, x_max = orig.vertices[:, 0].min(), orig.vertices[:, 0].max()
-        y_min, y_max = orig.vertices[:, 1].min(), orig.vertices[:, 1].max()
+        (x_min, y_min, _), (x_max, y_max, _) = orig_bounds
         xx, yy = np.meshgrid([x_min, x_max], [y_min, y_max])
         zz = np.zeros_like(xx)
         ax.plot_surface(xx, yy, zz, alpha=0.2, color='gray')
 
-        setup_axis(ax, orig)
+        setup_axis(ax, orig_bounds)
 
     # Plot supported
+    collection = _mesh_collection(supp, 'summer', 0.9)
     for ax in [ax4, ax5, ax6]:
-        ax.plot_trisurf(
-            supp.vertices[:, 0],
-            supp.vertices[:, 1],
-            supp.vertices[:, 2],
-            triangles=supp.faces,
-            cmap='summer',
-            alpha=0.9,
-            edgecolor='none'
-        )
+        ax.add_collection3d(copy.copy(collection))
 
         # Build plate
-        x_min, x_max = supp.vertices[:, 0].min(), supp.vertices[:, 0].max()
-        y_min, y_max = supp.vertices[:, 1].min(), supp.vertices[:, 1].max()
+        (x_min, y_min, _), (x_max, y_max, _) = supp_bounds
         xx, yy = np.meshgrid([x_min, x_max], [y_min, y_max])
         zz = np.zeros_like(xx)
         ax.plot_surface(xx, yy, zz, alpha=0.2, color='gray')
 
-        setup_axis(ax, supp)
+        setup_axis(ax, supp_bounds)
 
     # Set viewing angles
     ax1.view_init(elev=0, azim=0)
@@ -170,17 +267,16 @@ def render_comparison(original_file, supported_file, output_image):
     print(f"Saved comparison: {output_image}")
     plt.close()
 
-def setup_axis(ax, mesh):
-    """Setup axis for consistent view"""
-    max_range = np.array([
-        mesh.vertices[:, 0].max() - mesh.vertices[:, 0].min(),
-        mesh.vertices[:, 1].max() - mesh.vertices[:, 1].min(),
-        mesh.vertices[:, 2].max() - mesh.vertices[:, 2].min()
-    ]).max() / 2.0
+def setup_axis(ax, bounds):
+    """
+    Setup axis for consistent view
 
-    mid_x = (mesh.vertices[:, 0].max() + mesh.vertices[:, 0].min()) * 0.5
-    mid_y = (mesh.vertices[:, 1].max() + mesh.vertices[:, 1].min()) * 0.5
-    mid_z = (mesh.vertices[:, 2].max() + mesh.vertices[:, 2].min()) * 0.5
+    Args:
+        ax: Matplotlib 3D axis
+        bounds: (2, 3) array of mesh min/max corners (trimesh mesh.bounds)
+    """
+    max_range = (bounds[1] - bounds[0]).max() / 2.0
+    mid_x, mid_y, mid_z = (bounds[0] + bounds[1]) * 0.5
 
     ax.set_xlim(mid_x - max_range, mid_x + max_range)
     ax.set_ylim(mid_y - max_range, mid_y + max_range)
@@ -267,8 +363,9 @@ def render_support_preview(model_mesh, contact_metadata, output_image, front_axi
     ax_side.view_init(elev=side_elev, azim=side_azim)
     ax_iso.view_init(elev=25, azim=front_azim + 45)
 
+    model_bounds = model_mesh.bounds
     for ax in (ax_front, ax_side, ax_iso):
-        setup_axis(ax, model_mesh)
+        setup_axis(ax, model_bounds)
 
     # Build the legend on the iso axis
     legend_handles = [
@@ -5,50 +5,92 @@ Automatic support generation for resin 3D printing
 """
 
 import argparse
-import sys
+import contextlib
 import os
+import sys
 from pathlib import Path
 
-from mesh_loader import MeshLoader
+# Environment variables sizing the BLAS/OpenMP thread pools used by numpy
+# and scipy. They are read when numpy is first imported, so --num-threads
+# is picked out of argv here, before the pipeline modules import it
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+
+
+def _apply_num_threads(argv):
+    """Set the thread pool sizes from --num-threads, if given"""
+    pre_parser = argparse.ArgumentParser(add_help=False)
+    pre_parser.add_argument('--num-threads', type=str)
+    num_threads = pre_parser.parse_known_args(argv)[0].num_threads
+
+    # Invalid values are left for the main parser to report
+    if num_threads and num_threads.isdigit() and int(num_threads) > 0:
+        for name in THREAD_ENV_VARS:
+            os.environ[name] = num_threads
+
+
+_apply_num_threads(sys.argv[1:])
+
+from mesh_loader import MeshLoader, MeshAnalyzer, export_stl, mesh_cache_key
 from orientation import OrientationOptimizer
 from island_detector import IslandDetector
-from overhang_detector import OverhangDetector
+from overhang_detector import OverhangDetector, SupportPoints
 from support_structures import SupportGenerator
 from support_optimizer import SupportOptimizer
 from config import (
-    PrinterConfig, ResinConfig, SupportConfig, AnalysisConfig, get_config
+    PrinterConfig, ResinConfig, SupportConfig, AnalysisConfig, RunConfig,
+    MINIATURE_RUN_CONFIG, get_config
 )
 
 
-def print_banner():
-    """Print application banner"""
-    banner = """
+# Printed at startup
+BANNER = """
 ╔═══════════════════════════════════════════════════════════╗
 ║         Battlefield Support Generator v1.0                ║
 ║    Automatic Support Generation for Resin 3D Printing     ║
 ╚═══════════════════════════════════════════════════════════╝
 """
-    print(banner)
+
+# Filled from the config classes at print time, since the CLI overrides them
+CONFIG_INFO_TEMPLATE = """Configuration:
+  Printer: {printer.PRINTER_NAME}
+    Resolution: {printer.XY_RESOLUTION}mm ({printer.RESOLUTION_X}x{printer.RESOLUTION_Y})
+    Build Volume: {printer.BUILD_VOLUME_X}x{printer.BUILD_VOLUME_Y}x{printer.BUILD_VOLUME_Z}mm
+  Resin: {resin.RESIN_NAME}
+    Tensile Strength: {resin.TENSILE_STRENGTH} MPa
+  Support Parameters:
+    Tip Diameter: {support.SUPPORT_TIP_DIAMETER}mm (light: {support.SUPPORT_TIP_DIAMETER_LIGHT}mm)
+    Base Diameter: {support.SUPPORT_BASE_DIAMETER}mm
+    Support Spacing: {support.SUPPORT_SPACING}mm
+    Max Bridge Length: {support.MAX_BRIDGE_LENGTH}mm
+    Max Overhang Angle: {support.MAX_OVERHANG_ANGLE}°
+  Optimization:
+    Merge Radius: {support.MERGE_RADIUS}mm
+    Safety Margin: {support.SAFETY_MARGIN}x
+"""
+
+
+# Rule printed above and below each step title
+SECTION_RULE = "=" * 60
+
+
+def print_banner():
+    """Print application banner"""
+    print(BANNER)
 
 
 def print_config_info():
     """Print configuration information"""
-    print("Configuration:")
-    print(f"  Printer: {PrinterConfig.PRINTER_NAME}")
-    print(f"    Resolution: {PrinterConfig.XY_RESOLUTION}mm ({PrinterConfig.RESOLUTION_X}x{PrinterConfig.RESOLUTION_Y})")
-    print(f"    Build Volume: {PrinterConfig.BUILD_VOLUME_X}x{PrinterConfig.BUILD_VOLUME_Y}x{PrinterConfig.BUILD_VOLUME_Z}mm")
-    print(f"  Resin: {ResinConfig.RESIN_NAME}")
-    print(f"    Tensile Strength: {ResinConfig.TENSILE_STRENGTH} MPa")
-    print(f"  Support Parameters:")
-    print(f"    Tip Diameter: {SupportConfig.SUPPORT_TIP_DIAMETER}mm (light: {SupportConfig.SUPPORT_TIP_DIAMETER_LIGHT}mm)")
-    print(f"    Base Diameter: {SupportConfig.SUPPORT_BASE_DIAMETER}mm")
-    print(f"    Support Spacing: {SupportConfig.SUPPORT_SPACING}mm")
-    print(f"    Max Bridge Length: {SupportConfig.MAX_BRIDGE_LENGTH}mm")
-    print(f"    Max Overhang Angle: {SupportConfig.MAX_OVERHANG_ANGLE}°")
-    print(f"  Optimization:")
-    print(f"    Merge Radius: {SupportConfig.MERGE_RADIUS}mm")
-    print(f"    Safety Margin: {SupportConfig.SAFETY_MARGIN}x")
-    print()
+    print(CONFIG_INFO_TEMPLATE.format(printer=PrinterConfig, resin=ResinConfig,
+                                      support=SupportConfig))
+
+
+def print_section(title, spaced=True):
+    """Print a step header, preceded by a blank line if spaced"""
+    if spaced:
+        print()
+    print(SECTION_RULE)
+    print(title)
+    print(SECTION_RULE)
 
 
 def parse_args():
@@ -103,12 +145,35 @@ Examples:
     parser.add_argument('--no-bridges', action='store_true',
                         help='Skip bridge detection')
 
+    parser.add_argument('--heightmap-mode', action='store_true',
+                        help='Treat the model as resting flat on the plate and skip '
+                             'island, overhang and bridge detection')
+
     parser.add_argument('--orientation-samples', type=int, default=20,
                         help='Number of orientations to test (default: 20)')
 
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always load, orient and analyze the model, ignoring the '
+                             'prepared mesh and detail caches')
+
+    parser.add_argument('--jobs', type=int, default=AnalysisConfig.SLICE_WORKERS,
+                        help='Processes for island slicing and support generation '
+                             '(default: all CPUs, 1 = serial)')
+
+    parser.add_argument('--num-threads', type=int, default=None,
+                        help='Threads for numpy/scipy linear algebra (default: all CPUs). '
+                             'Use 1 when running several instances in parallel')
+
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='Verbose output')
 
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='Suppress progress output (errors are still shown)')
+
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile the run and write a report next to the output '
+                             '(pyinstrument HTML if installed, else cProfile stats)')
+
     parser.add_argument('--show-config', action='store_true',
                         help='Show configuration and exit')
 
@@ -162,6 +227,61 @@ def main():
     # Parse arguments
     args = parse_args()
 
+    pipeline = profile_run if args.profile else run
+    if not args.quiet:
+        return pipeline(args)
+
+    # Progress goes to stdout, errors to stderr
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return pipeline(args)
+
+
+def profile_run(args):
+    """
+    Run the pipeline under a profiler
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        int: Process exit code
+    """
+    # Profile the whole pipeline; the report is written even if it fails
+    report_base = args.output or args.input
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return run(args)
+        finally:
+            profiler.disable()
+            profiler.dump_stats(f"{report_base}.profile.prof")
+            print(f"Profile (cProfile stats, pip install pyinstrument for HTML): "
+                  f"{report_base}.profile.prof")
+
+    profiler = Profiler()
+    profiler.start()
+    try:
+        return run(args)
+    finally:
+        profiler.stop()
+        profiler.write_html(f"{report_base}.profile.html")
+        print(f"Profile: {report_base}.profile.html")
+
+
+def run(args):
+    """
+    Run the support generation pipeline
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        int: Process exit code
+    """
     # Print banner
     print_banner()
 
@@ -171,57 +291,79 @@ def main():
         return 0
 
     # Validate input file
-    if not os.path.exists(args.input):
-        print(f"Error: Input file '{args.input}' not found")
+    input_path = Path(args.input)
+    if not input_path.exists():
+        print(f"Error: Input file '{args.input}' not found", file=sys.stderr)
         return 1
 
-    # Determine output filename
+    # Determine output filenames. Sibling outputs (supports-only, metadata,
+    # preview) are named after the fused output's stem
     if args.output:
-        output_file = args.output
+        output_path = Path(args.output)
+        fused_path = args.output
+        out_dir = output_path.parent
+        stem = output_path.stem.replace('_supported', '')
     else:
-        input_path = Path(args.input)
-        output_file = str(input_path.parent / f"{input_path.stem}_supported.stl")
+        out_dir = input_path.parent
+        stem = input_path.stem
+        fused_path = str(out_dir / f"{stem}_supported.stl")
 
     # Apply miniature mode if requested (overrides other settings)
     if args.miniature_mode:
         print("Miniature Mode: Optimizing for detail preservation")
-        # Even more aggressive settings for miniatures
-        SupportConfig.SUPPORT_SPACING = 5.0  # Very sparse
-        SupportConfig.EDGE_SUPPORT_SPACING = 3.0
-        SupportConfig.MAX_OVERHANG_ANGLE = 55.0  # Let resin self-support more
-        SupportConfig.MAX_BRIDGE_LENGTH = 7.0  # Longer bridges
-        SupportConfig.MIN_ISLAND_AREA = 1.0  # Skip tiny islands
-        SupportConfig.MERGE_RADIUS = 2.0  # Aggressive merging
-        SupportConfig.SAFETY_MARGIN = 1.0  # No safety margin
-        SupportConfig.SUPPORT_TIP_DIAMETER = 0.25  # Smaller tips
-        SupportConfig.SUPPORT_BASE_DIAMETER = 0.7  # Thinner supports
+        run_config = MINIATURE_RUN_CONFIG
         print()
-
-    # Update config from command line (only if not in miniature mode)
-    if not args.miniature_mode:
-        SupportConfig.SUPPORT_TIP_DIAMETER = args.support_tip
-        SupportConfig.MAX_BRIDGE_LENGTH = args.max_bridge
-        SupportConfig.MIN_ISLAND_AREA = args.min_island_area
-        SupportConfig.MAX_OVERHANG_ANGLE = args.overhang_angle
-        SupportConfig.SUPPORT_SPACING = args.support_spacing
-    SupportConfig.MERGE_RADIUS = args.merge_radius
-    SupportConfig.SUPPORT_TIP_DIAMETER_MICRO = args.micro_tip
-    AnalysisConfig.SLICE_LAYER_HEIGHT = args.layer_height
+    else:
+        run_config = RunConfig(
+            support_tip_diameter=args.support_tip,
+            max_bridge_length=args.max_bridge,
+            min_island_area=args.min_island_area,
+            max_overhang_angle=args.overhang_angle,
+            support_spacing=args.support_spacing,
+        )
+
+    # Always taken from the command line
+    run_config = run_config.replace(
+        merge_radius=args.merge_radius,
+        support_tip_diameter_micro=args.micro_tip,
+        slice_layer_height=args.layer_height,
+        slice_workers=args.jobs,
+        routing_workers=args.jobs,
+    )
+    run_config.apply()
 
     # Print configuration (after all settings applied)
     print_config_info()
 
-    print("="*60)
-    print("STEP 1: Loading Model")
-    print("="*60)
+    print_section("STEP 1: Loading Model", spaced=False)
 
-    # Load mesh
+    # The loaded, repaired and oriented mesh is cached by file contents
+    # and only the settings that loading, repair and orientation read, so
+    # re-running the same model with different support settings skips
+    # steps 1 and 2
     loader = MeshLoader()
-    try:
-        mesh = loader.load(args.input)
-    except Exception as e:
-        print(f"Error loading mesh: {e}")
-        return 1
+    cache_key = None
+    cached = None
+    if not args.no_auto_orient and not args.no_cache:
+        cache_key = mesh_cache_key(
+            args.input, front=args.front, orientation_samples=args.orientation_samples,
+            mesh_repair=AnalysisConfig.MESH_REPAIR,
+            build_volume=(PrinterConfig.BUILD_VOLUME_X, PrinterConfig.BUILD_VOLUME_Y,
+                          PrinterConfig.BUILD_VOLUME_Z),
+            max_overhang_angle=SupportConfig.MAX_OVERHANG_ANGLE,
+            front_face_scar_penalty=SupportConfig.FRONT_FACE_SCAR_PENALTY,
+        )
+        cached = loader.load_cached(cache_key)
+
+    if cached is not None:
+        mesh = loader.mesh
+    else:
+        # Load mesh
+        try:
+            mesh = loader.load(args.input)
+        except Exception as e:
+            print(f"Error loading mesh: {e}", file=sys.stderr)
+            return 1
 
     # Print mesh info
     dims = loader.get_dimensions()
@@ -239,10 +381,14 @@ def main():
     # Auto-orientation
     front_axis = None
     front_axis_label = None
-    if not args.no_auto_orient:
-        print("\n" + "="*60)
-        print("STEP 2: Auto-Orientation")
-        print("="*60)
+    if not args.no_auto_orient and cached is not None:
+        print_section("STEP 2: Auto-Orientation (cached)")
+
+        front_axis = cached['front_axis']
+        front_axis_label = str(cached['front_axis_label']) or None
+        print(f"  Using cached orientation, front axis: {front_axis_label or front_axis}")
+    elif not args.no_auto_orient:
+        print_section("STEP 2: Auto-Orientation")
 
         optimizer = OrientationOptimizer(mesh, front_axis=args.front)
         optimizer.apply_optimal_orientation(num_samples=args.orientation_samples)
@@ -254,6 +400,10 @@ def main():
 
         # Center on build plate
         loader.center_on_build_plate()
+
+        if cache_key is not None:
+            loader.save_cached(cache_key, front_axis=front_axis,
+                               front_axis_label=front_axis_label or '')
     else:
         # Still resolve the front axis (no rotation applied) so support
         # placement can avoid the front face.
@@ -269,32 +419,30 @@ def main():
             front_axis = optimizer.front_axis.copy()
             front_axis_label = optimizer.front_axis_label
 
-    # Collect support points
-    all_support_points = []
+    # Collect support points from every detector into one set of arrays
+    all_support_points = SupportPoints.empty()
+
+    # Flat-bottomed models need no detection: everything that would need
+    # support already rests on the build plate
+    on_plate = args.heightmap_mode or MeshAnalyzer(mesh).rests_on_build_plate()
+    if on_plate:
+        print("\nAll overhangs rest on the build plate, skipping island, "
+              "overhang and bridge detection")
 
     # Island detection
-    if not args.no_islands:
-        print("\n" + "="*60)
-        print("STEP 3: Island Detection")
-        print("="*60)
+    if not args.no_islands and not on_plate:
+        print_section("STEP 3: Island Detection")
 
         detector = IslandDetector(mesh, layer_height=args.layer_height)
-        islands = detector.detect_islands()
+        detector.detect_islands()
         print(detector.get_island_summary())
 
         # Add island support points
-        if isinstance(islands, list):
-            for island in islands:
-                if isinstance(island, list):
-                    all_support_points.extend(island)
-                elif isinstance(island, dict):
-                    all_support_points.append(island)
+        all_support_points.extend(detector.get_support_points())
 
     # Overhang and bridge detection
-    if not args.no_overhangs or not args.no_bridges:
-        print("\n" + "="*60)
-        print("STEP 4: Overhang & Bridge Detection")
-        print("="*60)
+    if (not args.no_overhangs or not args.no_bridges) and not on_plate:
+        print_section("STEP 4: Overhang & Bridge Detection")
 
         overhang_detector = OverhangDetector(mesh)
 
@@ -314,22 +462,19 @@ def main():
 
     # Optimize support points
     if not args.no_optimize and all_support_points:
-        print("\n" + "="*60)
-        print("STEP 5: Support Optimization")
-        print("="*60)
+        print_section("STEP 5: Support Optimization")
 
         optimizer_config = {
             'merge_radius': SupportConfig.MERGE_RADIUS,
             'curvature_threshold': SupportConfig.DETAIL_CURVATURE_THRESHOLD,
             'thin_feature_threshold': SupportConfig.THIN_FEATURE_THRESHOLD,
+            'use_cache': not args.no_cache,
         }
         optimizer = SupportOptimizer(mesh, config=optimizer_config)
         all_support_points = optimizer.optimize_support_points(all_support_points)
 
     # Generate supports
-    print("\n" + "="*60)
-    print("STEP 6: Support Generation")
-    print("="*60)
+    print_section("STEP 6: Support Generation")
 
     if front_axis is not None:
         print(f"  Front axis for placement: {front_axis_label or front_axis} "
@@ -347,14 +492,8 @@ def main():
         print("\nNo supports needed! Model can print without supports.")
 
     # Export
-    print("\n" + "="*60)
-    print("STEP 7: Export")
-    print("="*60)
+    print_section("STEP 7: Export")
 
-    input_path = Path(args.input)
-    out_dir = Path(output_file).parent if args.output else input_path.parent
-    stem = Path(output_file).stem.replace('_supported', '') if args.output else input_path.stem
-    fused_path = str(out_dir / f"{stem}_supported.stl") if not args.output else output_file
     supports_only_path = str(out_dir / f"{stem}_supports_only.stl")
     meta_path = str(out_dir / f"{stem}_supports_meta.json")
 
@@ -365,7 +504,7 @@ def main():
         # Fused (model + supports) STL
         if emit_fused:
             final_mesh = generator.merge_with_model(supports) if supports is not None else mesh
-            final_mesh.export(fused_path)
+            export_stl(final_mesh, fused_path)
             print(f"\nFused STL: {fused_path}")
             final_vertex_count = len(final_mesh.vertices)
             final_face_count = len(final_mesh.faces)
@@ -377,11 +516,11 @@ def main():
         # users dropping these into Chitubox/Lychee as two separate objects
         # don't have to re-orient by hand to make the supports align.
         if emit_supports_only:
-            supports.export(supports_only_path)
+            export_stl(supports, supports_only_path)
             print(f"Supports-only STL: {supports_only_path}")
             if not emit_fused:
                 oriented_path = str(out_dir / f"{stem}_oriented_model.stl")
-                mesh.export(oriented_path)
+                export_stl(mesh, oriented_path)
                 print(f"Oriented model STL: {oriented_path}")
 
         # Sidecar metadata JSON
@@ -416,9 +555,7 @@ def main():
                 print(f"  Preview render failed: {e}")
 
         # Print final statistics
-        print("\n" + "="*60)
-        print("Summary")
-        print("="*60)
+        print_section("Summary")
         print(f"Input file: {args.input}")
         print(f"Support points generated: {len(all_support_points)}")
         if supports is not None:
@@ -433,7 +570,7 @@ def main():
             print("  Import the supports-only STL as a second object alongside your model.")
 
     except Exception as e:
-        print(f"\nError exporting mesh: {e}")
+        print(f"\nError exporting mesh: {e}", file=sys.stderr)
         return 1
 
     return 0
@@ -3,10 +3,48 @@ Support optimization for detail preservation
 Implements point consolidation, detail zone detection, and tiered support sizing
 """
 
+import hashlib
+import os
+
 import numpy as np
-from scipy.spatial import KDTree
-from collections import defaultdict
+import trimesh
+from scipy.spatial import cKDTree
 from config import SupportConfig
+from mesh_loader import MESH_CACHE_DIR
+from overhang_detector import SupportPoints
+
+# Bump when the cached detail arrays or the steps that produce them change
+DETAIL_CACHE_VERSION = 1
+
+# Support tiers, indexed by the tier codes used in vectorized
+# classification
+SUPPORT_TIERS = ('micro', 'light', 'medium', 'heavy')
+MICRO_TIER, LIGHT_TIER, MEDIUM_TIER, HEAVY_TIER = range(len(SUPPORT_TIERS))
+
+# Up to this many points, a pairwise distance matrix finds neighbors
+# faster than building and querying a KD-tree
+BRUTE_FORCE_NEIGHBOR_MAX_POINTS = 64
+
+
+def _neighbors_within(points, radius):
+    """
+    Indices of the points within radius of each point, itself included
+
+    Args:
+        points: (N, D) array of points
+        radius: Scalar or (N,) array of per-point search radii
+
+    Returns:
+        List of N index sequences, in no particular order
+    """
+    if len(points) <= BRUTE_FORCE_NEIGHBOR_MAX_POINTS:
+        diff = points[:, None, :] - points[None, :, :]
+        radius_sq = np.broadcast_to(np.square(radius), (len(points),))
+        within = np.einsum('ijk,ijk->ij', diff, diff) <= radius_sq[:, None]
+        return [np.flatnonzero(row) for row in within]
+
+    tree = cKDTree(points)
+    return tree.query_ball_point(points, radius, return_sorted=False, workers=-1)
 
 
 class SupportOptimizer:
@@ -23,6 +61,12 @@ class SupportOptimizer:
         # Consolidation parameters
         self.merge_radius = self.config.get('merge_radius', 1.5)  # mm - merge points closer than this
 
+        # Reuse detail analysis of the same mesh from earlier runs
+        self.use_cache = self.config.get('use_cache', False)
+
+        # KD-tree over face centers, built by tag_points_with_face_metadata
+        self._face_tree = None
+
         # Analyze mesh for detail zones
         self._analyze_mesh_details()
 
@@ -31,72 +75,130 @@ class SupportOptimizer:
         print("  Analyzing mesh for detail zones...")
 
         # Create spatial index for fast queries (needed by other methods)
-        self.vertex_tree = KDTree(self.mesh.vertices)
+        self.vertex_tree = cKDTree(self.mesh.vertices)
 
-        # Calculate vertex curvature using discrete mean curvature
-        self.vertex_curvature = self._calculate_vertex_curvature()
+        # Vertex -> face map in CSR form: the faces containing vertex v
+        # are _vertex_faces[_vertex_face_ptr[v]:_vertex_face_ptr[v + 1]]
+        corner_vertices = self.mesh.faces.ravel()
+        self._vertex_faces = np.argsort(corner_vertices, kind='stable') // 3
+        self._vertex_face_ptr = np.concatenate([
+            [0], np.cumsum(np.bincount(corner_vertices, minlength=len(self.mesh.vertices)))
+        ])
 
-        # Identify thin features using local thickness estimation
-        self.thin_features = self._detect_thin_features()
+        cache_path = self._detail_cache_path() if self.use_cache else None
+        if cache_path is None or not self._load_cached_details(cache_path):
+            # Calculate vertex curvature using discrete mean curvature
+            self.vertex_curvature = self._calculate_vertex_curvature()
 
-        # Calculate per-face detail scores
-        self.face_detail_scores = self._calculate_face_detail_scores()
+            # Identify thin features using local thickness estimation
+            self.thin_features = self._detect_thin_features()
 
-        high_detail_faces = np.sum(self.face_detail_scores > 0.5)
-        print(f"    Found {high_detail_faces} high-detail faces ({100*high_detail_faces/len(self.mesh.faces):.1f}%)")
+            # Calculate per-face detail scores
+            self.face_detail_scores = self._calculate_face_detail_scores()
 
-    def _calculate_vertex_curvature(self):
-        """Calculate mean curvature at each vertex using angle deficit method"""
-        num_vertices = len(self.mesh.vertices)
-        curvature = np.zeros(num_vertices)
-
-        # Get vertex neighbors through face adjacency
-        vertex_faces = defaultdict(list)
-        for i, face in enumerate(self.mesh.faces):
-            for v in face:
-                vertex_faces[v].append(i)
-
-        for v_idx in range(num_vertices):
-            adjacent_faces = vertex_faces[v_idx]
-            if len(adjacent_faces) < 3:
-                continue
+            if cache_path is not None:
+                self._save_cached_details(cache_path)
 
-            # Calculate angle sum around vertex
-            angle_sum = 0.0
-            for face_idx in adjacent_faces:
-                face = self.mesh.faces[face_idx]
-                # Find position of this vertex in face
-                v_pos = np.where(face == v_idx)[0][0]
+        # Detail score at each vertex: the maximum over its faces (0 for
+        # vertices without faces), so point lookups are a single gather
+        self._vertex_detail_scores = np.zeros(len(self.mesh.vertices), dtype=np.float32)
+        np.maximum.at(self._vertex_detail_scores, self.mesh.faces.ravel(),
+                      np.repeat(self.face_detail_scores, 3))
 
-                # Get the three vertices
-                v0 = self.mesh.vertices[face[v_pos]]
-                v1 = self.mesh.vertices[face[(v_pos + 1) % 3]]
-                v2 = self.mesh.vertices[face[(v_pos + 2) % 3]]
+        high_detail_faces = np.sum(self.face_detail_scores > 0.5)
+        print(f"    Found {high_detail_faces} high-detail faces ({100*high_detail_faces/len(self.mesh.faces):.1f}%)")
 
-                # Calculate angle at this vertex
-                vec1 = v1 - v0
-                vec2 = v2 - v0
+    def _detail_cache_path(self):
+        """
+        Cache file for this mesh's detail analysis
 
-                norm1 = np.linalg.norm(vec1)
-                norm2 = np.linalg.norm(vec2)
+        Keyed by BLAKE2b over the mesh arrays and the analysis settings, so
+        a changed mesh or threshold misses the cache.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(self.mesh.vertices).tobytes())
+        digest.update(np.ascontiguousarray(self.mesh.faces).tobytes())
+        digest.update(repr((DETAIL_CACHE_VERSION, self.thin_feature_threshold)).encode())
+        return MESH_CACHE_DIR / f"{digest.hexdigest()}_details.npz"
 
-                if norm1 > 1e-10 and norm2 > 1e-10:
-                    cos_angle = np.clip(np.dot(vec1, vec2) / (norm1 * norm2), -1, 1)
-                    angle_sum += np.arccos(cos_angle)
+    def _load_cached_details(self, path):
+        """
+        Load detail arrays saved by _save_cached_details
 
-            # Gaussian curvature approximation: angle deficit
-            angle_deficit = 2 * np.pi - angle_sum
+        Returns:
+            bool: True on a hit
+        """
+        if not path.exists():
+            return False
 
-            # Normalize by approximate area (sum of adjacent face areas / 3)
-            area = sum(self.mesh.area_faces[f] for f in adjacent_faces) / 3
-            if area > 1e-10:
-                curvature[v_idx] = abs(angle_deficit) / area
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                self.vertex_curvature = data['vertex_curvature']
+                self.thin_features = data['thin_features']
+                self.face_detail_scores = data['face_detail_scores']
+        except (OSError, ValueError, KeyError):
+            print(f"    Warning: ignoring unreadable detail cache {path}")
+            return False
+
+        print("    Loaded detail analysis from cache")
+        return True
+
+    def _save_cached_details(self, path):
+        """Save the detail arrays; failures only print a warning"""
+        try:
+            MESH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Write then rename so a concurrent run never reads a partial file
+            tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+            np.savez_compressed(tmp_path, vertex_curvature=self.vertex_curvature,
+                                thin_features=self.thin_features,
+                                face_detail_scores=self.face_detail_scores)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"    Warning: could not write detail cache: {e}")
+
+    def _faces_of_vertex(self, v_idx):
+        """Indices of the faces containing a vertex, in face order"""
+        return self._vertex_faces[self._vertex_face_ptr[v_idx]:self._vertex_face_ptr[v_idx + 1]]
 
-        # Normalize curvature to 0-1 range
-        if curvature.max() > 0:
-            curvature = curvature / curvature.max()
+    def _calculate_vertex_curvature(self):
+        """Calculate mean curvature at each vertex using angle deficit method"""
+        num_vertices = len(self.mesh.vertices)
+        faces = self.mesh.faces
+        corner_vertices = faces.ravel()
+
+        # Corner angles of every face at once: at each corner, the angle
+        # between the edges to the next and previous corner. Corners with
+        # a degenerate edge contribute no angle
+        corners = self.mesh.vertices[faces]
+        to_next = np.roll(corners, -1, axis=1) - corners
+        to_prev = np.roll(corners, 1, axis=1) - corners
+        norm_next = np.linalg.norm(to_next, axis=2)
+        norm_prev = np.linalg.norm(to_prev, axis=2)
+        valid = (norm_next > 1e-10) & (norm_prev > 1e-10)
+        norm_product = np.where(valid, norm_next * norm_prev, 1.0)
+        cos_angles = np.clip(np.einsum('ijk,ijk->ij', to_next, to_prev) / norm_product, -1, 1)
+        angles = np.where(valid, np.arccos(cos_angles), 0.0)
+
+        # Scatter into per-vertex angle sums, adjacent face counts and
+        # approximate areas (sum of adjacent face areas / 3)
+        angle_sum = np.bincount(corner_vertices, weights=angles.ravel(), minlength=num_vertices)
+        face_count = np.bincount(corner_vertices, minlength=num_vertices)
+        area = np.bincount(corner_vertices, weights=np.repeat(self.mesh.area_faces, 3),
+                           minlength=num_vertices) / 3
+
+        # Gaussian curvature approximation: angle deficit normalized by
+        # area, for vertices with at least three adjacent faces
+        curvature = np.zeros(num_vertices)
+        has_curvature = (face_count >= 3) & (area > 1e-10)
+        curvature[has_curvature] = (np.abs(2 * np.pi - angle_sum[has_curvature]) /
+                                    area[has_curvature])
 
-        return curvature
+        # Normalize curvature to 0-1 range. Sums are accumulated in
+        # float64; the normalized scores only need float32, so divide
+        # straight into the float32 result
+        max_curvature = curvature.max()
+        return np.divide(curvature, max_curvature if max_curvature > 0 else 1.0,
+                         out=np.empty(num_vertices, dtype=np.float32), casting='same_kind')
 
     def _detect_thin_features(self):
         """Detect thin features using local geometry analysis"""
@@ -109,36 +211,34 @@ class SupportOptimizer:
             sample_size = min(2000, len(self.mesh.vertices))
             sample_indices = np.random.choice(len(self.mesh.vertices), sample_size, replace=False)
 
-            for v_idx in sample_indices:
-                vertex = self.mesh.vertices[v_idx]
-
-                # Get vertex normal (average of adjacent face normals)
-                adjacent_faces = np.where(np.any(self.mesh.faces == v_idx, axis=1))[0]
-                if len(adjacent_faces) == 0:
-                    continue
-
-                normal = np.mean(self.mesh.face_normals[adjacent_faces], axis=0)
-                norm_length = np.linalg.norm(normal)
-                if norm_length < 1e-10:
-                    continue
-                normal = normal / norm_length
-
-                # Cast ray in both directions to estimate thickness
-                ray_origin = vertex + normal * 0.01  # Offset slightly
-
-                # Check distance to nearest surface in opposite direction
+            # Vertex normal: direction of the average of adjacent face
+            # normals, for all vertices in one sparse product. Vertices
+            # without faces or whose normals cancel out get a zero vector
+            normals = trimesh.geometry.mean_vertex_normals(
+                len(self.mesh.vertices), self.mesh.faces, self.mesh.face_normals
+            )[sample_indices]
+            valid = np.linalg.norm(normals, axis=1) >= 1e-10
+
+            sample_indices = sample_indices[valid]
+            vertices = self.mesh.vertices[sample_indices]
+            normals = normals[valid]
+
+            if len(sample_indices) > 0:
+                # Cast every ray at once from slightly outside each vertex
+                # back through it, toward the nearest surface on the
+                # opposite side
+                ray_origins = vertices + normals * 0.01  # Offset slightly
                 locations, index_ray, index_tri = self.mesh.ray.intersects_location(
-                    ray_origins=[ray_origin],
-                    ray_directions=[-normal]
+                    ray_origins=ray_origins,
+                    ray_directions=-normals
                 )
 
-                if len(locations) > 0:
-                    # Find closest intersection
-                    distances = np.linalg.norm(locations - vertex, axis=1)
-                    min_dist = np.min(distances)
+                # Closest intersection per ray
+                min_dist = np.full(len(sample_indices), np.inf)
+                np.minimum.at(min_dist, index_ray,
+                              np.linalg.norm(locations - vertices[index_ray], axis=1))
 
-                    if min_dist < self.thin_feature_threshold:
-                        thin_vertices[v_idx] = True
+                thin_vertices[sample_indices[min_dist < self.thin_feature_threshold]] = True
 
         except (ImportError, ModuleNotFoundError):
             # Fallback: use vertex proximity analysis
@@ -157,7 +257,7 @@ class SupportOptimizer:
                 # this might be a thin feature
                 if len(nearby) > 5:
                     # Get connected vertices through edges
-                    adjacent_faces = np.where(np.any(self.mesh.faces == v_idx, axis=1))[0]
+                    adjacent_faces = self._faces_of_vertex(v_idx)
                     connected = set()
                     for f in adjacent_faces:
                         connected.update(self.mesh.faces[f])
@@ -175,119 +275,140 @@ class SupportOptimizer:
 
     def _calculate_face_detail_scores(self):
         """Calculate detail score (0-1) for each face"""
-        scores = np.zeros(len(self.mesh.faces))
-
-        for i, face in enumerate(self.mesh.faces):
-            # Average curvature of face vertices
-            avg_curvature = np.mean(self.vertex_curvature[face])
-
-            # Check if any vertex is thin
-            has_thin_feature = np.any(self.thin_features[face])
-
-            # Combine into detail score
-            # High curvature or thin features = high detail
-            score = avg_curvature * 0.7
-            if has_thin_feature:
-                score += 0.3
-
-            scores[i] = min(1.0, score)
-
+        faces = self.mesh.faces
+
+        # Average curvature of each face's vertices, and whether any of
+        # them is thin
+        avg_curvature = self.vertex_curvature[faces].mean(axis=1)
+        has_thin_feature = self.thin_features[faces].any(axis=1)
+
+        # Combine into detail score
+        # High curvature or thin features = high detail. Curvature is
+        # already normalized to 0-1, so 0.7 * curvature + 0.3 never
+        # exceeds 1 and needs no clamp
+        scores = avg_curvature.astype(np.float32, copy=False)
+        scores *= 0.7
+        scores[has_thin_feature] += 0.3
         return scores
 
     def get_detail_score_at_point(self, point):
         """Get the detail score for a 3D point"""
-        # Find nearest vertex
-        dist, idx = self.vertex_tree.query(point)
+        return float(self.get_detail_scores_at_points([point])[0])
 
-        # Find faces containing this vertex
-        adjacent_faces = np.where(np.any(self.mesh.faces == idx, axis=1))[0]
+    def get_detail_scores_at_points(self, points):
+        """
+        Get the detail scores for many 3D points at once
 
-        if len(adjacent_faces) == 0:
-            return 0.0
+        Each point takes the maximum detail score of the faces around its
+        nearest vertex.
 
-        # Return maximum detail score of adjacent faces
-        return np.max(self.face_detail_scores[adjacent_faces])
+        Args:
+            points: (N, 3) array-like of points
+
+        Returns:
+            (N,) array of detail scores
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        _, idx = self.vertex_tree.query(points, workers=-1)
+        return self._vertex_detail_scores[idx]
 
     def consolidate_support_points(self, support_points):
         """
         Merge nearby support points to reduce density
 
         Args:
-            support_points: List of support point dictionaries
+            support_points: SupportPoints or list of support point dictionaries
 
         Returns:
             Consolidated list of support points
         """
-        if not support_points or len(support_points) < 2:
-            return support_points
+        return self._consolidate(support_points)[0]
 
-        print(f"  Consolidating {len(support_points)} support points...")
+    def _consolidate(self, support_points):
+        """
+        Merge nearby support points, keeping their positions as an array
 
-        # Extract coordinates
-        coords = np.array([[p['x'], p['y'], p['z']] for p in support_points])
+        Returns:
+            tuple: (consolidated list of support points, (N, 3) array of
+            their positions)
+        """
+        if isinstance(support_points, SupportPoints):
+            # Arrays come straight from the SupportPoints; dicts are only
+            # built for the points, since merging attaches metadata
+            coords = support_points.xyz
+            areas = support_points.area
+            angles = support_points.angle
+            support_points = list(support_points)
+        else:
+            coords = np.array([[p['x'], p['y'], p['z']] for p in support_points]).reshape(-1, 3)
+            areas = np.array([p.get('area', 0) for p in support_points], dtype=float)
+            angles = np.array([p.get('angle') for p in support_points], dtype=float)
+
+        if len(support_points) < 2:
+            return support_points, coords
 
-        # Build KD-tree for spatial queries
-        tree = KDTree(coords)
+        print(f"  Consolidating {len(support_points)} support points...")
 
-        # Track which points have been merged
-        merged = np.zeros(len(support_points), dtype=bool)
-        consolidated = []
+        # Find all points within merge radius of each point in one query
+        all_neighbors = _neighbors_within(coords, self.merge_radius)
 
-        for i, point in enumerate(support_points):
-            if merged[i]:
+        # Greedily group points: each point not yet in a group seeds one
+        # with all of its ungrouped neighbors (itself included)
+        group = np.full(len(support_points), -1, dtype=np.intp)
+        seeds = []
+        for i in range(len(support_points)):
+            if group[i] >= 0:
+                continue
+            neighbors = np.asarray(all_neighbors[i], dtype=np.intp)
+            group[neighbors[group[neighbors] < 0]] = len(seeds)
+            seeds.append(i)
+
+        # Area-weighted centroid (unit weight for points without area),
+        # total area and minimum (most critical) angle of every group
+        num_groups = len(seeds)
+        counts = np.bincount(group, minlength=num_groups)
+        weights = np.where(areas != 0, areas, 1.0)
+        total_weight = np.bincount(group, weights=weights, minlength=num_groups)
+        centroids = np.column_stack([
+            np.bincount(group, weights=coords[:, k] * weights, minlength=num_groups)
+            for k in range(3)
+        ]) / total_weight[:, None]
+        total_area = np.bincount(group, weights=areas, minlength=num_groups)
+        min_angle = np.full(num_groups, np.nan)
+        np.fmin.at(min_angle, group, angles)
+
+        # Unmerged points keep their exact positions
+        single = counts == 1
+        centroids[single] = coords[np.asarray(seeds)[single]]
+
+        # Dicts are only built here, at the output boundary, from plain
+        # Python values pulled out of the group arrays in one go
+        consolidated = []
+        for seed, count, (x, y, z), area, angle in zip(
+            seeds, counts.tolist(), centroids.tolist(), total_area.tolist(), min_angle.tolist()
+        ):
+            if count == 1:
+                # No merging needed
+                consolidated.append(support_points[seed])
                 continue
 
-            # Find all points within merge radius
-            coord = [point['x'], point['y'], point['z']]
-            neighbors = tree.query_ball_point(coord, self.merge_radius)
-
-            # Filter to unmerged neighbors
-            unmerged_neighbors = [n for n in neighbors if not merged[n]]
+            merged_point = {
+                'x': x,
+                'y': y,
+                'z': z,
+                'area': area,
+                'type': support_points[seed].get('type', 'merged'),
+                'merged_count': count
+            }
 
-            if len(unmerged_neighbors) <= 1:
-                # No merging needed
-                consolidated.append(point)
-                merged[i] = True
-            else:
-                # Merge these points
-                merged_point = self._merge_points([support_points[n] for n in unmerged_neighbors])
-                consolidated.append(merged_point)
+            # Preserve angle if available
+            if not np.isnan(angle):
+                merged_point['angle'] = angle
 
-                # Mark all as merged
-                for n in unmerged_neighbors:
-                    merged[n] = True
+            consolidated.append(merged_point)
 
         print(f"    Reduced to {len(consolidated)} support points ({100*len(consolidated)/len(support_points):.1f}%)")
-        return consolidated
-
-    def _merge_points(self, points):
-        """Merge multiple support points into one"""
-        # Calculate weighted centroid (weight by area if available)
-        total_weight = 0
-        weighted_x, weighted_y, weighted_z = 0, 0, 0
-
-        for p in points:
-            weight = p.get('area', 1.0) or 1.0
-            weighted_x += p['x'] * weight
-            weighted_y += p['y'] * weight
-            weighted_z += p['z'] * weight
-            total_weight += weight
-
-        merged = {
-            'x': weighted_x / total_weight,
-            'y': weighted_y / total_weight,
-            'z': weighted_z / total_weight,
-            'area': sum(p.get('area', 0) for p in points),
-            'type': points[0].get('type', 'merged'),
-            'merged_count': len(points)
-        }
-
-        # Preserve angle if available (use minimum - most critical)
-        angles = [p.get('angle') for p in points if p.get('angle') is not None]
-        if angles:
-            merged['angle'] = min(angles)
-
-        return merged
+        return consolidated, centroids
 
     def classify_support_tier(self, support_point):
         """
@@ -301,106 +422,125 @@ class SupportOptimizer:
         Returns:
             'micro', 'light', 'medium', or 'heavy'
         """
-        coord = [support_point['x'], support_point['y'], support_point['z']]
-        detail_score = support_point.get('detail_score')
-        if detail_score is None:
-            detail_score = self.get_detail_score_at_point(coord)
+        return self.classify_support_tiers([support_point])[0]
+
+    def classify_support_tiers(self, support_points, coords=None):
+        """
+        Classify many support points into tiers at once
+
+        The rules are checked in order for all points together as boolean
+        masks; each point takes the tier of the first rule it matches.
+
+        Args:
+            support_points: List of support point dictionaries (see
+                classify_support_tier)
+            coords: Optional (N, 3) array of the points' positions
+
+        Returns:
+            List of tier names, one per point
+        """
+        if coords is None:
+            coords = np.array([[p['x'], p['y'], p['z']] for p in support_points]).reshape(-1, 3)
 
         # Get point properties
-        area = support_point.get('area', 0)
-        angle = support_point.get('angle', 45)  # degrees from horizontal
-        point_type = support_point.get('type', '')
-        height = support_point['z'] - self.mesh.bounds[0, 2]
-        is_thin = support_point.get('is_thin_feature', False)
-
-        # Micro tier: ultra-fine features (antennae tips, barrel tips, etc.).
-        # `is_thin_feature` alone is too generous on small models (the entire
-        # torso of a 8mm-wide mech reads as "thin" at the 2mm threshold), so we
-        # require corroborating evidence: small face area or steep angle.
-        if area > 0 and area < 0.5 and angle > 50:
-            return 'micro'
-        if is_thin and detail_score > 0.7:
-            return 'micro'
-        if detail_score > 0.9:
-            return 'micro'
-
-        # High detail areas get light supports
-        if detail_score > 0.6:
-            return 'light'
-
-        # Near-vertical surfaces (>60 degrees from horizontal) get light supports
-        if angle > 60:
-            return 'light'
-
-        # Very small areas get light supports
-        if area < 2.0:  # mm²
-            return 'light'
-
-        # Islands close to build plate need heavy supports
-        if point_type == 'island' and height < 5.0:
-            return 'heavy'
-
-        # Large horizontal areas need heavy supports
-        if angle < 20 and area > 10.0:
-            return 'heavy'
-
-        # Bridge supports are structural
-        if point_type == 'bridge':
-            return 'medium'
-
-        # Default to medium
-        return 'medium'
-
-    def assign_support_tiers(self, support_points):
+        detail_score = np.array([p.get('detail_score') for p in support_points], dtype=float)
+        missing = np.isnan(detail_score)
+        if np.any(missing):
+            detail_score[missing] = self.get_detail_scores_at_points(coords[missing])
+        area = np.array([p.get('area', 0) for p in support_points], dtype=float)
+        # Angles are in degrees from horizontal
+        angle = np.array([p.get('angle', 45) for p in support_points], dtype=float)
+        point_type = np.array([p.get('type', '') for p in support_points], dtype=object)
+        height = coords[:, 2] - self.mesh.bounds[0, 2]
+        is_thin = np.array([bool(p.get('is_thin_feature', False)) for p in support_points])
+
+        rules = [
+            # Micro tier: ultra-fine features (antennae tips, barrel tips, etc.).
+            # `is_thin_feature` alone is too generous on small models (the entire
+            # torso of a 8mm-wide mech reads as "thin" at the 2mm threshold), so we
+            # require corroborating evidence: small face area or steep angle.
+            ((area > 0) & (area < 0.5) & (angle > 50), MICRO_TIER),
+            (is_thin & (detail_score > 0.7), MICRO_TIER),
+            (detail_score > 0.9, MICRO_TIER),
+
+            # High detail areas get light supports
+            (detail_score > 0.6, LIGHT_TIER),
+
+            # Near-vertical surfaces (>60 degrees from horizontal) get light supports
+            (angle > 60, LIGHT_TIER),
+
+            # Very small areas get light supports
+            (area < 2.0, LIGHT_TIER),  # mm²
+
+            # Islands close to build plate need heavy supports
+            ((point_type == 'island') & (height < 5.0), HEAVY_TIER),
+
+            # Large horizontal areas need heavy supports
+            ((angle < 20) & (area > 10.0), HEAVY_TIER),
+        ]
+
+        # Everything else, bridge supports included (they are
+        # structural), gets medium
+        tiers = np.select([mask for mask, _ in rules], [tier for _, tier in rules],
+                          default=MEDIUM_TIER)
+        return [SUPPORT_TIERS[tier] for tier in tiers.tolist()]
+
+    def assign_support_tiers(self, support_points, coords=None):
         """
         Assign tier (micro/light/medium/heavy) to each support point
 
         Args:
             support_points: List of support point dictionaries
+            coords: Optional (N, 3) array of the points' positions
 
         Returns:
             Support points with 'tier' field added
         """
         print("  Assigning support tiers...")
 
-        tier_counts = {'micro': 0, 'light': 0, 'medium': 0, 'heavy': 0}
-
-        for point in support_points:
-            tier = self.classify_support_tier(point)
+        tiers = self.classify_support_tiers(support_points, coords) if support_points else []
+        for point, tier in zip(support_points, tiers):
             point['tier'] = tier
-            tier_counts[tier] += 1
 
-        print(f"    Micro: {tier_counts['micro']}, Light: {tier_counts['light']}, "
-              f"Medium: {tier_counts['medium']}, Heavy: {tier_counts['heavy']}")
+        print(f"    Micro: {tiers.count('micro')}, Light: {tiers.count('light')}, "
+              f"Medium: {tiers.count('medium')}, Heavy: {tiers.count('heavy')}")
         return support_points
 
-    def tag_points_with_face_metadata(self, support_points):
+    def tag_points_with_face_metadata(self, support_points, coords=None):
         """
         For each support point, find the closest mesh face and attach metadata
         (face_index, face_normal, detail_score, is_thin_feature). Mutates and
         returns the input list.
+
+        Args:
+            support_points: List of support point dictionaries
+            coords: Optional (N, 3) array of the points' positions
         """
         if not support_points:
             return support_points
 
         # KDTree over face centers is more accurate than vertex KDTree for
-        # classifying which face a contact actually lives on.
-        face_centers = self.mesh.triangles_center
-        face_tree = KDTree(face_centers)
-
-        for point in support_points:
-            coord = [point['x'], point['y'], point['z']]
-            _, face_idx = face_tree.query(coord)
-            point['face_index'] = int(face_idx)
-            point['face_normal'] = self.mesh.face_normals[face_idx].tolist()
-
-            if 'detail_score' not in point:
-                point['detail_score'] = float(self.face_detail_scores[face_idx])
-
-            if 'is_thin_feature' not in point:
-                # A face is "thin" if any of its 3 vertices was tagged thin.
-                face_verts = self.mesh.faces[face_idx]
-                point['is_thin_feature'] = bool(np.any(self.thin_features[face_verts]))
+        # classifying which face a contact actually lives on. The mesh
+        # doesn't change, so the tree is built on first use and kept
+        if self._face_tree is None:
+            self._face_tree = cKDTree(self.mesh.triangles_center)
+
+        # Closest face of every point in one query, and its metadata. A
+        # face is "thin" if any of its 3 vertices was tagged thin
+        if coords is None:
+            coords = np.array([[p['x'], p['y'], p['z']] for p in support_points])
+        _, face_indices = self._face_tree.query(coords, workers=-1)
+        face_normals = self.mesh.face_normals[face_indices].tolist()
+        detail_scores = self.face_detail_scores[face_indices].tolist()
+        thin = self.thin_features[self.mesh.faces[face_indices]].any(axis=1).tolist()
+
+        for point, face_idx, normal, detail_score, is_thin in zip(
+            support_points, face_indices.tolist(), face_normals, detail_scores, thin
+        ):
+            point['face_index'] = face_idx
+            point['face_normal'] = normal
+            point.setdefault('detail_score', detail_score)
+            point.setdefault('is_thin_feature', is_thin)
 
         return support_points
 
@@ -420,72 +560,79 @@ class SupportOptimizer:
             base_radii.append(get_support_base_diameter(tier) / 2)
         return tip_radii, base_radii
 
-    def adaptive_spacing_filter(self, support_points):
+    def adaptive_spacing_filter(self, support_points, coords=None):
         """
         Apply adaptive spacing based on local density needs
 
         Reduces support density in areas that don't need it
+
+        Args:
+            support_points: List of support point dictionaries
+            coords: Optional (N, 3) array of the points' positions
         """
         if not support_points:
             return support_points
 
         print("  Applying adaptive spacing filter...")
 
-        # Group points by approximate Z height (layer grouping)
+        # Spacing per tier, read once for the whole filter
+        detail_spacing = SupportConfig.EDGE_SUPPORT_SPACING * 0.8
+        heavy_spacing = SupportConfig.SUPPORT_SPACING * 1.5
+        medium_spacing = SupportConfig.SUPPORT_SPACING
+
+        # Lower number = higher priority (more structural / harder to skip)
+        tier_priority = {'heavy': 0, 'medium': 1, 'light': 2, 'micro': 3}
+
+        # Adaptive spacing for every point from its tier and detail: high
+        # detail areas keep supports closer together, structural areas
+        # can space further apart, the rest use standard spacing
+        if coords is None:
+            coords = np.array([[p['x'], p['y'], p['z']] for p in support_points])
+        tiers = [p.get('tier', 'medium') for p in support_points]
+        detail_scores = self.get_detail_scores_at_points(coords)
+        is_light = np.array([tier == 'light' for tier in tiers])
+        is_heavy = np.array([tier == 'heavy' for tier in tiers])
+        min_spacing = np.select(
+            [is_light | (detail_scores > 0.5), is_heavy],
+            [detail_spacing, heavy_spacing],
+            default=medium_spacing
+        )
+        priorities = np.array([tier_priority.get(tier, 1) for tier in tiers])
+
+        # Group points by approximate Z height (layer grouping): sort once
+        # by layer, keeping input order within a layer, and walk the runs
         layer_height = 1.0  # mm grouping
-        layers = defaultdict(list)
-
-        for point in support_points:
-            layer_idx = int(point['z'] / layer_height)
-            layers[layer_idx].append(point)
+        layer_idx = (coords[:, 2] / layer_height).astype(np.int64)
+        order = np.argsort(layer_idx, kind='stable')
+        bounds = np.flatnonzero(np.diff(layer_idx[order])) + 1
+        bounds = np.concatenate([[0], bounds, [len(order)]])
 
-        filtered_points = []
+        kept = np.ones(len(support_points), dtype=bool)
 
-        for layer_idx, layer_points in layers.items():
-            if len(layer_points) <= 1:
-                filtered_points.extend(layer_points)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            if stop - start <= 1:
                 continue
+            layer = order[start:stop]
 
-            # Calculate adaptive spacing for this layer
-            coords = np.array([[p['x'], p['y']] for p in layer_points])
-            tree = KDTree(coords)
-
-            kept = np.ones(len(layer_points), dtype=bool)
+            # Find every point's neighbors within its spacing in one query.
+            # Most layers hold few points, which skip the tree build
+            all_neighbors = _neighbors_within(coords[layer, :2], min_spacing[layer])
+            layer_priorities = priorities[layer].tolist()
+            layer_kept = np.ones(len(layer), dtype=bool)
 
-            for i, point in enumerate(layer_points):
-                if not kept[i]:
+            for i, neighbors in enumerate(all_neighbors):
+                if not layer_kept[i]:
                     continue
 
-                tier = point.get('tier', 'medium')
-                detail_score = self.get_detail_score_at_point([point['x'], point['y'], point['z']])
-
-                # Calculate adaptive spacing based on tier and detail
-                if tier == 'light' or detail_score > 0.5:
-                    # High detail areas - keep supports closer together
-                    min_spacing = SupportConfig.EDGE_SUPPORT_SPACING * 0.8
-                elif tier == 'heavy':
-                    # Structural areas - can space further apart
-                    min_spacing = SupportConfig.SUPPORT_SPACING * 1.5
-                else:
-                    # Medium - use standard spacing
-                    min_spacing = SupportConfig.SUPPORT_SPACING
-
-                # Find neighbors within min_spacing
-                coord = [point['x'], point['y']]
-                neighbors = tree.query_ball_point(coord, min_spacing)
-
-                # Remove redundant neighbors (keep current point, remove others)
+                # Remove redundant neighbors (keep current point, remove
+                # others). Keep the one with higher priority
                 for n in neighbors:
-                    if n != i and kept[n]:
-                        # Keep the one with higher priority. Lower number = higher
-                        # priority (more structural / harder to skip).
-                        other_tier = layer_points[n].get('tier', 'medium')
-                        tier_priority = {'heavy': 0, 'medium': 1, 'light': 2, 'micro': 3}
+                    if n != i and layer_kept[n] and layer_priorities[n] > layer_priorities[i]:
+                        layer_kept[n] = False
 
-                        if tier_priority.get(other_tier, 1) > tier_priority.get(tier, 1):
-                            kept[n] = False
+            kept[layer] = layer_kept
 
-            filtered_points.extend([p for p, k in zip(layer_points, kept) if k])
+        filtered_points = [p for p, k in zip(support_points, kept) if k]
 
         print(f"    Filtered to {len(filtered_points)} support points ({100*len(filtered_points)/len(support_points):.1f}%)")
         return filtered_points
@@ -495,29 +642,30 @@ class SupportOptimizer:
         Full optimization pipeline for support points
 
         Args:
-            support_points: List of support point dictionaries
+            support_points: SupportPoints or list of support point dictionaries
 
         Returns:
             Optimized list of support points
         """
         if not support_points:
-            return support_points
+            return list(support_points)
 
         original_count = len(support_points)
         print(f"\nOptimizing {original_count} support points for detail preservation...")
 
-        # Step 1: Consolidate nearby points
-        points = self.consolidate_support_points(support_points)
+        # Step 1: Consolidate nearby points. Their positions stay in one
+        # array shared by the later steps, which add metadata in place
+        points, coords = self._consolidate(support_points)
 
         # Step 2: Tag each point with face metadata (used by both tier
         # classification and downstream front-face avoidance).
-        points = self.tag_points_with_face_metadata(points)
+        points = self.tag_points_with_face_metadata(points, coords)
 
         # Step 3: Assign support tiers
-        points = self.assign_support_tiers(points)
+        points = self.assign_support_tiers(points, coords)
 
         # Step 4: Apply adaptive spacing
-        points = self.adaptive_spacing_filter(points)
+        points = self.adaptive_spacing_filter(points, coords)
 
         final_count = len(points)
         reduction = 100 * (1 - final_count / original_count)
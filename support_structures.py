@@ -3,16 +3,169 @@ Support structure generation
 Creates 3D geometry for support pillars with collision avoidance and lattice towers
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import trimesh
 from collections import deque
-from config import SupportConfig
+from config import SupportConfig, apply_config_snapshot, config_snapshot
 from collision_detector import CollisionDetector
 from path_router import PathRouter
-from curved_support import CurvedSupportGenerator
+from curved_support import CurvedSupportGenerator, concatenate_meshes, stack_arrays
 from lattice_tower import LatticeTowerGenerator
 from support_optimizer import get_support_tip_diameter, get_support_base_diameter
 
+# Supports routed between progress lines. Printing is
+# stdout-locked and costs a syscall, so keep it out of most iterations
+# of the per-support loops
+PROGRESS_INTERVAL = 1024
+
+# Below this many supports per process, rebuilding the collision detector
+# in every worker costs more than routing saves
+MIN_PATHS_PER_ROUTING_WORKER = 100
+
+# Below this many supports per process, sending the swept geometry back
+# costs more than sweeping in parallel saves
+MIN_PATHS_PER_SWEEP_WORKER = 500
+
+# Router used by routing worker processes (set by _init_routing_worker)
+_worker_router = None
+
+
+def _init_routing_worker(vertices, faces, snapshot):
+    """Process pool initializer: rebuild the collision detector once per worker"""
+    global _worker_router
+
+    # Re-apply the parent's settings (e.g. CLI overrides) first
+    apply_config_snapshot(snapshot)
+
+    mesh = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+    _worker_router = PathRouter(CollisionDetector(mesh), mesh.bounds[0, 2])
+
+
+def _route_path(router, start_point, tip_radius):
+    """Route one support from its contact point to the build plate and smooth it"""
+    path = router.route_support_path(
+        start_point,
+        target_z=None,  # Will go to build plate
+        radius=tip_radius,
+        max_iterations=300
+    )
+
+    if path is not None:
+        # Smooth path to remove unnecessary waypoints
+        path = router.smooth_path(path, tip_radius)
+    return path
+
+
+def _route_path_chunk(start_points, tip_radii):
+    """Process pool task: route a chunk of supports"""
+    return [_route_path(_worker_router, start_point, tip_radius)
+            for start_point, tip_radius in zip(start_points, tip_radii)]
+
+
+def _sweep_path_chunk(curved_generator, paths, tip_radii, base_radii):
+    """
+    Process pool task: sweep a chunk of supports
+
+    The chunk is stacked before it is sent back, so only two arrays per
+    chunk cross the process boundary.
+
+    Returns:
+        tuple: ((vertices, faces) or None if nothing was generated,
+            number of supports generated)
+    """
+    parts = curved_generator.curved_support_arrays(paths, tip_radii, base_radii)
+    if not parts:
+        return None, 0
+    return stack_arrays(parts), len(parts)
+
+
+def _unit_template(mesh):
+    """
+    Vertices and faces of a unit-radius, unit-height solid of revolution
+
+    The solid is shifted so its base is at Z=0 and its top at Z=1, for
+    instancing with _instance_template.
+
+    Args:
+        mesh: Trimesh around the Z axis with radius 1 and height 1
+
+    Returns:
+        tuple: ((N, 3) vertex array, (M, 3) face array)
+    """
+    vertices = mesh.vertices.copy()
+    vertices[:, 2] -= vertices[:, 2].min()
+    return vertices, mesh.faces.copy()
+
+
+def _instance_template(template, x, y, z_base, height, radius_bottom, radius_top):
+    """
+    Place a unit template as a tapered solid
+
+    Each vertex's radius runs linearly from radius_bottom at the base to
+    radius_top at the top. Vertices on the axis stay on it.
+
+    Args:
+        template: (vertices, faces) from _unit_template
+        x, y: Center position
+        z_base: Base Z height
+        height: Solid height
+        radius_bottom: Radius at the base
+        radius_top: Radius at the top
+
+    Returns:
+        Trimesh object
+    """
+    unit_vertices, faces = template
+    t = unit_vertices[:, 2]
+    radius = radius_bottom + t * (radius_top - radius_bottom)
+
+    vertices = np.empty_like(unit_vertices)
+    vertices[:, :2] = unit_vertices[:, :2] * radius[:, None] + [x, y]
+    vertices[:, 2] = t * height + z_base
+
+    return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+
+
+def _instance_templates(template, x, y, z_base, height, radius_bottom, radius_top):
+    """
+    Place a unit template once per set of parameters, as a single mesh
+
+    Equivalent to concatenating _instance_template over the parameters,
+    but every copy is placed in one broadcast pass with the face indices
+    offset per copy.
+
+    Args:
+        template: (vertices, faces) from _unit_template
+        x, y, z_base, height, radius_bottom, radius_top: As for
+            _instance_template, each a scalar or an (S,) array
+
+    Returns:
+        Trimesh object
+    """
+    unit_vertices, faces = template
+    x, y, z_base, height, radius_bottom, radius_top = np.broadcast_arrays(
+        *np.atleast_1d(x, y, z_base, height, radius_bottom, radius_top)
+    )
+    num_copies = len(x)
+    num_vertices = len(unit_vertices)
+
+    # (copies, template vertices) radius at every vertex
+    t = unit_vertices[:, 2]
+    radius = radius_bottom[:, None] + t * (radius_top - radius_bottom)[:, None]
+
+    vertices = np.empty((num_copies, num_vertices, 3))
+    vertices[:, :, 0] = unit_vertices[:, 0] * radius + x[:, None]
+    vertices[:, :, 1] = unit_vertices[:, 1] * radius + y[:, None]
+    vertices[:, :, 2] = t * height[:, None] + z_base[:, None]
+
+    all_faces = faces[None] + (np.arange(num_copies) * num_vertices)[:, None, None]
+
+    return trimesh.Trimesh(vertices=vertices.reshape(-1, 3),
+                           faces=all_faces.reshape(-1, 3), process=False)
+
 
 class SupportGenerator:
     """Generate 3D support structures with collision avoidance"""
@@ -20,7 +173,7 @@ class SupportGenerator:
     def __init__(self, mesh, config=None, front_axis=None, strict_front=False):
         self.mesh = mesh
         self.config = config or {}
-        self.support_meshes = []
+        self.support_count = 0
 
         # BattleTech: front-axis is a unit vector in world coords. Support
         # contacts whose face normal points within FRONT_FACE_CONE_DEG of this
@@ -30,6 +183,12 @@ class SupportGenerator:
         self.strict_front = bool(strict_front)
         self.contact_metadata = []
 
+        # Front-face settings read for every support point, bound once per
+        # generator (SupportConfig may be overridden before the generator is
+        # built, so not at import time)
+        self._front_cos_threshold = float(np.cos(np.radians(SupportConfig.FRONT_FACE_CONE_DEG)))
+        self._max_front_self_bridge = SupportConfig.MAX_FRONT_SELF_BRIDGE_MM
+
         # Initialize new components
         print("  Initializing collision detection...")
         self.collision_detector = CollisionDetector(mesh)
@@ -46,6 +205,15 @@ class SupportGenerator:
         print("  Initializing lattice tower generator...")
         self.lattice_generator = LatticeTowerGenerator()
 
+        # Unit meshes for simple cone supports (16 sides) and tree support
+        # segments (12 sides), built once and instanced per support
+        self._cone_template = _unit_template(
+            trimesh.creation.cylinder(radius=1.0, height=1.0, sections=16)
+        )
+        self._segment_template = _unit_template(
+            trimesh.creation.cone(radius=1.0, height=1.0, sections=12)
+        )
+
     def _classify_point_relative_to_front(self, point):
         """
         Classify a support contact relative to the front axis.
@@ -64,7 +232,7 @@ class SupportGenerator:
             return 'side'
         normal = normal / n
 
-        cos_threshold = np.cos(np.radians(SupportConfig.FRONT_FACE_CONE_DEG))
+        cos_threshold = self._front_cos_threshold
         front_dot = float(np.dot(normal, self.front_axis))
         if front_dot >= cos_threshold:
             return 'front'
@@ -87,7 +255,7 @@ class SupportGenerator:
             return point, False
 
         start_idx = int(point['face_index'])
-        cos_threshold = np.cos(np.radians(SupportConfig.FRONT_FACE_CONE_DEG))
+        cos_threshold = self._front_cos_threshold
 
         # Build face adjacency (cached on the mesh)
         adjacency = self.mesh.face_adjacency  # (M, 2) pairs of face indices
@@ -144,6 +312,7 @@ class SupportGenerator:
                 p['face_class'] = 'side'
             return support_points
 
+        max_self_bridge = self._max_front_self_bridge
         kept = []
         front_in = 0
         snapped = 0
@@ -158,7 +327,7 @@ class SupportGenerator:
                     # Strict policy: skip if the unsupported span is short
                     # enough that ABS-like resin can self-bridge.
                     bridge = p.get('bridge_length', 0.0) or 0.0
-                    if bridge and bridge < SupportConfig.MAX_FRONT_SELF_BRIDGE_MM:
+                    if bridge and bridge < max_self_bridge:
                         skipped += 1
                         continue
                 p, ok = self._snap_off_front_face(p)
@@ -183,11 +352,13 @@ class SupportGenerator:
         Generate 3D support structures for all support points with collision avoidance
 
         Args:
-            support_points: List of support point dictionaries
+            support_points: SupportPoints or list of support point dictionaries
 
         Returns:
             Trimesh object containing all supports
         """
+        # The front-face policy snaps points in place, so work on dicts
+        support_points = list(support_points)
         print(f"\nGenerating {len(support_points)} support structures...")
 
         if not support_points:
@@ -203,42 +374,34 @@ class SupportGenerator:
         support_tiers = []  # Track tier for each path
         per_path_meta = []  # Parallel metadata list for contact_metadata
 
-        for i, point in enumerate(support_points):
-            start_point = [point['x'], point['y'], point['z']]
-
-            # Check minimum height
-            height = point['z'] - self.build_plate_z
-            if height < SupportConfig.MIN_SUPPORT_HEIGHT:
-                continue
+        # Contact positions as one array, filtered to the points high
+        # enough above the plate to need a support in a single pass
+        xyz = np.array([[point['x'], point['y'], point['z']] for point in support_points],
+                       dtype=np.float64).reshape(-1, 3)
+        keep = np.flatnonzero(xyz[:, 2] - self.build_plate_z >= SupportConfig.MIN_SUPPORT_HEIGHT)
+        start_points = xyz[keep]
+        routed_points = [support_points[i] for i in keep]
 
-            # Get tier-specific tip diameter
-            tier = point.get('tier', 'medium')
-            tip_radius = get_support_tip_diameter(tier) / 2
+        # Tip radii only depend on the tier, so look them up once per tier
+        tiers = [point.get('tier', 'medium') for point in routed_points]
+        tier_tip_radii = {tier: get_support_tip_diameter(tier) / 2 for tier in set(tiers)}
+        tip_radii = [tier_tip_radii[tier] for tier in tiers]
 
-            # Route path from contact point to build plate
-            path = self.path_router.route_support_path(
-                start_point,
-                target_z=None,  # Will go to build plate
-                radius=tip_radius,
-                max_iterations=300
-            )
+        paths = self._route_paths(start_points, tip_radii)
 
+        for point, start_point, tier, tip_radius, path in zip(routed_points, start_points.tolist(),
+                                                               tiers, tip_radii, paths):
             if path is not None:
-                # Smooth path to remove unnecessary waypoints
-                path = self.path_router.smooth_path(path, tip_radius)
                 support_paths.append(path)
                 support_tiers.append(tier)
                 per_path_meta.append({
-                    'xyz': [float(point['x']), float(point['y']), float(point['z'])],
+                    'xyz': start_point,
                     'tier': tier,
                     'tip_radius': float(tip_radius),
                     'face_class': point.get('face_class', 'side'),
                     'type': point.get('type', ''),
                 })
 
-            if (i + 1) % 50 == 0:
-                print(f"    Routed {i+1}/{len(support_points)} paths...")
-
         print(f"  Routed {len(support_paths)} support paths")
 
         if not support_paths:
@@ -259,54 +422,136 @@ class SupportGenerator:
 
         # Phase 3: Generate support geometry following routed paths
         print("  Phase 3: Generating support geometry...")
-        supports = []
 
         # consolidate_supports_with_towers preserves index order, so tier
         # alignment with paths is intact unless the routing dropped a support.
         if len(support_tiers) != len(modified_paths):
             support_tiers = ['medium'] * len(modified_paths)
 
-        for i, path in enumerate(modified_paths):
-            if len(path) < 2:
-                continue
-
-            tier = support_tiers[i] if i < len(support_tiers) else 'medium'
-            tip_radius = get_support_tip_diameter(tier) / 2
-            base_radius = get_support_base_diameter(tier) / 2
+        # Radii only depend on the tier, so look them up once per tier
+        tier_radii = {tier: (get_support_tip_diameter(tier) / 2,
+                             get_support_base_diameter(tier) / 2)
+                      for tier in set(support_tiers)}
+        tip_radii = [tier_radii[tier][0] for tier in support_tiers]
+        base_radii = [tier_radii[tier][1] for tier in support_tiers]
 
-            support_mesh = self.curved_generator.create_curved_support(
-                path, tip_radius, base_radius
-            )
+        # Supports stay as raw arrays until everything is stacked below
+        support_parts, num_supports = self._sweep_paths(modified_paths, tip_radii, base_radii)
 
-            if support_mesh is not None:
-                supports.append(support_mesh)
-
-            if (i + 1) % 100 == 0:
-                print(f"    Generated {i+1}/{len(modified_paths)} support geometries...")
-
-        print(f"  Generated {len(supports)} support structures")
+        print(f"  Generated {num_supports} support structures")
 
         # Combine supports and towers
-        all_meshes = supports + tower_meshes
+        all_parts = support_parts + [(tower.vertices, tower.faces) for tower in tower_meshes]
+        self.support_count = num_supports + len(tower_meshes)
 
-        if not all_meshes:
+        if not all_parts:
             print("  Warning: No valid supports could be generated")
             return None
 
         # Stash contact metadata for the preview renderer + sidecar JSON.
         self.contact_metadata = per_path_meta
 
-        # Combine all supports into one mesh
+        # Combine all supports into one mesh with a single copy of each
+        # part into the final buffers
         print("  Combining support structures...")
-        combined_supports = trimesh.util.concatenate(all_meshes)
+        vertices, faces = stack_arrays(all_parts)
+        combined_supports = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
 
         print(f"  Total support volume: {combined_supports.volume:.2f} mm³")
         print(f"  Total support surface area: {combined_supports.area:.2f} mm²")
 
-        self.support_meshes = all_meshes
         self._last_supports = combined_supports
         return combined_supports
 
+    def _support_workers(self, num_paths, min_paths_per_worker):
+        """Number of processes to route or sweep num_paths supports with"""
+        workers = SupportConfig.ROUTING_WORKERS or os.cpu_count() or 1
+        return max(1, min(workers, num_paths // min_paths_per_worker))
+
+    def _route_paths(self, start_points, tip_radii):
+        """
+        Route and smooth a path for every support
+
+        Each route only reads the collision detector, so large batches are
+        split into contiguous chunks across a process pool. Every worker
+        rebuilds the detector once from the mesh arrays.
+
+        Args:
+            start_points: (N, 3) array of contact points
+            tip_radii: Tip radius for each support
+
+        Returns:
+            list: Path for each support, or None where routing failed
+        """
+        workers = self._support_workers(len(start_points), MIN_PATHS_PER_ROUTING_WORKER)
+        if workers == 1:
+            paths = []
+            for i, (start_point, tip_radius) in enumerate(zip(start_points, tip_radii)):
+                paths.append(_route_path(self.path_router, start_point, tip_radius))
+
+                if (i + 1) % PROGRESS_INTERVAL == 0:
+                    print(f"    Routed {i+1}/{len(start_points)} paths...")
+            return paths
+
+        print(f"    Splitting routing across {workers} processes...")
+        bounds = np.linspace(0, len(start_points), workers + 1).astype(int)
+
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_routing_worker,
+                                 initargs=(self.mesh.vertices, self.mesh.faces,
+                                           config_snapshot())) as executor:
+            chunks = executor.map(_route_path_chunk,
+                                  [start_points[a:b] for a, b in zip(bounds[:-1], bounds[1:])],
+                                  [tip_radii[a:b] for a, b in zip(bounds[:-1], bounds[1:])])
+
+            paths = []
+            for chunk in chunks:
+                paths.extend(chunk)
+                print(f"    Routed {len(paths)}/{len(start_points)} paths...")
+
+        return paths
+
+    def _sweep_paths(self, paths, tip_radii, base_radii):
+        """
+        Sweep the support geometry along every routed path
+
+        Sweeps are independent, so large batches are split into contiguous
+        chunks across a process pool, each chunk coming back already
+        stacked.
+
+        Args:
+            paths: List of routed paths
+            tip_radii: Tip radius for each path
+            base_radii: Base radius for each path
+
+        Returns:
+            tuple: (list of (vertices, faces) parts, number of supports generated)
+        """
+        workers = self._support_workers(len(paths), MIN_PATHS_PER_SWEEP_WORKER)
+        if workers == 1:
+            parts = self.curved_generator.curved_support_arrays(paths, tip_radii, base_radii)
+            return parts, len(parts)
+
+        print(f"    Splitting geometry across {workers} processes...")
+        bounds = np.linspace(0, len(paths), workers + 1).astype(int)
+        chunk_ranges = list(zip(bounds[:-1], bounds[1:]))
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = executor.map(_sweep_path_chunk,
+                                  [self.curved_generator] * workers,
+                                  [paths[a:b] for a, b in chunk_ranges],
+                                  [tip_radii[a:b] for a, b in chunk_ranges],
+                                  [base_radii[a:b] for a, b in chunk_ranges])
+
+            parts = []
+            num_supports = 0
+            for chunk, chunk_supports in chunks:
+                if chunk is not None:
+                    parts.append(chunk)
+                num_supports += chunk_supports
+
+        return parts, num_supports
+
     def _create_support(self, x, y, z_top, z_bottom, support_type):
         """
         Create a single support pillar
@@ -358,50 +603,11 @@ class SupportGenerator:
         Returns:
             Trimesh object
         """
-        segments = 16  # Number of sides
-
-        # Create a cylinder and taper it to create proper cone
-        # Start with cylinder at base_radius (largest radius)
-        cylinder = trimesh.creation.cylinder(
-            radius=base_radius,
-            height=height,
-            sections=segments
-        )
-
-        # Cylinder is created centered at origin with height along Z
-        # Modify vertices to create taper from base to tip
-        vertices = cylinder.vertices.copy()
-        z_vals = vertices[:, 2]
-        z_min, z_max = z_vals.min(), z_vals.max()
-
-        # Scale radially based on Z position
-        # Bottom (z_min) should be base_radius (large)
-        # Top (z_max) should be tip_radius (small)
-        for i, vertex in enumerate(vertices):
-            z_pos = vertex[2]
-            # Interpolate: t=0 at bottom, t=1 at top
-            t = (z_pos - z_min) / (z_max - z_min) if z_max > z_min else 0
-
-            # Interpolate radius from base (large) to tip (small)
-            target_radius = base_radius * (1 - t) + tip_radius * t
-
-            # Current radius
-            current_radius = np.sqrt(vertex[0]**2 + vertex[1]**2)
-
-            if current_radius > 0.001:
-                scale = target_radius / current_radius
-                vertices[i, 0] *= scale
-                vertices[i, 1] *= scale
-
-        cylinder.vertices = vertices
-
-        # Position the support
-        # Bottom should be at z_base, top at z_base + height
-        # Cylinder is centered at 0, so shift it up
-        translation = [x, y, z_base + height/2]
-        cylinder.apply_translation(translation)
-
-        return cylinder
+        # A 16-sided cylinder tapered from base_radius at the bottom
+        # (build plate) to tip_radius at the top (model), with its bottom
+        # at z_base
+        return _instance_template(self._cone_template, x, y, z_base, height,
+                                  base_radius, tip_radius)
 
     def _create_tree_support(self, x, y, z_top, z_bottom):
         """
@@ -428,64 +634,21 @@ class SupportGenerator:
         num_segments = max(2, int(height / 10))
         segment_height = height / num_segments
 
-        segments = []
-
-        for i in range(num_segments):
-            z_start = z_bottom + i * segment_height
-            z_end = z_start + segment_height
-
-            # Interpolate radius
-            t_start = i / num_segments
-            t_end = (i + 1) / num_segments
-
-            r_start = trunk_radius + t_start * (tip_radius - trunk_radius)
-            r_end = trunk_radius + t_end * (tip_radius - trunk_radius)
+        # Radius at each segment boundary, interpolated from trunk to tip
+        t = np.arange(num_segments + 1) / num_segments
+        radii = trunk_radius + t * (tip_radius - trunk_radius)
 
-            # Create segment
-            segment = self._create_cylinder(
-                x, y, z_start, segment_height, r_start, r_end
-            )
-            segments.append(segment)
-
-        # Combine segments
-        if segments:
-            return trimesh.util.concatenate(segments)
-        else:
-            return None
+        # Every segment is a 12-sided cone instance (see _create_cylinder),
+        # all placed at once
+        z_starts = z_bottom + np.arange(num_segments) * segment_height
+        return _instance_templates(self._segment_template, x, y, z_starts, segment_height,
+                                   radii[:-1], radii[1:])
 
     def _create_cylinder(self, x, y, z_base, height, radius_bottom, radius_top):
         """Create a cylinder/cone segment"""
-        segments = 12
-
-        # Create cone
-        cone = trimesh.creation.cone(
-            radius=radius_bottom,
-            height=height,
-            sections=segments
-        )
-
-        # Modify top radius
-        vertices = cone.vertices.copy()
-        z_vals = vertices[:, 2]
-        z_min, z_max = z_vals.min(), z_vals.max()
-
-        for i, vertex in enumerate(vertices):
-            z_pos = vertex[2]
-            t = (z_pos - z_min) / (z_max - z_min) if z_max > z_min else 0
-            target_radius = radius_bottom + t * (radius_top - radius_bottom)
-
-            current_radius = np.sqrt(vertex[0]**2 + vertex[1]**2)
-            if current_radius > 0.001:
-                scale = target_radius / current_radius
-                vertices[i, 0] *= scale
-                vertices[i, 1] *= scale
-
-        cone.vertices = vertices
-
-        # Position
-        cone.apply_translation([x, y, z_base])
-
-        return cone
+        # 12-sided cone with its base at z_base
+        return _instance_template(self._segment_template, x, y, z_base, height,
+                                  radius_bottom, radius_top)
 
     def merge_with_model(self, supports):
         """
@@ -502,8 +665,8 @@ class SupportGenerator:
 
         print("\nMerging supports with model...")
 
-        # Combine meshes
-        combined = trimesh.util.concatenate([self.mesh, supports])
+        # Combine meshes by copying both into one preallocated buffer
+        combined = concatenate_meshes([self.mesh, supports])
 
         print(f"  Combined mesh: {len(combined.vertices)} vertices, {len(combined.faces)} faces")
 
@@ -515,7 +678,7 @@ class SupportGenerator:
             return "No supports generated"
 
         return f"""Support Generation Summary:
-  Number of support structures: {len(self.support_meshes)}
+  Number of support structures: {self.support_count}
   Total support volume: {supports.volume:.2f} mm³
   Support surface area: {supports.area:.2f} mm²
   Estimated resin usage: {supports.volume / 1000:.2f} ml
@@ -30,29 +30,28 @@ def create_test_support():
     print(f"\nAfter creation (cylinder):")
     print(f"  Z range: {cylinder.vertices[:, 2].min():.3f} to {cylinder.vertices[:, 2].max():.3f}")
 
-    # Modify vertices to taper from base to tip
-    vertices = cylinder.vertices.copy()
+    # Modify vertices to taper from base to tip. The mesh's own vertex
+    # array is edited in place; trimesh tracks the change and drops its
+    # cached normals and bounds
+    vertices = cylinder.vertices
     z_vals = vertices[:, 2]
     z_min, z_max = z_vals.min(), z_vals.max()
 
     print(f"\nBefore tapering:")
     print(f"  z_min: {z_min:.3f}, z_max: {z_max:.3f}")
 
-    for i, vertex in enumerate(vertices):
-        z_pos = vertex[2]
-        # t=0 at bottom, t=1 at top
-        t = (z_pos - z_min) / (z_max - z_min) if z_max > z_min else 0
+    # t=0 at bottom, t=1 at top
+    t = (z_vals - z_min) / (z_max - z_min) if z_max > z_min else np.zeros(len(vertices))
 
-        # Interpolate from base (large) to tip (small)
-        target_radius = base_radius * (1 - t) + tip_radius * t
+    # Interpolate from base (large) to tip (small)
+    target_radius = base_radius * (1 - t) + tip_radius * t
 
-        current_radius = np.sqrt(vertex[0]**2 + vertex[1]**2)
-        if current_radius > 0.001:
-            scale = target_radius / current_radius
-            vertices[i, 0] *= scale
-            vertices[i, 1] *= scale
-
-    cylinder.vertices = vertices
+    # The cylinder's vertices are either on the axis (cap centers, which
+    # keep their position) or exactly base_radius from it, so the scale
+    # needs no per-vertex radius
+    on_surface = np.abs(vertices[:, 0]) + np.abs(vertices[:, 1]) > 0.001
+    scale = np.where(on_surface, target_radius / base_radius, 1.0)
+    vertices[:, :2] *= scale[:, None]
 
     # Check radii at top and bottom
     bottom_verts = vertices[np.abs(vertices[:, 2] - z_min) < 0.01]
@@ -67,8 +66,9 @@ def create_test_support():
 
     # Translate to final position (build plate at 0, model at 10)
     z_base = 0.0
-    translation = [0, 0, z_base + height/2]
-    cylinder.apply_translation(translation)
+    # A pure shift, so add it to Z directly rather than going through
+    # apply_translation's homogeneous transform
+    vertices[:, 2] += z_base + height/2
     cone = cylinder
 
     print(f"\nAfter positioning:")